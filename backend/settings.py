@@ -59,6 +59,9 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# broker fanning out live tournament events (see tournaments/live.py)
+TOURNAMENT_LIVE_BROKER = 'backend.tournaments.live.InMemoryBroker'
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -104,6 +107,21 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# local memory per process - point TOURNAMENT_CACHE_ALIAS at a shared cache (e.g. Redis) when running several workers
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "padel-app",
+    }
+}
+
+TOURNAMENT_CACHE_ALIAS = "default"
+TOURNAMENT_CACHE_TIMEOUT = 300
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -1,8 +1,13 @@
 from django.contrib import admin
-from .models import Tournament, Player, Match, MatchPlayer, Court
+from .models import Tournament, Player, Match, MatchPlayer, Court, Season, PlayerProfile, SeasonStanding, \
+    RatingEvent
 
 admin.site.register(Tournament)
 admin.site.register(Player)
 admin.site.register(Match)
 admin.site.register(MatchPlayer)
-admin.site.register(Court)
\ No newline at end of file
+admin.site.register(Court)
+admin.site.register(Season)
+admin.site.register(PlayerProfile)
+admin.site.register(SeasonStanding)
+admin.site.register(RatingEvent)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TournamentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "backend.tournaments"
+
+    def ready(self):
+        from backend.tournaments import signals  # noqa: F401
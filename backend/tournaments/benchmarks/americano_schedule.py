@@ -0,0 +1,46 @@
+"""
+Build time and quality of precomputed Americano schedules.
+
+Pure Python, no database needed:
+    python -m backend.tournaments.benchmarks.americano_schedule
+"""
+import argparse
+import random
+import time
+from array import array
+
+from backend.tournaments.logic.americano_schedule import build_schedule, schedule_stats, MAX_SEARCH_PASSES
+
+
+def random_schedule(n_players, n_rounds):
+    """What the generator did before: a fresh shuffle every round."""
+    schedule = array('H')
+    for _ in range(n_rounds):
+        slots = list(range(n_players))
+        random.shuffle(slots)
+        schedule.extend(slots)
+    return schedule
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, nargs='+', default=[8, 16, 32, 48, 64])
+    parser.add_argument('--rounds', type=int, default=25)
+    parser.add_argument('--max-passes', type=int, default=MAX_SEARCH_PASSES)
+    args = parser.parse_args()
+
+    print(f"{'players':>7} {'rounds':>6} {'schedule':>9} {'build ms':>9} "
+          f"{'partner rep.':>12} {'opponent rep.':>13} {'max opp.':>8}")
+    for n_players in args.players:
+        start = time.perf_counter()
+        schedule = build_schedule(n_players, args.rounds, max_passes=args.max_passes)
+        elapsed = (time.perf_counter() - start) * 1000
+        for name, candidate in (("computed", schedule), ("random", random_schedule(n_players, args.rounds))):
+            stats = schedule_stats(candidate, n_players)
+            build = f"{elapsed:.1f}" if name == "computed" else "-"
+            print(f"{n_players:>7} {args.rounds:>6} {name:>9} {build:>9} {stats['partner_repeats']:>12} "
+                  f"{stats['opponent_repeats']:>13} {stats['max_opponent_meetings']:>8}")
+
+
+if __name__ == '__main__':
+    main()
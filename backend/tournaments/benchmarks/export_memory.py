@@ -0,0 +1,70 @@
+"""
+Peak Python memory of a full match dump: streamed export versus MatchSerializer over every match.
+
+Runs against a throwaway test database, never the dev one:
+    python -m backend.tournaments.benchmarks.export_memory --tournaments 1000 10000
+
+Each tournament has 8 players on 2 courts for 5 rounds, so 10 matches.
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from backend.tournaments.benchmarks.query_plans import seed  # noqa: E402
+from backend.tournaments.export import export_rows, stream_csv  # noqa: E402
+from backend.tournaments.models import Match, MatchPlayer, RankingSnapshot, Player, Court, Tournament  # noqa: E402
+from backend.tournaments.serializers import MatchSerializer  # noqa: E402
+from backend.tournaments.views import matches_with_players  # noqa: E402
+
+
+def streamed():
+    size = 0
+    for chunk in stream_csv(*export_rows('matches')):
+        size += len(chunk)
+    return size
+
+
+def serialized():
+    return len(MatchSerializer(matches_with_players().order_by('id'), many=True).data)
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tournaments', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    test_db = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print(f"{'matches':>8} {'stream s':>9} {'stream MiB':>11} {'serializer s':>13} {'serializer MiB':>15}")
+        for n_tournaments in args.tournaments:
+            for model in (RankingSnapshot, MatchPlayer, Match, Player, Court, Tournament):
+                model.objects.all().delete()
+            seed(n_tournaments, players=8, rounds=5)
+            stream_time, stream_peak = measure(streamed)
+            serializer_time, serializer_peak = measure(serialized)
+            print(f"{Match.objects.count():>8} {stream_time:>9.2f} {stream_peak:>11.1f} "
+                  f"{serializer_time:>13.2f} {serializer_peak:>15.1f}")
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Query plans and latencies of the hot-path lookups with and without the composite indexes.
+
+Runs against a throwaway test database, never the dev one:
+    python -m backend.tournaments.benchmarks.query_plans --tournaments 10000
+"""
+import argparse
+import os
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Max  # noqa: E402
+
+from backend.tournaments.models import Tournament, Court, Player, Match, MatchPlayer, RankingSnapshot  # noqa: E402
+
+INDEXED_MODELS = [Match, RankingSnapshot]
+
+
+def seed(tournaments, players, rounds):
+    courts_per_tournament = players // 4
+    Tournament.objects.bulk_create([
+        Tournament(title=f"Bench {i}", format=Tournament.TournamentFormat.AMERICANO,
+                   result_sorting=Tournament.ResultSorting.POINTS, team_format=Tournament.TeamFormat.PLAYER,
+                   final_match=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE, points_per_match=21,
+                   number_of_rounds=rounds, status=Tournament.TournamentStatus.IN_PROGRESS)
+        for i in range(tournaments)
+    ], batch_size=2000)
+    tournament_ids = list(Tournament.objects.values_list('id', flat=True))
+
+    Court.objects.bulk_create([
+        Court(tournament_id=tid, name=f"Court {c}", number=c)
+        for tid in tournament_ids for c in range(1, courts_per_tournament + 1)
+    ], batch_size=5000)
+    Player.objects.bulk_create([
+        Player(tournament_id=tid, name=f"Player {p}")
+        for tid in tournament_ids for p in range(players)
+    ], batch_size=5000)
+
+    courts, roster = {}, {}
+    for court_id, tid in Court.objects.values_list('id', 'tournament_id'):
+        courts.setdefault(tid, []).append(court_id)
+    for player_id, tid in Player.objects.values_list('id', 'tournament_id'):
+        roster.setdefault(tid, []).append(player_id)
+
+    Match.objects.bulk_create([
+        Match(tournament_id=tid, court_id=court_id, round_number=r, team_1_score=12, team_2_score=9, played=True)
+        for tid in tournament_ids for r in range(1, rounds + 1) for court_id in courts[tid]
+    ], batch_size=5000)
+
+    match_players, snapshots = [], []
+    for match_id, tid, round_number, court_id in Match.objects.values_list('id', 'tournament_id', 'round_number', 'court_id'):
+        slot = courts[tid].index(court_id)
+        group = roster[tid][slot * 4: slot * 4 + 4]
+        for i, player_id in enumerate(group):
+            team = 'team1' if i < 2 else 'team2'
+            match_players.append(MatchPlayer(match_id=match_id, player_id=player_id, team=team))
+            snapshots.append(RankingSnapshot(tournament_id=tid, player_id=player_id, round_number=round_number,
+                                             points=12 if i < 2 else 9, points_against=9 if i < 2 else 12,
+                                             result='WIN' if i < 2 else 'LOSS', is_winner=i < 2))
+    MatchPlayer.objects.bulk_create(match_players, batch_size=5000)
+    RankingSnapshot.objects.bulk_create(snapshots, batch_size=5000)
+    return tournament_ids
+
+
+def analyze():
+    # refresh planner statistics so both runs are planned on the same data
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+
+def hot_paths(tournament_id, round_number):
+    matches = Match.objects.filter(tournament_id=tournament_id)
+    return {
+        "round matches": lambda: list(matches.filter(round_number=round_number)),
+        "current round MAX": lambda: matches.aggregate(max_round=Max('round_number')),
+        "round snapshots": lambda: list(RankingSnapshot.objects.filter(tournament_id=tournament_id, round_number=round_number)),
+        "ranking scan": lambda: list(
+            RankingSnapshot.objects.filter(tournament_id=tournament_id)
+            .order_by('player_id', 'round_number')
+            .values_list('player_id', 'round_number', 'points', 'points_against', 'result')
+        ),
+    }
+
+
+def explain(tournament_id, round_number):
+    matches = Match.objects.filter(tournament_id=tournament_id)
+    return {
+        "round matches": matches.filter(round_number=round_number).explain(),
+        "current round MAX": matches.values('tournament_id').annotate(max_round=Max('round_number')).explain(),
+        "round snapshots": RankingSnapshot.objects.filter(tournament_id=tournament_id, round_number=round_number).explain(),
+        "ranking scan": RankingSnapshot.objects.filter(tournament_id=tournament_id)
+            .order_by('player_id', 'round_number')
+            .values_list('player_id', 'round_number', 'points', 'points_against', 'result').explain(),
+    }
+
+
+def measure(tournament_ids, round_number, repeat):
+    timings = {}
+    for tid in tournament_ids:
+        for name, query in hot_paths(tid, round_number).items():
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query()
+                timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+def report(label, plans, timings):
+    print(f"\n=== {label} ===")
+    for name, plan in plans.items():
+        print(f"{name:<20} {timings[name]:8.3f} ms (median)")
+        for line in plan.splitlines():
+            print(f"    {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tournaments', type=int, default=10000)
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--samples', type=int, default=50, help="tournaments queried per measurement")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    test_db = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        start = time.perf_counter()
+        tournament_ids = seed(args.tournaments, args.players, args.rounds)
+        print(f"Seeded {args.tournaments} tournaments in {time.perf_counter() - start:.1f}s (db: {test_db})")
+
+        sample = tournament_ids[::max(1, len(tournament_ids) // args.samples)][:args.samples]
+        round_number = args.rounds
+
+        indexes = [(model, index) for model in INDEXED_MODELS for index in model._meta.indexes]
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        analyze()
+        report("before (FK and unique indexes only)", explain(sample[0], round_number), measure(sample, round_number, args.repeat))
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        analyze()
+        report("after (composite indexes)", explain(sample[0], round_number), measure(sample, round_number, args.repeat))
+    finally:
+        connection.creation.destroy_test_db(test_db, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Cost of building a ranking from per-round snapshot rows, without the database:
+    python -m backend.tournaments.benchmarks.ranking_core --players 8 64 512 --rounds 25
+
+"models" instantiates a RankingSnapshot per row and aggregates attributes, as iterating a queryset does;
+"columns" feeds the same rows as values_list tuples into compute_ranking.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from backend.tournaments.logic.ranking import compute_ranking  # noqa: E402
+from backend.tournaments.models import RankingSnapshot  # noqa: E402
+
+POINTS_PER_MATCH = 21
+
+
+def snapshot_rows(n_players, n_rounds, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for round_number in range(1, n_rounds + 1):
+        for player_id in range(1, n_players + 1):
+            points = rng.randint(0, POINTS_PER_MATCH)
+            against = POINTS_PER_MATCH - points
+            result = RankingSnapshot.Result.WIN if points > against else RankingSnapshot.Result.LOSS
+            rows.append((player_id, f"Player {player_id}", round_number, points, against, result))
+    return rows
+
+
+def rank_models(rows):
+    snapshots = [
+        RankingSnapshot(player_id=player_id, round_number=round_number, points=points, points_against=against,
+                        result=result)
+        for player_id, _, round_number, points, against, result in rows
+    ]
+    names = {row[0]: row[1] for row in rows}
+    return compute_ranking(
+        [s.player_id for s in snapshots], [s.round_number for s in snapshots], [s.points for s in snapshots],
+        [s.points_against for s in snapshots], [s.result for s in snapshots], names
+    )
+
+
+def rank_columns(rows):
+    player_ids, names, round_numbers, points, points_against, results = zip(*rows)
+    return compute_ranking(player_ids, round_numbers, points, points_against, results, dict(zip(player_ids, names)))
+
+
+def measure(func, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(rows)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, nargs='+', default=[8, 64, 512])
+    parser.add_argument('--rounds', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'players':>7} {'rounds':>6} {'rows':>7} {'models ms':>10} {'columns ms':>11} {'speedup':>8}")
+    for n_players in args.players:
+        rows = snapshot_rows(n_players, args.rounds)
+        assert rank_models(rows) == rank_columns(rows)
+        models = measure(rank_models, rows, args.repeat)
+        columns = measure(rank_columns, rows, args.repeat)
+        print(f"{n_players:>7} {args.rounds:>6} {len(rows):>7} {models:>10.2f} {columns:>11.2f} "
+              f"{models / columns:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Cost of replaying a rating history, without the database:
+    python -m backend.tournaments.benchmarks.rating_replay --matches 10000 100000 1000000 --profiles 20000
+
+Random doubles matches between profiles, in playing order. "sequential" is replay_ratings,
+"vectorized" is replay_ratings_vectorized (needs NumPy) - both must end with the same ratings.
+"""
+import argparse
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from backend.tournaments.logic import ratings  # noqa: E402
+
+
+def history(n_matches, n_profiles, seed=0):
+    rng = random.Random(seed)
+    match_index, profile_index, team_1_side, team_1_scores = [], [], [], []
+    for match in range(n_matches):
+        for position, profile in enumerate(rng.sample(range(n_profiles), 4)):
+            match_index.append(match)
+            profile_index.append(profile)
+            team_1_side.append(position < 2)
+        team_1_scores.append(rng.choice((1.0, 1.0, 0.5, 0.0, 0.0)))
+    return match_index, profile_index, team_1_side, team_1_scores
+
+
+def measure(func, rows, n_profiles):
+    start = time.perf_counter()
+    result, _ = func(*rows, n_profiles)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--matches', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--profiles', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'matches':>8} {'sequential s':>13} {'vectorized s':>13} {'speedup':>8}")
+    for n_matches in args.matches:
+        rows = history(n_matches, args.profiles)
+        sequential, expected = measure(ratings.replay_ratings, rows, args.profiles)
+        if ratings.np is None:
+            print(f"{n_matches:>8} {sequential:>13.2f} {'no NumPy':>13}")
+            continue
+        vectorized, result = measure(ratings.replay_ratings_vectorized, rows, args.profiles)
+        assert ratings.np.allclose(result, expected)
+        print(f"{n_matches:>8} {sequential:>13.2f} {vectorized:>13.2f} {sequential / vectorized:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Time to plan a round in memory - no database, django.setup() only loads the models:
+    python -m backend.tournaments.benchmarks.round_planning --players 8 16 32 64 --rounds 25
+
+Each format plays a whole tournament: byes and partner history are carried from plan to plan
+and the ranking is reshuffled after every round, as results would.
+The first Americano plan of a shape includes building its cached schedule.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from dataclasses import replace
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+django.setup()
+
+from backend.tournaments.logic.generation import plan_round  # noqa: E402
+from backend.tournaments.logic.planning import RoundState  # noqa: E402
+from backend.tournaments.models import Tournament  # noqa: E402
+
+FORMATS = {
+    "americano": (Tournament.TournamentFormat.AMERICANO, False),
+    "mexicano": (Tournament.TournamentFormat.MEXICANO, False),
+    "balanced": (Tournament.TournamentFormat.BALANCED, False),
+    "final": (Tournament.TournamentFormat.MEXICANO, True),
+}
+
+
+def play(n_players, n_courts, n_rounds, tournament_format, is_final, seed):
+    """Plans n_rounds rounds, returns per-round planning times in microseconds."""
+    results = random.Random(seed)
+    player_ids = tuple(range(1, n_players + 1))
+    state = RoundState(
+        tournament_id=1, format=tournament_format, seed=seed, round_number=1,
+        final_match=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE,
+        mexicano_pairing=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE,
+        player_ids=player_ids, court_ids=tuple(range(1, n_courts + 1)), ranking=player_ids,
+        ratings={player_id: results.gauss(1500, 200) for player_id in player_ids},
+    )
+
+    timings = []
+    for round_number in range(1, n_rounds + 1):
+        start = time.perf_counter()
+        plan = plan_round(state, is_final=is_final)
+        timings.append((time.perf_counter() - start) * 1e6)
+
+        bye_history = dict(state.bye_history)
+        for player_id in plan.sit_outs:
+            byes, _ = bye_history.get(player_id, (0, 0))
+            bye_history[player_id] = (byes + 1, round_number)
+        partners = {
+            frozenset(pid for pid, team in players if team == side)
+            for _, players in plan.matches for side in ('team1', 'team2')
+        }
+        ranking = list(state.ranking)
+        results.shuffle(ranking)
+        state = replace(
+            state, round_number=round_number + 1, ranking=tuple(ranking),
+            bye_history=bye_history, recent_partners=frozenset(partners),
+        )
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, nargs='+', default=[8, 16, 32, 64])
+    parser.add_argument('--rounds', type=int, default=25)
+    parser.add_argument('--extra-players', type=int, default=2, help="players beyond full courts, they sit out")
+    args = parser.parse_args()
+
+    print(f"{'players':>7} {'courts':>6} {'format':>10} {'first us':>9} {'median us':>10} {'max us':>9}")
+    for n_players in args.players:
+        n_courts = n_players // 4
+        total = n_players + args.extra_players
+        for name, (tournament_format, is_final) in FORMATS.items():
+            timings = play(total, n_courts, args.rounds, tournament_format, is_final, seed=n_players)
+            print(f"{total:>7} {n_courts:>6} {name:>10} {timings[0]:>9.0f} "
+                  f"{statistics.median(timings):>10.0f} {max(timings):>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
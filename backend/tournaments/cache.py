@@ -0,0 +1,91 @@
+"""
+Versioned cache for tournament payloads (ranking, details, round matches).
+
+Every entry key contains the tournament's version counter. Writes touching a tournament bump
+the version (signals for single saves/deletes, explicit calls in the bulk write paths),
+so stale entries are never read again and simply expire.
+Backend is any Django cache, picked by settings.TOURNAMENT_CACHE_ALIAS.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+DEFAULT_TIMEOUT = 300
+
+_metrics = defaultdict(lambda: {"hits": 0, "misses": 0})
+_metrics_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'TOURNAMENT_CACHE_ALIAS', 'default')]
+
+
+def _version_key(tournament_id):
+    return f"tournament:{tournament_id}:version"
+
+
+def get_version(tournament_id):
+    cache = get_cache()
+    key = _version_key(tournament_id)
+    version = cache.get(key)
+    if version is None:
+        # time based start, so an evicted counter never comes back to an already used value
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(tournament_id):
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(tournament_id))
+    except ValueError:
+        cache.set(_version_key(tournament_id), time.time_ns(), timeout=None)
+
+
+def bump_tournament_version(tournament_id):
+    """
+    Invalidates all cached payloads of the tournament.
+    Bumps right away (the writer reads its own changes) and again on commit, dropping anything
+    another request cached from not yet committed state in between.
+    """
+    _bump(tournament_id)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(tournament_id))
+
+
+def get_or_build(tournament_id, kind, build, finished=False, suffix=''):
+    """
+    Returns cached payload of the given kind or builds and caches it.
+    finished may be a bool or a callable taking the built payload - payloads of finished
+    tournaments are immutable and cached without expiry.
+    """
+    cache = get_cache()
+    key = f"tournament:{tournament_id}:v{get_version(tournament_id)}:{kind}:{suffix}"
+
+    payload = cache.get(key)
+    with _metrics_lock:
+        _metrics[kind]["hits" if payload is not None else "misses"] += 1
+    if payload is not None:
+        return payload
+
+    payload = build()
+    is_finished = finished(payload) if callable(finished) else finished
+    timeout = None if is_finished else getattr(settings, 'TOURNAMENT_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+    cache.set(key, payload, timeout=timeout)
+    return payload
+
+
+def cache_metrics():
+    """Hit/miss counters per payload kind, for this process."""
+    with _metrics_lock:
+        return {kind: dict(counts) for kind, counts in _metrics.items()}
+
+
+def reset_cache_metrics():
+    with _metrics_lock:
+        _metrics.clear()
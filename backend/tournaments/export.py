@@ -0,0 +1,132 @@
+"""
+Streaming exports of matches, match players and ranking snapshots as CSV or JSON lines.
+
+Rows are read with values_list().iterator(), so neither model instances nor the whole result
+are held in memory: the database cursor is read CHUNK_SIZE rows at a time and every chunk is
+encoded and handed to the response before the next one is fetched.
+"""
+import csv
+import io
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from backend.tournaments.models import Match, MatchPlayer, RankingSnapshot
+
+CHUNK_SIZE = 2000
+
+# kind -> (model, column name -> model field path, ordering)
+EXPORTS = {
+    'matches': (
+        Match,
+        {
+            'match_id': 'id',
+            'tournament_id': 'tournament_id',
+            'round_number': 'round_number',
+            'court': 'court__name',
+            'team_1_score': 'team_1_score',
+            'team_2_score': 'team_2_score',
+            'played': 'played',
+            'updated_at': 'updated_at',
+        },
+        ('tournament_id', 'round_number', 'id'),
+    ),
+    'match-players': (
+        MatchPlayer,
+        {
+            'match_id': 'match_id',
+            'tournament_id': 'match__tournament_id',
+            'round_number': 'match__round_number',
+            'player_id': 'player_id',
+            'name': 'player__name',
+            'profile_id': 'player__profile_id',
+            'team': 'team',
+        },
+        ('match__tournament_id', 'match__round_number', 'match_id', 'id'),
+    ),
+    'rankings': (
+        RankingSnapshot,
+        {
+            'tournament_id': 'tournament_id',
+            'round_number': 'round_number',
+            'player_id': 'player_id',
+            'name': 'player__name',
+            'points': 'points',
+            'points_against': 'points_against',
+            'result': 'result',
+            'is_bye': 'is_bye',
+        },
+        ('tournament_id', 'round_number', 'player_id'),
+    ),
+}
+
+# path from each exported model to its tournament
+TOURNAMENT_PATHS = {
+    Match: 'tournament',
+    MatchPlayer: 'match__tournament',
+    RankingSnapshot: 'tournament',
+}
+
+
+def export_rows(kind, tournament_id=None, start_date=None, end_date=None):
+    """
+    Columns and a lazy row iterator of one export, for a tournament and/or
+    the tournaments created between start_date and end_date (inclusive dates).
+    """
+    model, columns, ordering = EXPORTS[kind]
+    tournament = TOURNAMENT_PATHS[model]
+
+    filters = {}
+    if tournament_id is not None:
+        filters[f'{tournament}_id'] = tournament_id
+    if start_date:
+        filters[f'{tournament}__created_at__date__gte'] = start_date
+    if end_date:
+        filters[f'{tournament}__created_at__date__lte'] = end_date
+
+    rows = (
+        model.objects
+        .filter(**filters)
+        .order_by(*ordering)
+        .values_list(*columns.values())
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    return list(columns), rows
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(columns, rows):
+    """CSV with a header line, encoded one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunked(rows):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_jsonl(columns, rows):
+    """One JSON object per line, encoded one chunk of rows at a time."""
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for chunk in chunked(rows):
+        yield ''.join(encoder.encode(dict(zip(columns, row))) + '\n' for row in chunk)
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson'),
+}
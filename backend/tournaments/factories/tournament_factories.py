@@ -23,15 +23,16 @@ class CourtFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Court
 
-    name = factory.Faker('sentence', nb_words=2)
-    number = factory.Faker('random_int',min=1)
+    # unique per tournament (DB constraints) - random values collided in bigger fixtures
+    name = factory.Sequence(lambda n: f"Court {n + 1}")
+    number = factory.Sequence(lambda n: n + 1)
     tournament = factory.SubFactory(TournamentFactory)
 
 class PlayerFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Player
 
-    name = factory.Faker('name')
+    name = factory.LazyFunction(lambda: faker.unique.name()[:30])
     tournament = factory.SubFactory(TournamentFactory)
 
 class MatchFactory(factory.django.DjangoModelFactory):
@@ -82,7 +83,11 @@ class RankingSnapshotFactory(factory.django.DjangoModelFactory):
     points = factory.LazyAttribute(
         lambda o: faker.random_int(min=1, max=o.tournament.points_per_match)
     )
+    points_against = factory.LazyAttribute(lambda o: o.tournament.points_per_match - o.points)
     is_winner = factory.Faker('pybool')
+    result = factory.LazyAttribute(
+        lambda o: RankingSnapshot.Result.WIN if o.is_winner else RankingSnapshot.Result.LOSS
+    )
 
 class TournamentWithRelationsFactory(TournamentFactory):
     """
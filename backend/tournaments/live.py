@@ -0,0 +1,109 @@
+"""
+Live tournament updates pushed to connected clients (Server-Sent Events over ASGI).
+
+Views publish events after their transaction commits, the broker fans them out to every
+subscriber of the tournament. The broker is picked by settings.TOURNAMENT_LIVE_BROKER,
+any class with subscribe / has_subscribers / publish can be plugged in
+(e.g. one backed by Redis pub/sub when running several ASGI workers).
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = 'backend.tournaments.live.InMemoryBroker'
+
+
+class Subscription:
+    """Queue of events for one connected client, bound to the event loop that reads it."""
+
+    def __init__(self, broker, tournament_id, max_pending):
+        self.broker = broker
+        self.tournament_id = tournament_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+    def offer(self, event):
+        # runs on the subscriber's loop; a slow client loses its oldest event, never blocks the publisher
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """
+    In-process broker: fans events out to subscribers of the same process.
+    publish() is safe to call from sync views running in worker threads.
+    """
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, tournament_id):
+        subscription = Subscription(self, tournament_id, self.max_pending)
+        with self._lock:
+            self._subscribers[tournament_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.tournament_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.tournament_id]
+
+    def has_subscribers(self, tournament_id):
+        return bool(self._subscribers.get(tournament_id))
+
+    def publish(self, tournament_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(tournament_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # loop already closed - client went away without unsubscribing
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(getattr(settings, 'TOURNAMENT_LIVE_BROKER', DEFAULT_BROKER))()
+
+
+def publish_tournament_event(tournament_id, event_type, payload):
+    """
+    Publishes an event to the tournament's subscribers once the current transaction commits.
+    payload may be a callable, so expensive payloads (e.g. ranking) are only built when someone listens.
+    """
+    def send():
+        broker = get_broker()
+        if not broker.has_subscribers(tournament_id):
+            return
+        data = payload() if callable(payload) else payload
+        # encoded once, shared by every subscriber
+        broker.publish(tournament_id, {"type": event_type, "data": json.dumps(data, cls=DjangoJSONEncoder)})
+
+    transaction.on_commit(send)
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {event['data']}\n\n"
@@ -0,0 +1,237 @@
+"""
+Full Americano schedule computed up front, so partners and opponents repeat as little as possible.
+
+Every player keeps one slot 0..N-1 for the whole tournament, sit-outs included: each round
+the slots with the fewest byes so far (then the oldest last bye) sit out, and the playing slots
+are paired with partners they have not had yet. The pairing follows a round-robin
+1-factorization (circle method), which alone never repeats a partner for N-1 rounds when
+nobody sits out, and a depth-first search re-pairs the slots whose factor partner sits out.
+Teams of each round are then grouped into matches greedily by fewest previous meetings and
+improved by a local search. Both searches are capped by a fixed number of steps, so the
+schedule only depends on its inputs - never on how busy the machine is.
+
+The schedule only depends on the event shape and is cached per (N, C, R).
+Tournaments map slots to their players.
+"""
+import random
+from array import array
+from functools import lru_cache
+
+from backend.tournaments.logic.sit_outs import pick_sit_outs, playing_count
+
+# Match.round_number is capped at 25, longer schedules are never served
+SCHEDULE_ROUNDS = 25
+# passes of the local search per round - it usually settles after a few
+MAX_SEARCH_PASSES = 50
+# partner search steps per round before settling for the fewest repeated partnerships
+MAX_PAIRING_STEPS = 20000
+
+
+def partner_rounds(n_players):
+    """Circle method: n-1 rounds of pairs in which every two players are partners exactly once."""
+    center = n_players - 1
+    rounds = []
+    for r in range(center):
+        pairs = [(center, r)]
+        for k in range(1, n_players // 2):
+            pairs.append(((r + k) % center, (r - k) % center))
+        rounds.append(pairs)
+    return rounds
+
+
+def _pair_slots(playing, preferred, partners, rng, max_steps):
+    """
+    Pairs the playing slots into teams of two that have not partnered before.
+    Depth-first, always extending the slot with the fewest fresh partners left and trying its
+    factor partner (preferred) first. When the search runs out of steps, slots are paired
+    greedily by fewest previous partnerships instead.
+    """
+    order = list(playing)
+    rng.shuffle(order)
+    steps = 0
+
+    def fresh_count(slot, unpaired):
+        row = partners[slot]
+        return sum(1 for other in unpaired if not row[other]) - 1
+
+    def candidates(slot, unpaired):
+        fresh = [other for other in order if other in unpaired and other != slot and not partners[slot][other]]
+        if preferred.get(slot) in fresh:
+            fresh.remove(preferred[slot])
+            fresh.insert(0, preferred[slot])
+        return fresh
+
+    def search(unpaired):
+        nonlocal steps
+        if not unpaired:
+            return []
+        steps += 1
+        if steps > max_steps:
+            return None
+        slot = min((s for s in order if s in unpaired), key=lambda s: fresh_count(s, unpaired))
+        for other in candidates(slot, unpaired):
+            rest = search(unpaired - {slot, other})
+            if rest is not None:
+                return [(slot, other)] + rest
+            if steps > max_steps:
+                return None
+        return None
+
+    # factor pairs that both play and are still fresh are kept, only the other slots are searched;
+    # when those cannot be paired, the whole round is searched again
+    playing_set = frozenset(playing)
+    kept = [
+        (slot, preferred[slot]) for slot in order
+        if preferred.get(slot) in playing_set and slot < preferred[slot] and not partners[slot][preferred[slot]]
+    ]
+    rest = search(playing_set - {slot for team in kept for slot in team})
+    if rest is not None:
+        return kept + rest
+    steps = 0
+    teams = search(playing_set)
+    if teams is not None:
+        return teams
+
+    teams, unpaired = [], list(order)
+    while unpaired:
+        slot = unpaired.pop(0)
+        other = min(unpaired, key=lambda o: (partners[slot][o], o != preferred.get(slot)))
+        unpaired.remove(other)
+        teams.append((slot, other))
+    return teams
+
+
+def _match_cost(team_a, team_b, opponents):
+    return sum(opponents[a][b] for a in team_a for b in team_b)
+
+
+def _group_teams(teams, opponents, rng, max_passes):
+    """Groups the round's teams into matches with as few repeated opponents as possible."""
+    remaining = list(teams)
+    rng.shuffle(remaining)
+    matches = []
+    while remaining:
+        team = remaining.pop()
+        best = min(range(len(remaining)), key=lambda i: _match_cost(team, remaining[i], opponents))
+        matches.append([team, remaining.pop(best)])
+
+    # local search: regroup the four teams of two matches while it lowers the cost
+    if len(matches) > 1:
+        for _ in range(max_passes):
+            improved = False
+            for i in range(len(matches)):
+                for j in range(i + 1, len(matches)):
+                    (a, b), (c, d) = matches[i], matches[j]
+                    current = _match_cost(a, b, opponents) + _match_cost(c, d, opponents)
+                    for regrouped in (([a, c], [b, d]), ([a, d], [b, c])):
+                        cost = sum(_match_cost(x, y, opponents) for x, y in regrouped)
+                        if cost < current:
+                            matches[i], matches[j] = regrouped
+                            current = cost
+                            improved = True
+            if not improved:
+                break
+    return matches
+
+
+def build_schedule(n_players, n_rounds, n_courts=None, max_passes=MAX_SEARCH_PASSES, seed=0,
+                   max_steps=MAX_PAIRING_STEPS):
+    """
+    Returns the schedule as a flat array of player slots, n_players per round: first the
+    matches [team1_a, team1_b, team2_a, team2_b, ...], then the slots sitting the round out.
+    Without n_courts every full group of four plays. The same arguments always give the same schedule.
+    """
+    if n_players < 4:
+        raise ValueError("Americano schedule needs at least 4 players.")
+    n_playing = playing_count(n_players, n_players // 4 if n_courts is None else n_courts)
+    if n_playing < 4:
+        raise ValueError("Americano schedule needs at least one court.")
+
+    rng = random.Random(seed)
+    # an odd player count gets a ghost slot in the factorization, its partner is simply re-paired
+    factors = partner_rounds(n_players + n_players % 2)
+    rng.shuffle(factors)
+
+    partners = [[0] * n_players for _ in range(n_players)]
+    opponents = [[0] * n_players for _ in range(n_players)]
+    byes, last_bye = [0] * n_players, [-1] * n_players
+    schedule = array('H')
+
+    for r in range(n_rounds):
+        sit_outs = pick_sit_outs(
+            range(n_players), n_players - n_playing, lambda slot: (byes[slot], last_bye[slot]), rng
+        )
+        playing = [slot for slot in range(n_players) if slot not in sit_outs]
+        preferred = {}
+        for a, b in factors[r % len(factors)]:
+            preferred[a], preferred[b] = b, a
+
+        teams = _pair_slots(playing, preferred, partners, rng, max_steps)
+        for a, b in teams:
+            partners[a][b] += 1
+            partners[b][a] += 1
+        for team_1, team_2 in _group_teams(teams, opponents, rng, max_passes):
+            for a in team_1:
+                for b in team_2:
+                    opponents[a][b] += 1
+                    opponents[b][a] += 1
+            schedule.extend(tuple(team_1) + tuple(team_2))
+
+        for slot in sorted(sit_outs):
+            byes[slot] += 1
+            last_bye[slot] = r
+            schedule.append(slot)
+
+    return schedule
+
+
+@lru_cache(maxsize=256)
+def get_schedule(n_players, n_courts, n_rounds=SCHEDULE_ROUNDS):
+    """Cached schedule for the event shape, courts beyond the last full group of four are ignored."""
+    return _cached_schedule(n_players, min(n_courts, n_players // 4), n_rounds)
+
+
+@lru_cache(maxsize=256)
+def _cached_schedule(n_players, n_courts, n_rounds):
+    return build_schedule(n_players, n_rounds, n_courts)
+
+
+def _round_slots(schedule, n_players, round_index):
+    rounds = len(schedule) // n_players
+    start = (round_index % rounds) * n_players
+    return schedule[start:start + n_players]
+
+
+def schedule_round(schedule, n_players, round_index, n_playing=None):
+    """Matches of one round (0-based) as [(team1_a, team1_b, team2_a, team2_b), ...], O(1) lookup."""
+    round_slots = _round_slots(schedule, n_players, round_index)
+    n_playing = n_players if n_playing is None else n_playing
+    return [tuple(round_slots[i:i + 4]) for i in range(0, n_playing, 4)]
+
+
+def schedule_sit_outs(schedule, n_players, round_index, n_playing):
+    """Slots sitting out one round (0-based)."""
+    return list(_round_slots(schedule, n_players, round_index)[n_playing:])
+
+
+def schedule_stats(schedule, n_players, n_playing=None):
+    """Repeat counts of the schedule: partner pairs met again and opponent pairs met again."""
+    partners, opponents = {}, {}
+    matches = (
+        match
+        for round_index in range(len(schedule) // n_players)
+        for match in schedule_round(schedule, n_players, round_index, n_playing)
+    )
+    for a, b, c, d in matches:
+        for pair in ((a, b), (c, d)):
+            key = frozenset(pair)
+            partners[key] = partners.get(key, 0) + 1
+        for x in (a, b):
+            for y in (c, d):
+                key = frozenset((x, y))
+                opponents[key] = opponents.get(key, 0) + 1
+    return {
+        "partner_repeats": sum(count - 1 for count in partners.values()),
+        "opponent_repeats": sum(count - 1 for count in opponents.values()),
+        "max_opponent_meetings": max(opponents.values(), default=0),
+    }
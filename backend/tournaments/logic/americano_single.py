@@ -1,47 +1,33 @@
-import random
-from backend.tournaments.models import Match, MatchPlayer, Tournament
+from backend.tournaments.logic.americano_schedule import get_schedule, schedule_round, schedule_sit_outs
+from backend.tournaments.logic.planning import RoundPlan, seeded_order, load_round_state
+from backend.tournaments.logic.sit_outs import playing_count
+from backend.tournaments.logic.rounds import materialize_round
+
+
+def plan_americano_round(state):
+    """
+    Plans an Americano round. Takes no random generator: the tournament seed alone decides
+    the slot order, and the precomputed schedule decides everything else.
+    """
+    if len(state.player_ids) < 4 or len(state.court_ids) < 1 :
+        return None
+
+    # every player keeps the schedule slot given by the seed's order for the whole tournament;
+    # the precomputed schedule also decides who sits out, so partners never depend on the byes
+    order = seeded_order(state.seed, state.player_ids)
+    n_playing = playing_count(len(order), len(state.court_ids))
+    schedule = get_schedule(len(order), len(state.court_ids))
+    round_index = state.round_number - 1
+
+    matches = tuple(
+        (court_id, ((order[a], 'team1'), (order[b], 'team1'), (order[c], 'team2'), (order[d], 'team2')))
+        for court_id, (a, b, c, d) in zip(state.court_ids, schedule_round(schedule, len(order), round_index, n_playing))
+    )
+    sit_outs = sorted(order[slot] for slot in schedule_sit_outs(schedule, len(order), round_index, n_playing))
+    return RoundPlan(state.round_number, False, matches, tuple(sit_outs))
 
 
 def generate_americano_round(tournament):
-    all_players = list(tournament.players.all())
-    all_courts = list(tournament.courts.all())
-    current_round = tournament.number_of_rounds + 1
-
-    if len(all_players) < 4 or len(all_players) % 4 != 0 or len(all_courts) < 1 :
-        return
-
-    random.shuffle(all_players)
-
-    # divide players into 4 players groups
-    for i in range (0, len(all_players), 4):
-        group = all_players[i : i + 4]
-
-        match = Match.objects.create(
-            tournament=tournament,
-            round_number=current_round,
-            court=all_courts[(i // 4)],
-            played=False,
-        )
-
-        for player in group[:2]:
-            MatchPlayer.objects.create(
-                match = match,
-                player = player,
-                team = 'team1'
-            )
-        for player in group[2:]:
-            MatchPlayer.objects.create(
-                match=match,
-                player=player,
-                team='team2'
-            )
-    # change tournament status after generating first round
-    if tournament.status == Tournament.TournamentStatus.NEW:
-        tournament.status = Tournament.TournamentStatus.IN_PROGRESS
-        tournament.save(update_fields=['status'])
-
-    tournament.number_of_rounds = current_round
-    tournament.save(update_fields=['number_of_rounds'])
-
-
-
+    plan = plan_americano_round(load_round_state(tournament))
+    if plan:
+        materialize_round(tournament, plan)
@@ -0,0 +1,25 @@
+from dataclasses import replace
+
+from backend.tournaments.logic.americano_single import plan_americano_round
+from backend.tournaments.logic.pairing import balance_group
+from backend.tournaments.logic.planning import load_round_state
+from backend.tournaments.logic.rounds import materialize_round
+
+
+def plan_balanced_round(state):
+    # groups and courts come from the americano schedule (seed only), each group is re-split by rating
+    plan = plan_americano_round(state)
+    if plan is None:
+        return None
+
+    matches = tuple(
+        (court_id, tuple(balance_group([player_id for player_id, _ in players], state.ratings, state.recent_partners)))
+        for court_id, players in plan.matches
+    )
+    return replace(plan, matches=matches)
+
+
+def generate_balanced_round(tournament):
+    plan = plan_balanced_round(load_round_state(tournament))
+    if plan:
+        materialize_round(tournament, plan)
@@ -1,46 +1,27 @@
-from backend.tournaments.logic.ranking import get_simplified_ranking
-from backend.tournaments.models import Match, MatchPlayer, Player
+from backend.tournaments.logic.pairing import pair_group
+from backend.tournaments.logic.planning import RoundPlan, load_round_state
+from backend.tournaments.logic.sit_outs import playing_count
+from backend.tournaments.logic.rounds import materialize_round
 
 
-def create_match_player(player, team, match):
-    MatchPlayer.objects.create(
-        match=match,
-        player=player,
-        team=team
+def plan_final_round(state):
+    """
+    Plans final round matches based on total tournament points
+    and tournament.final_match logic. Deterministic - no random generator involved.
+    """
+    # top of the ranking fills the courts - the rest did not make the final, which is not a bye
+    playing = state.ranking[:playing_count(len(state.ranking), len(state.court_ids))]
+
+    matches = tuple(
+        (state.court_ids[i // 4], tuple(pair_group(playing[i : i + 4], state.final_match)))
+        for i in range (0, len(playing), 4)
     )
+    return RoundPlan(state.round_number, True, matches, ())
+
 
 def generate_final_round(tournament):
     """
     Creates final round matches based on total tournament points
     and tournament.final_match logic.
     """
-    ranking = get_simplified_ranking(tournament.id)
-    player_ids_in_order = [player['id'] for player in ranking]
-
-    players_dict = Player.objects.in_bulk(player_ids_in_order)
-    players = [players_dict[pid] for pid in player_ids_in_order]
-
-    all_courts = list(tournament.courts.all())
-    current_round = tournament.number_of_rounds + 1
-
-    pairing_logic = {
-        1: [(0, 'team1'), (2, 'team1'), (1, 'team2'), (3, 'team2')],
-        2: [(0, 'team1'), (1, 'team1'), (2, 'team2'), (3, 'team2')],
-        3: [(0, 'team1'), (3, 'team1'), (1, 'team2'), (2, 'team2')],
-    }
-
-    for i in range (0, len(players), 4):
-        group = players[i : i + 4]
-        match = Match.objects.create(
-            tournament=tournament,
-            round_number=current_round,
-            court=all_courts[(i // 4)],
-            played=False,
-        )
-
-        for idx, team in pairing_logic[int(tournament.final_match)]:
-            create_match_player(player=group[idx], team=team, match=match)
-
-    tournament.number_of_rounds = current_round
-    tournament.final_round = current_round
-    tournament.save(update_fields=['number_of_rounds', 'final_round'])
\ No newline at end of file
+    materialize_round(tournament, plan_final_round(load_round_state(tournament, is_final=True)))
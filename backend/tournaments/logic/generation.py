@@ -0,0 +1,89 @@
+"""
+Round generation entry points.
+
+Planning (load_round_state + plan_round) is pure apart from the initial reads and is used
+for replays and previews; materialize_round is the only step that writes.
+"""
+import hashlib
+import json
+
+from backend.tournaments.cache import get_or_build
+from backend.tournaments.logic.americano_single import plan_americano_round, generate_americano_round
+from backend.tournaments.logic.balanced_single import plan_balanced_round, generate_balanced_round
+from backend.tournaments.logic.final_round import plan_final_round, generate_final_round
+from backend.tournaments.logic.mexicano_single import plan_mexicano_round, generate_mexicano_round
+from backend.tournaments.logic.planning import RoundPlan, load_round_state, round_rng
+from backend.tournaments.logic.rounds import materialize_round, RoundConflictError
+from backend.tournaments.models import Tournament
+
+
+class StalePreviewError(RoundConflictError):
+    """Raised when a previewed round no longer matches what the next round would be."""
+
+
+def generate_round(tournament, is_final=False):
+    """Generates and stores the next round according to the tournament format."""
+    if is_final:
+        generate_final_round(tournament)
+    elif tournament.format == Tournament.TournamentFormat.AMERICANO:
+        generate_americano_round(tournament)
+    elif tournament.format == Tournament.TournamentFormat.MEXICANO:
+        generate_mexicano_round(tournament)
+    elif tournament.format == Tournament.TournamentFormat.BALANCED:
+        generate_balanced_round(tournament)
+
+
+def plan_round(state, is_final=False):
+    """Plans a round from its state without touching the database."""
+    if is_final:
+        return plan_final_round(state)
+    if state.format == Tournament.TournamentFormat.MEXICANO:
+        # only Mexicano draws at random (ties between sit-out candidates), per round from the seed
+        return plan_mexicano_round(state, round_rng(state.seed, state.round_number))
+    if state.format == Tournament.TournamentFormat.BALANCED:
+        return plan_balanced_round(state)
+    return plan_americano_round(state)
+
+
+def replay_round(tournament, round_number):
+    """
+    Rebuilds the pairings of an already generated round from the tournament seed and
+    the results of the rounds before it. Nothing is written.
+    """
+    is_final = tournament.final_round == round_number
+    return plan_round(load_round_state(tournament, round_number, is_final=is_final), is_final=is_final)
+
+
+def plan_token(tournament_id, plan):
+    """Digest of a planned round - equal tokens mean the very same pairings."""
+    payload = json.dumps({"tournament_id": tournament_id, **plan}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def preview_round(tournament, is_final=False):
+    """
+    Plans the next round without writing it. Returns the plan dict with its token, or None
+    when the round cannot be planned. Cached until the tournament changes.
+    """
+    def build():
+        plan = plan_round(load_round_state(tournament, is_final=is_final), is_final=is_final)
+        if plan is None:
+            return None
+        plan = plan.to_dict()
+        return {"token": plan_token(tournament.id, plan), **plan}
+
+    return get_or_build(
+        tournament.id, 'preview', build, suffix=f"{tournament.number_of_rounds}:{'final' if is_final else 'next'}"
+    )
+
+
+def commit_preview(tournament, token, is_final=False):
+    """
+    Stores exactly the previewed round identified by token.
+    Raises StalePreviewError when the next round would no longer be the one previewed.
+    """
+    preview = preview_round(tournament, is_final=is_final)
+    if preview is None or preview['token'] != token:
+        raise StalePreviewError(f"Preview {token} is stale for tournament {tournament.pk}.")
+    plan = RoundPlan.from_dict({key: value for key, value in preview.items() if key != 'token'})
+    return materialize_round(tournament, plan)
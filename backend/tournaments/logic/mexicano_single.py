@@ -1,49 +1,26 @@
-import random
+from backend.tournaments.logic.americano_single import plan_americano_round
+from backend.tournaments.logic.pairing import pair_group
+from backend.tournaments.logic.planning import RoundPlan, allocate_sit_outs, load_round_state, round_rng
+from backend.tournaments.logic.rounds import materialize_round
 
-from backend.tournaments.logic.americano_single import generate_americano_round
-from backend.tournaments.logic.ranking import get_simplified_ranking
-from backend.tournaments.models import Tournament, Player, Match, MatchPlayer
 
-
-def generate_mexicano_round(tournament):
+def plan_mexicano_round(state, rng):
     # first round is always americano !!
-    if tournament.status == Tournament.TournamentStatus.NEW:
-        generate_americano_round(tournament)
-        return
-
-    all_courts = list(tournament.courts.all())
-    current_round = tournament.number_of_rounds + 1
-
-    ranking = get_simplified_ranking(tournament.id)
-    player_ids_in_order = [player['id'] for player in ranking]
-
-    players_dict = Player.objects.in_bulk(player_ids_in_order)
-    players = [players_dict[pid] for pid in player_ids_in_order]
-
-    for i in range(0, len(players), 4):
-        group = players[i: i + 4]
-        random.shuffle(group)
+    if state.round_number == 1:
+        return plan_americano_round(state)
 
-        match = Match.objects.create(
-            tournament=tournament,
-            round_number=current_round,
-            court=all_courts[(i // 4)],
-            played=False,
-        )
+    playing, sit_outs = allocate_sit_outs(list(state.ranking), len(state.court_ids), state.bye_history, rng)
 
-        for player in group[:2]:
-            MatchPlayer.objects.create(
-                match=match,
-                player=player,
-                team='team1'
-            )
-        for player in group[2:]:
-            MatchPlayer.objects.create(
-                match=match,
-                player=player,
-                team='team2'
-            )
+    # groups of four by ranking, paired by the configured pattern avoiding recent partners
+    matches = tuple(
+        (state.court_ids[i // 4], tuple(pair_group(playing[i: i + 4], state.mexicano_pairing, state.recent_partners)))
+        for i in range(0, len(playing), 4)
+    )
+    return RoundPlan(state.round_number, False, matches, tuple(sit_outs))
 
-    tournament.number_of_rounds = current_round
-    tournament.save(update_fields=['number_of_rounds'])
 
+def generate_mexicano_round(tournament, rng=None):
+    state = load_round_state(tournament)
+    plan = plan_mexicano_round(state, rng or round_rng(state.seed, state.round_number))
+    if plan:
+        materialize_round(tournament, plan)
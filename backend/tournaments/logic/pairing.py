@@ -0,0 +1,67 @@
+"""
+Within-group pairing for Mexicano and final rounds.
+
+A group is four players in ranking order. Patterns are the Tournament.FinalMatch layouts,
+(index in group, team). Regular Mexicano rounds use the tournament's mexicano_pairing
+(officially 1 & 4 vs 2 & 3) but fall back to another layout when it would repeat
+a partnership from the last PARTNER_WINDOW rounds. Balanced rounds pick the layout
+with the smallest rating gap between the teams.
+"""
+from backend.tournaments.models import MatchPlayer, Tournament
+
+PAIRING_PATTERNS = {
+    Tournament.FinalMatch.ONE_THREE_VS_TWO_FOUR: [(0, 'team1'), (2, 'team1'), (1, 'team2'), (3, 'team2')],
+    Tournament.FinalMatch.ONE_TWO_VS_THREE_FOUR: [(0, 'team1'), (1, 'team1'), (2, 'team2'), (3, 'team2')],
+    Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE: [(0, 'team1'), (3, 'team1'), (1, 'team2'), (2, 'team2')],
+}
+
+PARTNER_WINDOW = 3
+
+
+def recent_partners(tournament_id, before_round, window=PARTNER_WINDOW):
+    """Partner pairs of the last `window` rounds, one query on the (tournament, round_number) index."""
+    rows = MatchPlayer.objects.filter(
+        match__tournament_id=tournament_id,
+        match__round_number__gte=before_round - window,
+        match__round_number__lt=before_round
+    ).values_list('match_id', 'team', 'player_id')
+
+    teams = {}
+    for match_id, team, player_id in rows:
+        teams.setdefault((match_id, team), []).append(player_id)
+    return {frozenset(players) for players in teams.values() if len(players) == 2}
+
+
+def pair_group(group, preferred, partners_to_avoid=frozenset()):
+    """
+    Returns [(player_id, team), ...] for a group of four ranked players.
+    The preferred pattern wins unless another one repeats fewer recent partnerships.
+    """
+    preferred = Tournament.FinalMatch(int(preferred))
+    order = [preferred] + [pattern for pattern in PAIRING_PATTERNS if pattern != preferred]
+
+    # min keeps the first of equal candidates, so ties go to the preferred pattern
+    best = min(order, key=lambda pattern: repeated_partners(group, pattern, partners_to_avoid))
+    return [(group[idx], team) for idx, team in PAIRING_PATTERNS[best]]
+
+
+def repeated_partners(group, pattern, partners_to_avoid):
+    """Number of the pattern's two teams that are recent partnerships."""
+    layout = PAIRING_PATTERNS[pattern]
+    team_1 = frozenset(group[idx] for idx, team in layout if team == 'team1')
+    team_2 = frozenset(group[idx] for idx, team in layout if team == 'team2')
+    return (team_1 in partners_to_avoid) + (team_2 in partners_to_avoid)
+
+
+def balance_group(group, ratings, partners_to_avoid=frozenset()):
+    """
+    Returns [(player_id, team), ...] for a group of four, split into the two teams whose
+    summed ratings are closest. Equal gaps go to the split repeating fewer recent partnerships.
+    """
+    def cost(pattern):
+        gap = sum(ratings[group[idx]] if team == 'team1' else -ratings[group[idx]]
+                  for idx, team in PAIRING_PATTERNS[pattern])
+        return abs(gap), repeated_partners(group, pattern, partners_to_avoid)
+
+    best = min(PAIRING_PATTERNS, key=cost)
+    return [(group[idx], team) for idx, team in PAIRING_PATTERNS[best]]
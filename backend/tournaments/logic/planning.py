@@ -0,0 +1,139 @@
+"""
+Round planning inputs and helpers shared by the generators.
+
+A round is planned from a RoundState (everything the generators need, loaded up front).
+Americano, balanced and final rounds follow from the state alone; Mexicano also takes a
+random.Random seeded from the tournament seed and the round number. Either way the same
+state always gives the same round and any round can be replayed.
+"""
+import random
+from dataclasses import dataclass, field
+
+from django.db.models import Count, Max
+
+from backend.tournaments.logic.pairing import recent_partners
+from backend.tournaments.logic.ranking import get_simplified_ranking, get_ranking_before_round
+from backend.tournaments.logic.ratings import entry_ratings
+from backend.tournaments.logic.sit_outs import pick_sit_outs, playing_count
+from backend.tournaments.models import Tournament, SitOut
+
+
+@dataclass(frozen=True)
+class RoundState:
+    tournament_id: int
+    format: str
+    seed: int
+    round_number: int
+    final_match: int
+    mexicano_pairing: int
+    player_ids: tuple
+    court_ids: tuple
+    # player ids in ranking order before this round, players without results at the bottom
+    ranking: tuple = ()
+    # player_id -> (number of byes, last bye round) before this round
+    bye_history: dict = field(default_factory=dict)
+    recent_partners: frozenset = frozenset()
+    # player_id -> rating entering the tournament, balanced rounds only
+    ratings: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RoundPlan:
+    round_number: int
+    is_final: bool
+    # ((court_id, ((player_id, 'team1'), (player_id, 'team1'), (player_id, 'team2'), ...)), ...)
+    matches: tuple
+    sit_outs: tuple
+
+    def to_dict(self):
+        return {
+            "round_number": self.round_number,
+            "is_final": self.is_final,
+            "matches": [
+                {"court_id": court_id, "players": [{"player_id": pid, "team": team} for pid, team in players]}
+                for court_id, players in self.matches
+            ],
+            "sit_outs": list(self.sit_outs),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            round_number=data['round_number'],
+            is_final=data['is_final'],
+            matches=tuple(
+                (match['court_id'], tuple((player['player_id'], player['team']) for player in match['players']))
+                for match in data['matches']
+            ),
+            sit_outs=tuple(data['sit_outs']),
+        )
+
+
+def round_rng(seed, round_number):
+    """Random generator of one round - independent of how many rounds were planned before."""
+    return random.Random(f"{seed}:{round_number}")
+
+
+def seeded_order(seed, player_ids):
+    """Tournament-wide player order (e.g. Americano schedule slots), derived from the seed."""
+    order = sorted(player_ids)
+    random.Random(f"{seed}:order").shuffle(order)
+    return order
+
+
+def allocate_sit_outs(player_ids, n_courts, bye_history, rng):
+    """
+    Splits players into (playing, sitting out) for the round, by the shared rule of logic/sit_outs.py.
+    """
+    n_sit_outs = len(player_ids) - playing_count(len(player_ids), n_courts)
+    if n_sit_outs <= 0:
+        return list(player_ids), []
+
+    sit_outs = pick_sit_outs(player_ids, n_sit_outs, lambda pid: bye_history.get(pid, (0, 0)), rng)
+
+    return [pid for pid in player_ids if pid not in sit_outs], [pid for pid in player_ids if pid in sit_outs]
+
+
+def load_round_state(tournament, round_number=None, is_final=False):
+    """
+    Reads everything needed to plan the round (by default the next one) in a few queries.
+    Past rounds get the state as it was before them: ranking, byes and partners of earlier rounds.
+    """
+    next_round = tournament.number_of_rounds + 1
+    round_number = round_number or next_round
+
+    player_ids = tuple(tournament.players.order_by('id').values_list('id', flat=True))
+    court_ids = tuple(tournament.courts.order_by('id').values_list('id', flat=True))
+    is_mexicano = tournament.format == Tournament.TournamentFormat.MEXICANO and round_number > 1
+    is_balanced = tournament.format == Tournament.TournamentFormat.BALANCED and not is_final
+
+    ranking = ()
+    if is_final or is_mexicano:
+        if round_number == next_round:
+            ranked = [player['id'] for player in get_simplified_ranking(tournament.id)]
+        else:
+            ranked = get_ranking_before_round(tournament.id, round_number)
+        ranked_set = set(ranked)
+        ranking = tuple(ranked) + tuple(pid for pid in player_ids if pid not in ranked_set)
+
+    bye_history = {
+        row['player_id']: (row['byes'], row['last_bye'])
+        for row in SitOut.objects.filter(tournament=tournament, round_number__lt=round_number)
+        .values('player_id').annotate(byes=Count('id'), last_bye=Max('round_number'))
+    }
+
+    return RoundState(
+        tournament_id=tournament.id,
+        format=tournament.format,
+        seed=tournament.seed,
+        round_number=round_number,
+        final_match=tournament.final_match,
+        mexicano_pairing=tournament.mexicano_pairing,
+        player_ids=player_ids,
+        court_ids=court_ids,
+        ranking=ranking,
+        bye_history=bye_history,
+        recent_partners=frozenset(recent_partners(tournament.id, round_number))
+        if (is_mexicano and not is_final) or is_balanced else frozenset(),
+        ratings=entry_ratings(tournament.id) if is_balanced else {},
+    )
@@ -1,6 +1,14 @@
 from collections import defaultdict
 
-from backend.tournaments.models import RankingSnapshot, Match, MatchPlayer
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When, Window
+from django.db.models.functions import Cast, Coalesce, NullIf, Rank
+
+from backend.tournaments.cache import bump_tournament_version
+from backend.tournaments.logic import ranking_modes
+from backend.tournaments.logic.ratings import update_round_ratings
+from backend.tournaments.logic.seasons import update_season_standings
+from backend.tournaments.models import RankingSnapshot, MatchPlayer, PlayerStanding, Tournament, SitOut
 
 def get_simplified_ranking(tournament_id):
     """
@@ -24,93 +32,329 @@ def get_tournament_ranking(tournament_id):
             "id": xxx,
             "name": "Player 1",
             "rounds": [
-                {"round_number": 1, "points": 8, "is_winner": True},
-                {"round_number": 2, "points": 6, "is_winner": False},
+                {"round_number": 1, "points": 8, "points_against": 5, "is_winner": True},
+                {"round_number": 2, "points": 6, "points_against": 9, "is_winner": False},
                 ]
             "total_points": 14,
+            "point_difference": 0,
             "win_loss_record": { "win": 1, "draw": 0, "loss":1},
             "win_rate": 50.0
         },
         ...
     ]
     """
+    # plain tuples straight from the cursor - no PlayerStanding/Player instances
+    standings = (
+        PlayerStanding.objects
+        .filter(tournament_id=tournament_id)
+        .order_by('player__name')
+        .values_list('player_id', 'player__name', 'rounds', 'total_points', 'point_difference', 'total_matches',
+                     'wins', 'draws', 'losses', 'tournament__result_sorting')
+    )
+
+    ranking, mode = [], None
+    for *entry, mode in standings:
+        ranking.append(_ranking_entry(*entry))
+    # sorted by the tournament's result_sorting, best first
+    return sort_ranking(ranking, mode, lambda: load_match_index(tournament_id))
+
+def aggregate_tournament_ranking(tournament, include_rounds=False):
+    """
+    Same ranking as get_tournament_ranking, totalled by the database: one grouped query over
+    the snapshots with a RANK() window for the position (players tied on every SQL criterion share it).
+    Per-round results cost a second query and are only included on request.
+    """
+    played = ~Q(result=RankingSnapshot.Result.BYE)
+    totals = (
+        RankingSnapshot.objects
+        .filter(tournament=tournament)
+        .values('player_id', name=F('player__name'))
+        .annotate(
+            total_points=Sum('points'),
+            total_matches=Count('id', filter=played),
+            wins=Count('id', filter=Q(result=RankingSnapshot.Result.WIN)),
+            draws=Count('id', filter=Q(result=RankingSnapshot.Result.DRAW)),
+            losses=Count('id', filter=Q(result=RankingSnapshot.Result.LOSS)),
+            point_difference=Sum(
+                Case(When(played, then=F('points') - F('points_against')), default=Value(0)),
+                output_field=IntegerField()
+            ),
+        )
+        .annotate(
+            # same integer arithmetic as ranking_modes.win_rate: SQL ROUND and Python round() disagree on .x5 ties
+            win_rate=Coalesce(Cast(
+                (F('wins') * 2000 + F('total_matches')) / NullIf(F('total_matches') * 2, 0),
+                FloatField()
+            ) / 10, Value(0.0)),
+        )
+    )
+    criteria = ranking_modes.sql_criteria(tournament.result_sorting)
+    totals = totals.annotate(
+        position=Window(Rank(), order_by=[F(criterion).desc() for criterion in criteria])
+    ).order_by('position', 'name')
+
+    rounds = defaultdict(list)
+    if include_rounds:
+        snapshots = (
+            RankingSnapshot.objects
+            .filter(tournament=tournament)
+            .order_by('round_number')
+            .values_list('player_id', 'round_number', 'points', 'points_against', 'result')
+        )
+        for player_id, *snapshot in snapshots:
+            rounds[player_id].append(_round_entry(*snapshot))
+
+    ranking = []
+    for row in totals:
+        entry = _ranking_entry(
+            row['player_id'], row['name'], rounds[row['player_id']], row['total_points'], row['point_difference'],
+            row['total_matches'], row['wins'], row['draws'], row['losses']
+        )
+        entry['position'] = row['position']
+        if not include_rounds:
+            del entry['rounds']
+        ranking.append(entry)
+    # only head-to-head can still reorder players sharing a position
+    return sort_ranking(ranking, tournament.result_sorting, lambda: load_match_index(tournament.id))
+
+def compute_ranking(player_ids, round_numbers, points, points_against, results, names=None,
+                    mode=Tournament.ResultSorting.POINTS, load_match_index=None):
+    """
+    Pure ranking core: builds the sorted ranking (same shape as get_tournament_ranking)
+    from parallel per-snapshot columns, e.g. straight from values_list.
+    results are RankingSnapshot.Result values.
+    names maps player id -> name; players tie in name order, or id order without names.
+    mode and load_match_index are passed to sort_ranking.
+    """
+    totals = {}
+    for player_id, round_number, player_points, against, result in zip(
+            player_ids, round_numbers, points, points_against, results):
+        total = totals.get(player_id)
+        if total is None:
+            total = totals[player_id] = RoundTotals()
+        total.add(round_number, player_points, against, result)
+
+    order = sorted(totals, key=(lambda pid: (names.get(pid, ''), pid)) if names else None)
+    ranking = []
+    for player_id in order:
+        total = totals[player_id]
+        total.rounds.sort(key=lambda r: r['round_number'])
+        ranking.append(_ranking_entry(
+            player_id, names.get(player_id) if names else None, total.rounds, total.points, total.point_difference,
+            total.matches, total.results[WIN], total.results[DRAW], total.results[LOSS]
+        ))
+    return sort_ranking(ranking, mode, load_match_index)
+
+# plain str constants, enum member lookups are slow in the per-row loop
+WIN, DRAW, LOSS, BYE = (str(result) for result in (
+    RankingSnapshot.Result.WIN, RankingSnapshot.Result.DRAW, RankingSnapshot.Result.LOSS, RankingSnapshot.Result.BYE
+))
+
+class RoundTotals:
+    """Running totals of one player's snapshots."""
+    __slots__ = ('points', 'point_difference', 'matches', 'results', 'rounds')
+
+    def __init__(self):
+        self.points = 0
+        self.point_difference = 0
+        self.matches = 0
+        self.results = {WIN: 0, DRAW: 0, LOSS: 0, BYE: 0}
+        self.rounds = []
+
+    def add(self, round_number, points, points_against, result, sign=1):
+        self.points += sign * points
+        self.results[result] += sign
+        # a bye brings compensation points only, it is not a played match
+        if result != BYE:
+            self.matches += sign
+            self.point_difference += sign * (points - points_against)
+        if sign > 0:
+            self.rounds.append(_round_entry(round_number, points, points_against, result))
+
+def sort_ranking(ranking, mode=Tournament.ResultSorting.POINTS, load_match_index=None):
+    """Sorts ranking entries best first by the result_sorting mode (see logic/ranking_modes.py)."""
+    return ranking_modes.sort_ranking(ranking, mode, load_match_index)
+
+def load_match_index(tournament_id, before_round=None):
+    """Head-to-head results of the tournament's played matches, in one query."""
+    match_players = MatchPlayer.objects.filter(match__tournament_id=tournament_id, match__played=True)
+    if before_round is not None:
+        match_players = match_players.filter(match__round_number__lt=before_round)
+    return ranking_modes.build_match_index(
+        match_players.order_by('match_id')
+        .values_list('match_id', 'player_id', 'team', 'match__team_1_score', 'match__team_2_score')
+    )
+
+def _round_entry(round_number, points, points_against, result):
+    return {
+        "round_number": round_number,
+        "points": points,
+        "points_against": points_against,
+        "is_winner": result == WIN,
+        "is_bye": result == BYE,
+    }
+
+def _ranking_entry(player_id, name, rounds, total_points, point_difference, total_matches, wins, draws, losses):
+    return {
+        "id": player_id,
+        "name": name,
+        "rounds": rounds,
+        "total_points": total_points,
+        "point_difference": point_difference,
+        "total_matches": total_matches,
+        "win_loss_record": {"win": wins, "draw": draws, "loss": losses},
+        "win_rate": ranking_modes.win_rate(wins, wins + draws + losses),
+    }
+
+
+def get_ranking_before_round(tournament_id, round_number):
+    """
+    Player ids in ranking order as it stood before the given round, rebuilt from snapshots
+    (used to replay past rounds - the standings only hold the current state).
+    """
+    tournament = Tournament.objects.only('result_sorting').get(pk=tournament_id)
     snapshots = (
         RankingSnapshot.objects
-        .filter(tournament_id=tournament_id)
-        .select_related('player', 'tournament')
-        .order_by('player__name', 'round_number')
+        .filter(tournament_id=tournament_id, round_number__lt=round_number)
+        .values_list('player_id', 'player__name', 'round_number', 'points', 'points_against', 'result')
     )
+    columns = list(zip(*snapshots)) or [()] * 6
+    player_ids, names, round_numbers, points, points_against, results = columns
 
-    ranking = defaultdict(lambda: {"rounds": [], "total_points": 0, "total_matches": 0, "win_loss_record": {"win": 0, "draw": 0, "loss": 0}, "name": "", "id": "", "win_rate": 0.0})
-
-    for snap in snapshots:
-        player_id = snap.player.id
-        player_data = ranking[player_id]
-
-        if not player_data['name']:
-            player_data['id'] = player_id
-            player_data['name'] = snap.player.name
-        player_data['rounds'].append({
-            "round_number": snap.round_number,
-            "points": snap.points,
-            "is_winner": snap.is_winner
-        })
-        player_data["total_matches"] += 1
-        player_data['total_points'] += snap.points
-        if snap.is_winner:
-            player_data['win_loss_record']['win'] += 1
-        elif snap.points == snap.tournament.points_per_match / 2:
-            player_data['win_loss_record']['draw'] += 1
-        else:
-            player_data['win_loss_record']['loss'] += 1
-
-    for player in ranking.values():
-        total_played = sum(player['win_loss_record'].values())
-        if total_played > 0:
-            player['win_rate'] = round(
-                (player['win_loss_record']['win'] / total_played) * 100, 1
-            )
+    ranking = compute_ranking(
+        player_ids, round_numbers, points, points_against, results, dict(zip(player_ids, names)),
+        tournament.result_sorting, lambda: load_match_index(tournament_id, before_round=round_number)
+    )
+    return [player['id'] for player in ranking]
+
+def bye_compensation_points(points_per_match):
+    """Points for sitting a round out - half of a match, as for a draw."""
+    return points_per_match // 2
+
+def round_deltas(round_number, old_snapshots, new_snapshots):
+    """
+    Per-player RoundTotals of a round re-snapshot: old_snapshots are the round's snapshots
+    being replaced (subtracted), new_snapshots the ones replacing them.
+    """
+    deltas = defaultdict(RoundTotals)
+    for snap, sign in [(snap, -1) for snap in old_snapshots] + [(snap, 1) for snap in new_snapshots]:
+        deltas[snap.player_id].add(round_number, snap.points, snap.points_against, snap.result, sign)
+    return deltas
+
+def update_player_standings(tournament, round_number, deltas):
+    """Applies per-round deltas (see round_deltas) to PlayerStanding rows."""
+    if not deltas:
+        return
+
+    standings = {
+        standing.player_id: standing
+        for standing in PlayerStanding.objects.filter(tournament=tournament, player_id__in=deltas.keys())
+    }
+    to_create, to_update, to_delete = [], [], []
+
+    for player_id, delta in deltas.items():
+        standing = standings.get(player_id)
+        if standing is None:
+            standing = PlayerStanding(tournament=tournament, player_id=player_id, rounds=[])
+        standing.total_points += delta.points
+        standing.point_difference += delta.point_difference
+        standing.total_matches += delta.matches
+        standing.wins += delta.results[WIN]
+        standing.draws += delta.results[DRAW]
+        standing.losses += delta.results[LOSS]
+        standing.rounds = sorted(
+            [r for r in standing.rounds if r['round_number'] != round_number] + delta.rounds,
+            key=lambda r: r['round_number']
+        )
+
+        if standing.pk is None:
+            if standing.rounds:
+                to_create.append(standing)
+        elif standing.rounds:
+            to_update.append(standing)
         else:
-            player['win_rate'] = 0.0
+            to_delete.append(standing.pk)
 
-    ranking_list = sorted(ranking.values(), key=lambda x: (x['total_points'], x['win_rate']), reverse = True)
-    # Convert to list sorted by total_points desc
-    return  ranking_list
+    PlayerStanding.objects.bulk_create(to_create)
+    PlayerStanding.objects.bulk_update(
+        to_update, ['total_points', 'point_difference', 'total_matches', 'wins', 'draws', 'losses', 'rounds']
+    )
+    if to_delete:
+        PlayerStanding.objects.filter(pk__in=to_delete).delete()
 
 def create_ranking_snapshots(tournament_id, round_number):
     """
-    Creates snapshot rankings for tournament and round.
+    Creates snapshot rankings for tournament and round
+    and applies the round's delta to the players' standings (and season standings) and ratings.
     """
 
-    RankingSnapshot.objects.filter(
-        tournament_id=tournament_id,
-        round_number=round_number
-    ).delete()
+    tournament = Tournament.objects.only('points_per_match', 'season_id', 'final_round').get(pk=tournament_id)
 
-    matches = Match.objects.filter(
-        tournament_id=tournament_id,
-        round_number=round_number,
-        played=True
-    ).prefetch_related('players')
+    with transaction.atomic():
+        round_snapshots = RankingSnapshot.objects.filter(
+            tournament_id=tournament_id,
+            round_number=round_number
+        )
+        old_snapshots = list(round_snapshots)
+        round_snapshots.delete()
 
-    if not matches.exists():
-        return
+        # one query for every player of every played match in the round
+        match_players = MatchPlayer.objects.filter(
+            match__tournament_id=tournament_id,
+            match__round_number=round_number,
+            match__played=True
+        ).values_list('player_id', 'team', 'match__team_1_score', 'match__team_2_score')
 
-    for match in matches:
-        team1_score = match.team_1_score or 0
-        team2_score = match.team_2_score or 0
+        new_snapshots = []
+        for player_id, team, team1_score, team2_score in match_players:
+            team1_score = team1_score or 0
+            team2_score = team2_score or 0
+            if team == MatchPlayer.TeamChoices.TEAM1:
+                points, points_against = team1_score, team2_score
+            else:
+                points, points_against = team2_score, team1_score
 
-        winning_team = None
-        if team1_score > team2_score:
-            winning_team = MatchPlayer.TeamChoices.TEAM1
-        elif team2_score > team1_score:
-            winning_team = MatchPlayer.TeamChoices.TEAM2
+            # integer comparison of both scores - a draw does not depend on points_per_match
+            if points > points_against:
+                result = RankingSnapshot.Result.WIN
+            elif points == points_against:
+                result = RankingSnapshot.Result.DRAW
+            else:
+                result = RankingSnapshot.Result.LOSS
 
-        for mp in MatchPlayer.objects.filter(match=match).select_related('player'):
-            RankingSnapshot.objects.create(
-                tournament=match.tournament,
-                player=mp.player,
+            new_snapshots.append(RankingSnapshot(
+                tournament=tournament,
+                player_id=player_id,
                 round_number=round_number,
-                points=team1_score if mp.team == MatchPlayer.TeamChoices.TEAM1 else team2_score,
-                is_winner=(mp.team == winning_team)
-            )
\ No newline at end of file
+                points=points,
+                points_against=points_against,
+                result=result,
+                is_winner=result == RankingSnapshot.Result.WIN
+            ))
+
+        # sit-outs are compensated only once the round has been played - missing the final is not a bye
+        if new_snapshots and round_number != tournament.final_round:
+            sit_outs = SitOut.objects.filter(
+                tournament_id=tournament_id,
+                round_number=round_number
+            ).values_list('player_id', flat=True)
+            new_snapshots += [
+                RankingSnapshot(
+                    tournament=tournament,
+                    player_id=player_id,
+                    round_number=round_number,
+                    points=bye_compensation_points(tournament.points_per_match),
+                    result=RankingSnapshot.Result.BYE,
+                    is_bye=True
+                )
+                for player_id in sit_outs
+            ]
+
+        RankingSnapshot.objects.bulk_create(new_snapshots)
+
+        deltas = round_deltas(round_number, old_snapshots, new_snapshots)
+        update_player_standings(tournament, round_number, deltas)
+        if tournament.season_id:
+            update_season_standings(tournament.season_id, deltas)
+        update_round_ratings(tournament_id, round_number)
+        bump_tournament_version(tournament_id)
@@ -0,0 +1,129 @@
+"""
+Ranking order per Tournament.result_sorting.
+
+A mode is a list of criteria. Every player gets one composite key (a tuple of criterion values)
+and the ranking is sorted once by it. Criteria are only evaluated while ties remain, so the
+match index (head-to-head) is loaded only when every other criterion ties.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import groupby
+
+from backend.tournaments.models import Tournament, MatchPlayer
+
+HEAD_TO_HEAD = 'head_to_head'
+
+# criterion name -> (value of a ranking entry, needs the match index)
+RANKING_CRITERIA = {
+    'points': (lambda player, index: player['total_points'], False),
+    'wins': (lambda player, index: player['win_loss_record']['win'], False),
+    'win_rate': (lambda player, index: player['win_rate'], False),
+    'point_difference': (lambda player, index: player['point_difference'], False),
+    # value depends on the tie group, filled in by ranking_keys
+    HEAD_TO_HEAD: (None, True),
+}
+
+RANKING_MODES = {
+    Tournament.ResultSorting.POINTS: ('points', 'win_rate', 'point_difference', HEAD_TO_HEAD),
+    Tournament.ResultSorting.WINS: ('wins', 'points', 'point_difference', HEAD_TO_HEAD),
+}
+
+
+# criteria the database can order by, as annotation names of the grouped ranking query
+SQL_CRITERIA = {
+    'points': 'total_points',
+    'wins': 'wins',
+    'win_rate': 'win_rate',
+    'point_difference': 'point_difference',
+}
+
+
+def win_rate(wins, total_played):
+    """
+    Percentage of won matches rounded half up to one decimal, in integers so the database
+    computes the same value (see ranking.aggregate_tournament_ranking). Seasons use it too.
+    """
+    return (wins * 2000 + total_played) // (total_played * 2) / 10 if total_played > 0 else 0.0
+
+
+def sql_criteria(mode):
+    """Leading criteria of the mode that the database can evaluate, as annotation names."""
+    criteria = RANKING_MODES.get(mode, RANKING_MODES[Tournament.ResultSorting.POINTS])
+    names = []
+    for criterion in criteria:
+        if criterion not in SQL_CRITERIA:
+            break
+        names.append(SQL_CRITERIA[criterion])
+    return names
+
+
+@dataclass(frozen=True)
+class MatchIndex:
+    # (player_id, opponent_id) -> wins minus losses of player against opponent
+    head_to_head: dict = field(default_factory=dict)
+
+
+def build_match_index(rows):
+    """
+    Builds the index in one pass over (match_id, player_id, team, team_1_score, team_2_score)
+    rows ordered by match_id.
+    """
+    head_to_head = defaultdict(int)
+
+    for _, players in groupby(rows, key=lambda row: row[0]):
+        teams = {MatchPlayer.TeamChoices.TEAM1: [], MatchPlayer.TeamChoices.TEAM2: []}
+        for _, player_id, team, team_1_score, team_2_score in players:
+            teams[team].append(player_id)
+        team_1_score, team_2_score = team_1_score or 0, team_2_score or 0
+
+        if team_1_score == team_2_score:
+            continue
+        winners, losers = teams[MatchPlayer.TeamChoices.TEAM1], teams[MatchPlayer.TeamChoices.TEAM2]
+        if team_2_score > team_1_score:
+            winners, losers = losers, winners
+        for winner in winners:
+            for loser in losers:
+                head_to_head[winner, loser] += 1
+                head_to_head[loser, winner] -= 1
+
+    return MatchIndex(dict(head_to_head))
+
+
+def ranking_keys(ranking, mode, load_match_index=None):
+    """
+    Composite sort key per player id for the given mode.
+    load_match_index is called at most once, and only when a criterion needing it is reached.
+    """
+    criteria = RANKING_MODES.get(mode, RANKING_MODES[Tournament.ResultSorting.POINTS])
+    keys = {player['id']: () for player in ranking}
+    index = None
+
+    for criterion in criteria:
+        tie_sizes = Counter(keys.values())
+        if all(size == 1 for size in tie_sizes.values()):
+            break
+
+        value, needs_index = RANKING_CRITERIA[criterion]
+        if needs_index and index is None:
+            index = load_match_index() if load_match_index else MatchIndex()
+
+        if criterion == HEAD_TO_HEAD:
+            # results against the other players of the same tie group
+            groups = defaultdict(list)
+            for player_id, key in keys.items():
+                groups[key].append(player_id)
+            for group in groups.values():
+                for player_id in group:
+                    score = sum(index.head_to_head.get((player_id, other), 0) for other in group if other != player_id)
+                    keys[player_id] += (score,)
+        else:
+            for player in ranking:
+                keys[player['id']] += (value(player, index),)
+
+    return keys
+
+
+def sort_ranking(ranking, mode=Tournament.ResultSorting.POINTS, load_match_index=None):
+    """Sorts ranking entries best first - stable, so fully tied players keep their incoming order."""
+    keys = ranking_keys(ranking, mode, load_match_index)
+    return sorted(ranking, key=lambda player: keys[player['id']], reverse=True)
@@ -0,0 +1,307 @@
+"""
+Elo ratings of player profiles from doubles results.
+
+A team plays at the mean rating of its players and both players of a team move by the same amount.
+Results are applied per round as append-only RatingEvent rows (update_round_ratings, called with
+every snapshot write); recompute_ratings replays the whole history for backfills and rule changes.
+Players without a profile play at DEFAULT_RATING and are not rated.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from backend.tournaments.models import MatchPlayer, Player, PlayerProfile, RankingSnapshot, RatingEvent
+
+try:
+    import numpy as np
+except ImportError:
+    # recompute_ratings falls back to the sequential replay
+    np = None
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32.0
+# rating gap at which the stronger team is expected to score 10 to 1
+SCALE = 400.0
+
+WIN, DRAW, LOSS = RankingSnapshot.Result.WIN.value, RankingSnapshot.Result.DRAW.value, RankingSnapshot.Result.LOSS.value
+RESULT_SCORES = {WIN: 1.0, DRAW: 0.5, LOSS: 0.0}
+
+TEAM1 = MatchPlayer.TeamChoices.TEAM1
+
+
+def expected_score(rating, opponent_rating):
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / SCALE))
+
+
+def team_result(team, team_1_score, team_2_score):
+    """Result of the given team, from both scores."""
+    points, points_against = team_1_score or 0, team_2_score or 0
+    if team != TEAM1:
+        points, points_against = points_against, points
+    if points > points_against:
+        return WIN
+    if points == points_against:
+        return DRAW
+    return LOSS
+
+
+def entry_ratings(tournament_id):
+    """
+    player_id -> rating the player entered the tournament with: stored on the player when the first
+    round of a balanced tournament is written (see store_entry_ratings), so neither the tournament's
+    own results nor later tournaments change it between rounds or replays. Until then it is the
+    current profile rating.
+    """
+    players = (
+        Player.objects
+        .filter(tournament_id=tournament_id)
+        .values_list('id', Coalesce('entry_rating', 'profile__rating', Value(DEFAULT_RATING)))
+    )
+    return dict(players)
+
+
+def store_entry_ratings(tournament_id):
+    """Freezes the current profile ratings of the tournament's players, in one UPDATE."""
+    Player.objects.filter(tournament_id=tournament_id, entry_rating__isnull=True).update(
+        entry_rating=Coalesce(
+            Subquery(PlayerProfile.objects.filter(pk=OuterRef('profile_id')).values('rating')[:1]),
+            Value(DEFAULT_RATING)
+        )
+    )
+
+
+def update_round_ratings(tournament_id, round_number):
+    """
+    Rates the played matches of a round that are not rated yet, and re-rates corrected ones.
+    A match whose result changed (or which is no longer played) gets a REVERSAL event per rated
+    player before the new RESULT events, so the history is only ever appended to.
+    """
+    rows = (
+        MatchPlayer.objects
+        .filter(match__tournament_id=tournament_id, match__round_number=round_number)
+        .order_by('match_id')
+        .values_list('match_id', 'player__profile_id', 'team', 'match__played', 'match__team_1_score',
+                     'match__team_2_score')
+    )
+    matches = defaultdict(list)
+    for match_id, profile_id, team, played, team_1_score, team_2_score in rows:
+        result = team_result(team, team_1_score, team_2_score) if played else None
+        matches[match_id].append((profile_id, team, result))
+    if not matches:
+        return
+
+    with transaction.atomic():
+        # RESULT events that have not been reverted, per match
+        rated = defaultdict(dict)
+        events = (
+            RatingEvent.objects
+            .filter(match_id__in=matches.keys())
+            .order_by('id')
+            .values_list('match_id', 'profile_id', 'kind', 'result', 'delta')
+        )
+        for match_id, profile_id, kind, result, delta in events:
+            if kind == RatingEvent.Kind.RESULT:
+                rated[match_id][profile_id] = (result, delta)
+            else:
+                rated[match_id].pop(profile_id, None)
+
+        profile_ids = {profile_id for players in matches.values() for profile_id, _, _ in players if profile_id}
+        profile_ids.update(profile_id for match in rated.values() for profile_id in match)
+        if not profile_ids:
+            return
+        ratings = dict(
+            PlayerProfile.objects.select_for_update().filter(pk__in=profile_ids).values_list('id', 'rating')
+        )
+
+        new_events = []
+        for match_id, players in matches.items():
+            wanted = {profile_id: result for profile_id, _, result in players if profile_id and result}
+            current = rated.get(match_id, {})
+            if {profile_id: result for profile_id, (result, _) in current.items()} == wanted:
+                continue
+
+            for profile_id, (result, delta) in current.items():
+                ratings[profile_id] -= delta
+                new_events.append(RatingEvent(
+                    profile_id=profile_id, match_id=match_id, kind=RatingEvent.Kind.REVERSAL, result=result,
+                    delta=-delta, rating=ratings[profile_id]
+                ))
+            if not wanted:
+                continue
+
+            teams = defaultdict(list)
+            for profile_id, team, _ in players:
+                teams[team == TEAM1].append(ratings[profile_id] if profile_id else DEFAULT_RATING)
+            team_1_rating = sum(teams[True]) / len(teams[True])
+            team_2_rating = sum(teams[False]) / len(teams[False])
+            team_1_result = next(result for _, team, result in players if team == TEAM1)
+            gain = K_FACTOR * (RESULT_SCORES[team_1_result] - expected_score(team_1_rating, team_2_rating))
+
+            for profile_id, team, result in players:
+                if not profile_id:
+                    continue
+                delta = gain if team == TEAM1 else -gain
+                ratings[profile_id] += delta
+                new_events.append(RatingEvent(
+                    profile_id=profile_id, match_id=match_id, result=result, delta=delta,
+                    rating=ratings[profile_id]
+                ))
+
+        if new_events:
+            RatingEvent.objects.bulk_create(new_events)
+            changed = {event.profile_id for event in new_events}
+            PlayerProfile.objects.bulk_update(
+                [PlayerProfile(pk=profile_id, rating=ratings[profile_id]) for profile_id in changed], ['rating']
+            )
+
+
+def replay_ratings(match_index, profile_index, team_1_side, team_1_scores, n_profiles, k_factor=K_FACTOR):
+    """
+    Sequential replay. Rows are one per match player, grouped by match in playing order:
+    match_index (0..n_matches-1), profile_index (0..n_profiles-1, -1 for a player without a profile),
+    team_1_side (True for team 1). team_1_scores holds 1, 0.5 or 0 per match.
+    Returns the final rating per profile and the rating change per row.
+    """
+    ratings = [DEFAULT_RATING] * n_profiles
+    deltas = [0.0] * len(match_index)
+    n_rows = len(match_index)
+    start = 0
+    while start < n_rows:
+        match = match_index[start]
+        end = start
+        sums, sizes = [0.0, 0.0], [0, 0]
+        while end < n_rows and match_index[end] == match:
+            profile = profile_index[end]
+            side = 0 if team_1_side[end] else 1
+            sums[side] += ratings[profile] if profile >= 0 else DEFAULT_RATING
+            sizes[side] += 1
+            end += 1
+
+        gain = k_factor * (team_1_scores[match] - expected_score(sums[0] / sizes[0], sums[1] / sizes[1]))
+        for row in range(start, end):
+            delta = gain if team_1_side[row] else -gain
+            deltas[row] = delta
+            if profile_index[row] >= 0:
+                ratings[profile_index[row]] += delta
+        start = end
+    return ratings, deltas
+
+
+def replay_ratings_vectorized(match_index, profile_index, team_1_side, team_1_scores, n_profiles,
+                              k_factor=K_FACTOR):
+    """
+    Same as replay_ratings, with NumPy. Matches are rated in waves: a wave holds every match whose
+    players have no earlier match left to rate, so no player appears twice in it and the whole wave
+    is rated with a handful of array operations. A history needs about as many waves as its busiest
+    player has matches.
+    """
+    match_index = np.asarray(match_index, dtype=np.int64)
+    profile_index = np.asarray(profile_index, dtype=np.int64)
+    team_1_side = np.asarray(team_1_side, dtype=bool)
+    team_1_scores = np.asarray(team_1_scores, dtype=np.float64)
+    n_matches, n_rows = len(team_1_scores), len(match_index)
+
+    # next match of the same profile per row, and the number of earlier matches each match waits for
+    by_profile = np.argsort(profile_index, kind='stable')
+    sorted_profiles = profile_index[by_profile]
+    follows = (sorted_profiles[1:] == sorted_profiles[:-1]) & (sorted_profiles[1:] >= 0)
+    next_match = np.full(n_rows, -1, dtype=np.int64)
+    next_match[by_profile[:-1][follows]] = match_index[by_profile[1:][follows]]
+    waiting = np.bincount(match_index[by_profile[1:][follows]], minlength=n_matches)
+
+    match_sizes = np.bincount(match_index, minlength=n_matches)
+    match_starts = np.concatenate(([0], np.cumsum(match_sizes)[:-1]))
+    team_1_sizes = np.bincount(match_index, weights=team_1_side, minlength=n_matches)
+    team_2_sizes = match_sizes - team_1_sizes
+    # players without a profile share one extra slot, reset after every wave
+    guest = n_profiles
+    players = np.where(profile_index >= 0, profile_index, guest)
+    signs = np.where(team_1_side, 1.0, -1.0)
+
+    ratings = np.full(n_profiles + 1, DEFAULT_RATING)
+    deltas = np.zeros(n_rows)
+    wave = np.flatnonzero(waiting == 0)
+    while len(wave):
+        sizes = match_sizes[wave]
+        offsets = np.cumsum(sizes) - sizes
+        local = np.repeat(np.arange(len(wave)), sizes)
+        rows = np.repeat(match_starts[wave] - offsets, sizes) + np.arange(sizes.sum())
+
+        team_1_sums = np.bincount(local, weights=ratings[players[rows]] * team_1_side[rows], minlength=len(wave))
+        team_sums = np.bincount(local, weights=ratings[players[rows]], minlength=len(wave))
+        team_1_rating = team_1_sums / team_1_sizes[wave]
+        team_2_rating = (team_sums - team_1_sums) / team_2_sizes[wave]
+        gains = k_factor * (team_1_scores[wave] - 1 / (1 + 10 ** ((team_2_rating - team_1_rating) / SCALE)))
+
+        row_deltas = gains[local] * signs[rows]
+        deltas[rows] = row_deltas
+        ratings[players[rows]] += row_deltas
+        ratings[guest] = DEFAULT_RATING
+
+        unblocked = next_match[rows]
+        unblocked, counts = np.unique(unblocked[unblocked >= 0], return_counts=True)
+        waiting[unblocked] -= counts
+        wave = unblocked[waiting[unblocked] == 0]
+
+    return ratings[:guest], deltas
+
+
+def recompute_ratings(k_factor=K_FACTOR, chunk_size=2000):
+    """
+    Replays every played match in playing order (tournament creation, round, match) and replaces
+    the rating history with the result. Every profile starts again from DEFAULT_RATING.
+    """
+    rows = (
+        MatchPlayer.objects
+        .filter(match__played=True)
+        .order_by('match__tournament__created_at', 'match__tournament_id', 'match__round_number', 'match_id')
+        .values_list('match_id', 'player__profile_id', 'team', 'match__team_1_score', 'match__team_2_score')
+        .iterator(chunk_size=chunk_size)
+    )
+
+    match_ids, team_1_scores, profile_ids = [], [], []
+    match_index, profile_index, team_1_side, results = [], [], [], []
+    profiles = {}
+    for match_id, profile_id, team, team_1_score, team_2_score in rows:
+        if not match_ids or match_ids[-1] != match_id:
+            match_ids.append(match_id)
+            team_1_scores.append(RESULT_SCORES[team_result(TEAM1, team_1_score, team_2_score)])
+        match_index.append(len(match_ids) - 1)
+        if profile_id is None:
+            profile_index.append(-1)
+        else:
+            if profile_id not in profiles:
+                profiles[profile_id] = len(profile_ids)
+                profile_ids.append(profile_id)
+            profile_index.append(profiles[profile_id])
+        team_1_side.append(team == TEAM1)
+        results.append(team_result(team, team_1_score, team_2_score))
+
+    replay = replay_ratings_vectorized if np is not None else replay_ratings
+    ratings, deltas = replay(match_index, profile_index, team_1_side, team_1_scores, len(profile_ids), k_factor)
+    ratings, deltas = [float(rating) for rating in ratings], [float(delta) for delta in deltas]
+
+    running = list(ratings)
+    events = []
+    # rating after each event, walking the history backwards from the final ratings
+    for row in range(len(match_index) - 1, -1, -1):
+        profile = profile_index[row]
+        if profile < 0:
+            continue
+        events.append(RatingEvent(
+            profile_id=profile_ids[profile], match_id=match_ids[match_index[row]], result=results[row],
+            delta=deltas[row], rating=running[profile]
+        ))
+        running[profile] -= deltas[row]
+    events.reverse()
+
+    with transaction.atomic():
+        RatingEvent.objects.all().delete()
+        RatingEvent.objects.bulk_create(events, batch_size=chunk_size)
+        PlayerProfile.objects.update(rating=DEFAULT_RATING)
+        PlayerProfile.objects.bulk_update(
+            [PlayerProfile(pk=profile_id, rating=rating) for profile_id, rating in zip(profile_ids, ratings)],
+            ['rating'], batch_size=chunk_size
+        )
@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from backend.tournaments.cache import bump_tournament_version
+from backend.tournaments.logic.ratings import store_entry_ratings
+from backend.tournaments.models import Match, MatchPlayer, Tournament, SitOut
+
+
+class RoundConflictError(Exception):
+    """Raised when the tournament's round counter moved while a round was being written."""
+
+
+def materialize_round(tournament, plan, updates=None):
+    """
+    Writes a planned round (logic/planning.RoundPlan) in one transaction:
+    one conditional UPDATE bumping tournament.number_of_rounds (and status/final_round),
+    one bulk INSERT for matches, one for match players and one for sit-outs.
+    The first round of a balanced tournament also stores the players' entry ratings (one UPDATE).
+
+    updates: extra tournament fields written by the same UPDATE.
+    Returns the number of the created round.
+    """
+    previous_round = tournament.number_of_rounds
+    current_round = previous_round + 1
+    if plan.round_number != current_round:
+        raise RoundConflictError(f"Plan is for round {plan.round_number}, next round is {current_round}.")
+
+    tournament_changes = {
+        "number_of_rounds": F('number_of_rounds') + 1,
+        # first generated round starts the tournament
+        "status": Case(
+            When(status=Tournament.TournamentStatus.NEW, then=Value(Tournament.TournamentStatus.IN_PROGRESS)),
+            default=F('status'),
+        ),
+    }
+    if plan.is_final:
+        tournament_changes["final_round"] = current_round
+    tournament_changes.update(updates or {})
+
+    with transaction.atomic():
+        # compare-and-swap on the round counter - nobody else may have generated this round
+        updated = Tournament.objects.filter(
+            pk=tournament.pk,
+            number_of_rounds=previous_round
+        ).update(**tournament_changes)
+        if not updated:
+            raise RoundConflictError(f"Round {current_round} was already generated for tournament {tournament.pk}.")
+
+        matches = Match.objects.bulk_create([
+            Match(tournament=tournament, round_number=current_round, court_id=court_id, played=False)
+            for court_id, _ in plan.matches
+        ])
+
+        MatchPlayer.objects.bulk_create([
+            MatchPlayer(match=match, player_id=player_id, team=team)
+            for match, (_, players) in zip(matches, plan.matches)
+            for player_id, team in players
+        ])
+
+        SitOut.objects.bulk_create([
+            SitOut(tournament=tournament, player_id=player_id, round_number=current_round)
+            for player_id in plan.sit_outs
+        ])
+
+        if previous_round == 0 and tournament.format == Tournament.TournamentFormat.BALANCED:
+            store_entry_ratings(tournament.pk)
+
+        bump_tournament_version(tournament.pk)
+
+    tournament.number_of_rounds = current_round
+    if tournament.status == Tournament.TournamentStatus.NEW:
+        tournament.status = Tournament.TournamentStatus.IN_PROGRESS
+    if plan.is_final:
+        tournament.final_round = current_round
+    for field, value in (updates or {}).items():
+        setattr(tournament, field, value)
+
+    return current_round
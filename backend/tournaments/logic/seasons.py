@@ -0,0 +1,125 @@
+"""
+Season aggregates over player profiles.
+
+SeasonStanding rows are updated with the same per-round deltas as PlayerStanding
+(see ranking.create_ranking_snapshots), so a season leaderboard reads one row per profile.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from backend.tournaments.logic.ranking_modes import win_rate
+from backend.tournaments.models import Player, PlayerStanding, RankingSnapshot, SeasonStanding
+
+STANDING_FIELDS = ['total_points', 'point_difference', 'total_matches', 'wins', 'draws', 'losses', 'rounds']
+
+
+def update_season_standings(season_id, deltas):
+    """
+    Applies per-round deltas of tournament players (player_id -> RoundTotals, see ranking.round_deltas)
+    to the season standings of their profiles. Players without a profile are skipped.
+    """
+    profiles = dict(
+        Player.objects.filter(pk__in=deltas.keys(), profile__isnull=False).values_list('id', 'profile_id')
+    )
+    if not profiles:
+        return
+
+    standings = {
+        standing.profile_id: standing
+        for standing in SeasonStanding.objects.filter(season_id=season_id, profile_id__in=profiles.values())
+    }
+    to_create, to_update, to_delete = [], [], []
+    for player_id, profile_id in profiles.items():
+        delta = deltas[player_id]
+        standing = standings.get(profile_id) or SeasonStanding(season_id=season_id, profile_id=profile_id)
+        standing.total_points += delta.points
+        standing.point_difference += delta.point_difference
+        standing.total_matches += delta.matches
+        standing.wins += delta.results[RankingSnapshot.Result.WIN]
+        standing.draws += delta.results[RankingSnapshot.Result.DRAW]
+        standing.losses += delta.results[RankingSnapshot.Result.LOSS]
+        standing.rounds += sum(delta.results.values())
+
+        if standing.pk is None:
+            if standing.rounds:
+                to_create.append(standing)
+        elif standing.rounds:
+            to_update.append(standing)
+        else:
+            to_delete.append(standing.pk)
+
+    SeasonStanding.objects.bulk_create(to_create)
+    SeasonStanding.objects.bulk_update(to_update, STANDING_FIELDS)
+    if to_delete:
+        SeasonStanding.objects.filter(pk__in=to_delete).delete()
+
+
+def rebuild_season_standings(season_id):
+    """
+    Recomputes a season from the tournament standings - for profiles linked or tournaments
+    moved into the season after their results were in. One grouped query, one row per profile.
+    """
+    totals = (
+        PlayerStanding.objects
+        .filter(tournament__season_id=season_id, player__profile__isnull=False)
+        .values(profile_id=F('player__profile_id'))
+        .annotate(
+            sum_points=Sum('total_points'),
+            sum_point_difference=Sum('point_difference'),
+            sum_matches=Sum('total_matches'),
+            sum_wins=Sum('wins'),
+            sum_draws=Sum('draws'),
+            sum_losses=Sum('losses'),
+        )
+    )
+    rounds = dict(
+        RankingSnapshot.objects
+        .filter(tournament__season_id=season_id, player__profile__isnull=False)
+        .values('player__profile_id')
+        .annotate(rounds=Count('id'))
+        .values_list('player__profile_id', 'rounds')
+    )
+
+    with transaction.atomic():
+        SeasonStanding.objects.filter(season_id=season_id).delete()
+        SeasonStanding.objects.bulk_create([
+            SeasonStanding(
+                season_id=season_id,
+                profile_id=row['profile_id'],
+                total_points=row['sum_points'],
+                point_difference=row['sum_point_difference'],
+                total_matches=row['sum_matches'],
+                wins=row['sum_wins'],
+                draws=row['sum_draws'],
+                losses=row['sum_losses'],
+                rounds=rounds.get(row['profile_id'], 0),
+            )
+            for row in totals
+        ])
+
+
+def get_season_leaderboard(season_id):
+    """
+    Season leaderboard best first, read straight from the season standings:
+    [{"profile_id": 1, "display_name": "Ania", "total_points": 120, "point_difference": 14,
+      "total_matches": 9, "win_loss_record": {"win": 6, "draw": 0, "loss": 3}, "win_rate": 66.7}, ...]
+    """
+    standings = (
+        SeasonStanding.objects
+        .filter(season_id=season_id)
+        .order_by('-total_points', '-point_difference', 'profile__display_name')
+        .values_list('profile_id', 'profile__display_name', 'total_points', 'point_difference', 'total_matches',
+                     'wins', 'draws', 'losses')
+    )
+    return [
+        {
+            "profile_id": profile_id,
+            "display_name": display_name,
+            "total_points": total_points,
+            "point_difference": point_difference,
+            "total_matches": total_matches,
+            "win_loss_record": {"win": wins, "draw": draws, "loss": losses},
+            "win_rate": win_rate(wins, wins + draws + losses),
+        }
+        for profile_id, display_name, total_points, point_difference, total_matches, wins, draws, losses in standings
+    ]
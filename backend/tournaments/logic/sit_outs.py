@@ -0,0 +1,23 @@
+"""
+Who sits a round out when the players do not fill the courts - one rule for every format.
+
+Only full groups of four play. The sit-outs are the players with the fewest byes so far,
+then those whose last bye is the oldest; the remaining ties are broken by a seeded rng.
+The Americano schedule applies the rule to its slots, Mexicano rounds to the players.
+"""
+import heapq
+
+
+def playing_count(n_players, n_courts):
+    """Number of players that fit on the courts this round - full groups of four only."""
+    return min(n_players // 4, n_courts) * 4
+
+
+def pick_sit_outs(candidates, n_sit_outs, bye_key, rng):
+    """
+    The n_sit_outs candidates sitting out, as a set.
+    bye_key(candidate) gives (byes so far, round of the last bye) - the smallest keys sit out.
+    """
+    candidates = list(candidates)
+    rng.shuffle(candidates)
+    return set(heapq.nsmallest(n_sit_outs, candidates, key=bye_key))
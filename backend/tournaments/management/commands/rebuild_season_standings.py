@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.tournaments.logic.seasons import rebuild_season_standings
+from backend.tournaments.models import Season
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds season standings from the tournament standings - after linking profiles to players "
+        "or moving tournaments into a season once their results were in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('season_ids', nargs='*', type=int, help="Seasons to rebuild, all of them when omitted.")
+
+    def handle(self, *args, **options):
+        season_ids = options['season_ids'] or list(Season.objects.order_by('id').values_list('id', flat=True))
+        missing = set(season_ids) - set(Season.objects.filter(id__in=season_ids).values_list('id', flat=True))
+        if missing:
+            raise CommandError(f"Unknown season ids: {', '.join(map(str, sorted(missing)))}")
+
+        start = time.perf_counter()
+        for season_id in season_ids:
+            rebuild_season_standings(season_id)
+        self.stdout.write(f"{len(season_ids)} season(s) rebuilt in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.tournaments.logic import ratings
+
+
+class Command(BaseCommand):
+    help = "Replays every played match and rebuilds the player profile ratings and their rating history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--k-factor', type=float, default=ratings.K_FACTOR)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        ratings.recompute_ratings(k_factor=options['k_factor'], chunk_size=options['chunk_size'])
+        engine = "NumPy" if ratings.np is not None else "sequential"
+        self.stdout.write(f"Ratings recomputed ({engine} replay) in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_standings(apps, schema_editor):
+    RankingSnapshot = apps.get_model('tournaments', 'RankingSnapshot')
+    PlayerStanding = apps.get_model('tournaments', 'PlayerStanding')
+
+    standings = {}
+    snapshots = (
+        RankingSnapshot.objects
+        .select_related('tournament')
+        .order_by('tournament_id', 'player_id', 'round_number')
+    )
+    for snap in snapshots.iterator(chunk_size=2000):
+        key = (snap.tournament_id, snap.player_id)
+        standing = standings.get(key)
+        if standing is None:
+            standing = standings[key] = PlayerStanding(
+                tournament_id=snap.tournament_id, player_id=snap.player_id, rounds=[]
+            )
+        standing.total_points += snap.points
+        standing.total_matches += 1
+        if snap.is_winner:
+            standing.wins += 1
+        elif snap.points * 2 == snap.tournament.points_per_match:
+            standing.draws += 1
+        else:
+            standing.losses += 1
+        standing.rounds.append({
+            "round_number": snap.round_number,
+            "points": snap.points,
+            "is_winner": snap.is_winner,
+        })
+
+    PlayerStanding.objects.bulk_create(standings.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.PositiveIntegerField(default=0)),
+                ('total_matches', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('draws', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('rounds', models.JSONField(default=list)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='tournaments.player')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='tournaments.tournament')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tournament', 'player'), name='unique_standing_per_player')],
+            },
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
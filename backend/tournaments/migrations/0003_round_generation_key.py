@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0002_player_standing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundGenerationKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('round_number', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_generation_keys', to='tournaments.tournament')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tournament', 'key'), name='unique_round_generation_key_per_tournament')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0003_round_generation_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'round_number'], name='match_tournament_round_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rankingsnapshot',
+            index=models.Index(fields=['tournament', 'round_number'], name='snapshot_tournament_round_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rankingsnapshot',
+            index=models.Index(fields=['tournament', 'player', 'round_number', 'points', 'is_winner'], name='snapshot_ranking_cover_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0004_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['-created_at', '-id'], name='tournament_created_idx'),
+        ),
+    ]
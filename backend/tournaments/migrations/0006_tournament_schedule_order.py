@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0005_tournament_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='schedule_order',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0006_tournament_schedule_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingsnapshot',
+            name='is_bye',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='SitOut',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round_number', models.PositiveIntegerField()),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sit_outs', to='tournaments.player')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sit_outs', to='tournaments.tournament')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tournament', 'round_number', 'player'), name='unique_sit_out_per_round')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0007_sit_outs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='mexicano_pairing',
+            field=models.IntegerField(choices=[(1, '1 & 3 vs 2 & 4'), (2, '1 & 2 vs 3 & 4'), (3, '1 & 4 vs 2 & 3')], default=3),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:21
+
+import backend.tournaments.models
+from django.db import migrations, models
+
+
+def reseed_tournaments(apps, schema_editor):
+    # AddField evaluates the default once, give every existing tournament its own seed
+    Tournament = apps.get_model('tournaments', 'Tournament')
+    tournaments = list(Tournament.objects.only('id'))
+    for tournament in tournaments:
+        tournament.seed = backend.tournaments.models.new_tournament_seed()
+    Tournament.objects.bulk_update(tournaments, ['seed'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0008_mexicano_pairing'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='tournament',
+            name='schedule_order',
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='seed',
+            field=models.PositiveBigIntegerField(default=backend.tournaments.models.new_tournament_seed, editable=False),
+        ),
+        migrations.RunPython(reseed_tournaments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+def backfill_results(apps, schema_editor):
+    RankingSnapshot = apps.get_model('tournaments', 'RankingSnapshot')
+    MatchPlayer = apps.get_model('tournaments', 'MatchPlayer')
+    PlayerStanding = apps.get_model('tournaments', 'PlayerStanding')
+
+    # (tournament, round, player) -> (own score, opponents' score)
+    scores = {}
+    match_players = MatchPlayer.objects.filter(match__played=True).values_list(
+        'match__tournament_id', 'match__round_number', 'player_id', 'team',
+        'match__team_1_score', 'match__team_2_score'
+    )
+    for tournament_id, round_number, player_id, team, team_1_score, team_2_score in match_players.iterator():
+        team_1_score, team_2_score = team_1_score or 0, team_2_score or 0
+        scores[tournament_id, round_number, player_id] = (
+            (team_1_score, team_2_score) if team == 'team1' else (team_2_score, team_1_score)
+        )
+
+    # standings were built with the old "half of points_per_match is a draw" rule, so their
+    # results and rounds are rebuilt from the snapshots along with the point difference
+    standings = {}
+    snapshots = RankingSnapshot.objects.order_by('tournament_id', 'player_id', 'round_number')
+    to_update = []
+    for snap in snapshots.iterator(chunk_size=2000):
+        if snap.is_bye:
+            snap.result = 'BYE'
+        else:
+            _, snap.points_against = scores.get((snap.tournament_id, snap.round_number, snap.player_id), (0, 0))
+            snap.result = (
+                'WIN' if snap.is_winner else 'DRAW' if snap.points == snap.points_against else 'LOSS'
+            )
+        to_update.append(snap)
+
+        key = (snap.tournament_id, snap.player_id)
+        totals = standings.setdefault(key, {
+            'total_points': 0, 'point_difference': 0, 'total_matches': 0,
+            'wins': 0, 'draws': 0, 'losses': 0, 'rounds': [],
+        })
+        totals['total_points'] += snap.points
+        if not snap.is_bye:
+            totals['total_matches'] += 1
+            totals['point_difference'] += snap.points - snap.points_against
+            totals[{'WIN': 'wins', 'DRAW': 'draws', 'LOSS': 'losses'}[snap.result]] += 1
+        totals['rounds'].append({
+            "round_number": snap.round_number,
+            "points": snap.points,
+            "points_against": snap.points_against,
+            "is_winner": snap.result == 'WIN',
+            "is_bye": snap.is_bye,
+        })
+    RankingSnapshot.objects.bulk_update(to_update, ['points_against', 'result'], batch_size=1000)
+
+    fields = ['total_points', 'point_difference', 'total_matches', 'wins', 'draws', 'losses', 'rounds']
+    to_update = []
+    for standing in PlayerStanding.objects.all():
+        totals = standings.get((standing.tournament_id, standing.player_id))
+        if totals is None:
+            continue
+        for field in fields:
+            setattr(standing, field, totals[field])
+        to_update.append(standing)
+    PlayerStanding.objects.bulk_update(to_update, fields, batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0009_tournament_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerstanding',
+            name='point_difference',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rankingsnapshot',
+            name='points_against',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rankingsnapshot',
+            name='result',
+            field=models.CharField(choices=[('WIN', 'Win'), ('DRAW', 'Draw'), ('LOSS', 'Loss'), ('BYE', 'Bye')], default='LOSS', max_length=4),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_results, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0011_seasons_and_profiles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerprofile',
+            name='rating',
+            field=models.FloatField(default=1500.0),
+        ),
+        migrations.CreateModel(
+            name='RatingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('RESULT', 'Result'), ('REVERSAL', 'Reversal')], default='RESULT', max_length=10)),
+                ('result', models.CharField(choices=[('WIN', 'Win'), ('DRAW', 'Draw'), ('LOSS', 'Loss'), ('BYE', 'Bye')], max_length=4)),
+                ('delta', models.FloatField()),
+                ('rating', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rating_events', to='tournaments.match')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_events', to='tournaments.playerprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', 'id'], name='rating_history_idx')],
+            },
+        ),
+    ]
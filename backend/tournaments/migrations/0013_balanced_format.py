@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0012_rating_events'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tournament',
+            name='format',
+            field=models.CharField(choices=[('AMERICANO', 'Americano'), ('MEXICANO', 'Mexicano'), ('BALANCED', 'Balanced')], max_length=20),
+        ),
+    ]
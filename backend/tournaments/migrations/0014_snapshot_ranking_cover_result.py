@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0013_balanced_format'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='rankingsnapshot',
+            name='snapshot_ranking_cover_idx',
+        ),
+        migrations.AddIndex(
+            model_name='rankingsnapshot',
+            index=models.Index(fields=['tournament', 'player', 'round_number', 'points', 'points_against', 'result'], name='snapshot_ranking_cover_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+
+def unlink_duplicate_profiles(apps, schema_editor):
+    # keep the first entry of a profile in each tournament, later ones become guests
+    Player = apps.get_model('tournaments', 'Player')
+    seen = set()
+    duplicates = []
+    players = Player.objects.filter(profile__isnull=False).order_by('id').values_list('id', 'tournament_id', 'profile_id')
+    for player_id, tournament_id, profile_id in players.iterator():
+        if (tournament_id, profile_id) in seen:
+            duplicates.append(player_id)
+        seen.add((tournament_id, profile_id))
+    Player.objects.filter(id__in=duplicates).update(profile=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0014_snapshot_ranking_cover_result'),
+    ]
+
+    operations = [
+        migrations.RunPython(unlink_duplicate_profiles, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='player',
+            constraint=models.UniqueConstraint(fields=('tournament', 'profile'), name='unique_profile_per_tournament'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:06
+
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from django.db import migrations, models
+
+DEFAULT_RATING = 1500.0
+
+
+def backfill_entry_ratings(apps, schema_editor):
+    # started balanced tournaments enter at the rating of every earlier tournament played, in replay order
+    Player = apps.get_model('tournaments', 'Player')
+    RatingEvent = apps.get_model('tournaments', 'RatingEvent')
+
+    # profile -> [(tournament order, sum of its deltas)]
+    totals = defaultdict(lambda: defaultdict(float))
+    events = RatingEvent.objects.filter(match__isnull=False).values_list(
+        'profile_id', 'match__tournament__created_at', 'match__tournament_id', 'delta'
+    )
+    for profile_id, created_at, tournament_id, delta in events.iterator():
+        totals[profile_id][created_at, tournament_id] += delta
+    history = {}
+    for profile_id, by_tournament in totals.items():
+        order = sorted(by_tournament)
+        history[profile_id] = (order, list(accumulate(by_tournament[key] for key in order)))
+
+    players = list(
+        Player.objects
+        .filter(tournament__format='BALANCED', tournament__number_of_rounds__gt=0)
+        .select_related('tournament')
+    )
+    for player in players:
+        player.entry_rating = DEFAULT_RATING
+        if player.profile_id in history:
+            order, sums = history[player.profile_id]
+            earlier = bisect_left(order, (player.tournament.created_at, player.tournament_id))
+            if earlier:
+                player.entry_rating += sums[earlier - 1]
+    Player.objects.bulk_update(players, ['entry_rating'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0015_unique_profile_per_tournament'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='entry_rating',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_entry_ratings, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,61 @@
+import secrets
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+
+class Season(models.Model):
+    name = models.CharField(max_length=50)
+    start_date = models.DateField(null=True, blank=True)
+    end_date = models.DateField(null=True, blank=True)
+    # club running the league
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='seasons'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def clean(self):
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValidationError({
+                "end_date": _("Season cannot end before it starts.")
+            })
+
+    def __str__(self):
+        return self.name
+
+# one person across tournaments - Player rows stay per tournament and point to it
+class PlayerProfile(models.Model):
+    display_name = models.CharField(max_length=30)
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='player_profile'
+    )
+    # current Elo rating - the sum of the profile's rating events on top of the default
+    rating = models.FloatField(default=1500.0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.display_name
+
+def new_tournament_seed():
+    return secrets.randbits(62)
+
 class Tournament(models.Model):
     class TournamentFormat(models.TextChoices):
         AMERICANO = "AMERICANO", _("Americano")
         MEXICANO = "MEXICANO", _("Mexicano")
+        # random groups of four split into teams of equal rating, see logic/balanced_single.py
+        BALANCED = "BALANCED", _("Balanced")
 
     class ResultSorting(models.TextChoices):
         WINS = "WINS", _('Wins')
@@ -38,10 +87,27 @@ class Tournament(models.Model):
     result_sorting = models.CharField(max_length=20, choices=ResultSorting.choices)
     team_format = models.CharField(max_length=20, choices=TeamFormat.choices)
     final_match = models.IntegerField(choices=FinalMatch.choices)
+    # within-group layout of regular Mexicano rounds, same patterns as the final
+    mexicano_pairing = models.IntegerField(choices=FinalMatch.choices, default=FinalMatch.ONE_FOUR_VS_TWO_THREE)
     points_per_match = models.PositiveIntegerField(
         validators=[MinValueValidator(1), MaxValueValidator(50)]
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # drives every random choice of round generation, so rounds can be replayed (see logic/planning.py)
+    seed = models.PositiveBigIntegerField(default=new_tournament_seed, editable=False)
+    season = models.ForeignKey(
+        Season,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='tournaments'
+    )
+
+    class Meta:
+        indexes = [
+            # cursor pagination of the tournament list
+            models.Index(fields=['-created_at', '-id'], name='tournament_created_idx'),
+        ]
 
     # checks if final_round is not greater than rounds number
     def clean(self):
@@ -50,8 +116,10 @@ class Tournament(models.Model):
                 "final_round": _("Final round cannot be greater than total rounds.")
             })
 
-    def save(self, *args, **kwargs):
-        self.full_clean()  # triggers clean() before saving
+    def save(self, *args, validate=True, **kwargs):
+        # validate=False for callers that validated already (serializers), full_clean is the costly part of a save
+        if validate:
+            self.full_clean()  # triggers clean() before saving
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -81,13 +149,27 @@ class Court(models.Model):
 class Player(models.Model):
     name = models.CharField(max_length=30)
     tournament = models.ForeignKey('Tournament', on_delete=models.CASCADE, related_name='players')
+    profile = models.ForeignKey(
+        PlayerProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='players'
+    )
+    # profile rating when a balanced tournament started (DEFAULT_RATING for guests)
+    entry_rating = models.FloatField(null=True, blank=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(
                 fields=['name', 'tournament'],
                 name='unique_player_name_per_tournament'
-            )
+            ),
+            # a profile enters a tournament once, players without a profile are not limited
+            models.UniqueConstraint(
+                fields=['tournament', 'profile'],
+                name='unique_profile_per_tournament'
+            ),
         ]
 
     def __str__(self):
@@ -121,6 +203,12 @@ class  Match(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # every match endpoint filters by tournament and round, current round takes MAX(round_number)
+            models.Index(fields=['tournament', 'round_number'], name='match_tournament_round_idx'),
+        ]
+
     def __str__(self):
         return f"Match R{self.round_number} on Court {self.court} (Tournament: {self.tournament.title})"
 
@@ -149,6 +237,12 @@ class MatchPlayer(models.Model):
 
 # creates Ranking snapshots for further development (charts, history etc)
 class RankingSnapshot(models.Model):
+    class Result(models.TextChoices):
+        WIN = "WIN", _("Win")
+        DRAW = "DRAW", _("Draw")
+        LOSS = "LOSS", _("Loss")
+        BYE = "BYE", _("Bye")
+
     tournament = models.ForeignKey(
         Tournament,
         on_delete=models.CASCADE,
@@ -162,11 +256,174 @@ class RankingSnapshot(models.Model):
     round_number = models.PositiveIntegerField()
     points = models.PositiveIntegerField()
     is_winner = models.BooleanField(default=False)
+    # player sat the round out, points are the bye compensation
+    is_bye = models.BooleanField(default=False)
+    # opponents' score, 0 for a bye
+    points_against = models.PositiveIntegerField(default=0)
+    result = models.CharField(max_length=4, choices=Result.choices)
 
     class Meta:
         unique_together = ('tournament', 'player', 'round_number')
         ordering = ['round_number']
+        indexes = [
+            # snapshot rebuild reads and deletes a whole round of a tournament
+            models.Index(fields=['tournament', 'round_number'], name='snapshot_tournament_round_idx'),
+            # covers the per-player ranking scan, no table lookups needed
+            models.Index(
+                fields=['tournament', 'player', 'round_number', 'points', 'points_against', 'result'],
+                name='snapshot_ranking_cover_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.player.name} - Round {self.round_number}: {self.points}:{self.points_against} pts {self.result}"
+
+# player sitting out a round when there are more players than court places
+class SitOut(models.Model):
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="sit_outs"
+    )
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name="sit_outs"
+    )
+    round_number = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tournament', 'round_number', 'player'],
+                name='unique_sit_out_per_round'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.player.name} sits out Round {self.round_number}"
+
+# remembers which round a client's Idempotency-Key produced, so retried POSTs don't generate another round
+class RoundGenerationKey(models.Model):
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="round_generation_keys"
+    )
+    key = models.CharField(max_length=255)
+    round_number = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tournament', 'key'],
+                name='unique_round_generation_key_per_tournament'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.key} -> Round {self.round_number} ({self.tournament.title})"
+
+# per-player running totals, kept in sync by create_ranking_snapshots so ranking reads don't rescan snapshots
+class PlayerStanding(models.Model):
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="standings"
+    )
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name="standings"
+    )
+    total_points = models.PositiveIntegerField(default=0)
+    total_matches = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    # points scored minus points conceded in played matches, byes excluded
+    point_difference = models.IntegerField(default=0)
+    # compact per-round history: [{"round_number": 1, "points": 8, "points_against": 5, "is_winner": True}, ...]
+    rounds = models.JSONField(default=list)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tournament', 'player'],
+                name='unique_standing_per_player'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.player.name} - {self.total_points} pts ({self.total_matches} matches)"
+
+# season totals per profile, kept up to date with every snapshot write like PlayerStanding
+class SeasonStanding(models.Model):
+    season = models.ForeignKey(
+        Season,
+        on_delete=models.CASCADE,
+        related_name="standings"
+    )
+    profile = models.ForeignKey(
+        PlayerProfile,
+        on_delete=models.CASCADE,
+        related_name="season_standings"
+    )
+    total_points = models.PositiveIntegerField(default=0)
+    point_difference = models.IntegerField(default=0)
+    total_matches = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    # rounds with a snapshot (played or bye), a standing without rounds is removed
+    rounds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['season', 'profile'],
+                name='unique_standing_per_season_profile'
+            )
+        ]
+        indexes = [
+            # leaderboard reads a season best first
+            models.Index(fields=['season', '-total_points'], name='season_leaderboard_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile.display_name} - {self.season.name}: {self.total_points} pts"
+
+# append-only rating history: a result is rated once, a corrected result is reverted and rated again
+class RatingEvent(models.Model):
+    class Kind(models.TextChoices):
+        RESULT = "RESULT", _("Result")
+        REVERSAL = "REVERSAL", _("Reversal")
+
+    profile = models.ForeignKey(
+        PlayerProfile,
+        on_delete=models.CASCADE,
+        related_name="rating_events"
+    )
+    # the history outlives the tournament
+    match = models.ForeignKey(
+        'Match',
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="rating_events"
+    )
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.RESULT)
+    # result of the profile's team in the rated match
+    result = models.CharField(max_length=4, choices=RankingSnapshot.Result.choices)
+    delta = models.FloatField()
+    # rating after the event
+    rating = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['profile', 'id'], name='rating_history_idx'),
+        ]
 
     def __str__(self):
-        winner_str = 'WIN' if self.is_winner else 'LOSE'
-        return f"{self.player.name} - Round {self.round_number}: {self.points} pts {winner_str}"
\ No newline at end of file
+        return f"{self.profile.display_name}: {self.delta:+.1f} -> {self.rating:.1f}"
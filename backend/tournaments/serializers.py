@@ -1,9 +1,8 @@
 from rest_framework import serializers
 
-from backend.tournaments.logic.americano_single import generate_americano_round
-from backend.tournaments.logic.final_round import generate_final_round
-from backend.tournaments.logic.mexicano_single import generate_mexicano_round
-from backend.tournaments.models import Player, Tournament, Match, MatchPlayer, Court, RankingSnapshot
+from backend.tournaments.logic.generation import generate_round, commit_preview
+from backend.tournaments.models import Player, Tournament, Match, MatchPlayer, Court, RankingSnapshot, Season, \
+    PlayerProfile
 from django.db import transaction, IntegrityError
 
 
@@ -12,14 +11,14 @@ class PlayerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Player
-        fields = ['id','name', 'tournament']
+        fields = ['id','name', 'tournament', 'profile']
 
 class PlayerCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating players during tournament creation."""
 
     class Meta:
         model = Player
-        fields = ['name']
+        fields = ['name', 'profile']
 
 class CourtSerializer(serializers.ModelSerializer):
     """Serializer for displaying Court information in a tournament."""
@@ -37,7 +36,17 @@ class CourtCreateSerializer(serializers.ModelSerializer):
 
 
 class TournamentSerializer(serializers.ModelSerializer):
-    """Serializer for displaying tournament details along with players."""
+    """
+    Serializer for displaying tournament details along with players.
+    Accepts optional `fields` kwarg to return only the listed fields (sparse fieldset).
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
     players = PlayerSerializer(many=True, read_only=True)
     courts = CourtSerializer(many=True, read_only=True)
@@ -45,13 +54,20 @@ class TournamentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tournament
         fields = ['id', 'status', 'number_of_rounds', 'final_round', 'title', 'format', 'result_sorting', 'team_format', 'final_match',
-                  'points_per_match', 'created_at', 'players', 'courts']
+                  'mexicano_pairing', 'points_per_match', 'season', 'created_at', 'players', 'courts']
+
+
+class TournamentCreateListSerializer(serializers.ListSerializer):
+    """Creates a batch of tournaments in one transaction (TournamentCreateSerializer(many=True))."""
+
+    def create(self, validated_data):
+        return create_tournaments(validated_data)
 
 
 class TournamentCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating a tournament with an initial list of players.
-    Validates that player names are unique within the tournament.
+    Validates that player names and profiles are unique within the tournament.
     """
 
     players = PlayerCreateSerializer(many=True, min_length=1)
@@ -59,11 +75,13 @@ class TournamentCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tournament
-        fields = ['title', 'format', 'result_sorting', 'team_format', 'final_match',
-                  'points_per_match', 'players', 'courts']
+        fields = ['title', 'format', 'result_sorting', 'team_format', 'final_match', 'mexicano_pairing',
+                  'points_per_match', 'season', 'players', 'courts']
+        list_serializer_class = TournamentCreateListSerializer
 
     def validate(self, data):
         names = [player['name'] for player in data['players']]
+        profiles = [player['profile'] for player in data['players'] if player.get('profile') is not None]
         courts_names = [court['name'] for court in data['courts']]
         courts_numbers = [court['number'] for court in data['courts']]
 
@@ -72,6 +90,11 @@ class TournamentCreateSerializer(serializers.ModelSerializer):
                 "players": "Player names must be unique within a tournament."
             })
 
+        if len(profiles) != len(set(profiles)):
+            raise serializers.ValidationError({
+                "players": "A player profile can only be entered once in a tournament."
+            })
+
         if len(courts_names) != len(set(courts_names)) or len(courts_numbers) != len(set(courts_numbers)):
             raise serializers.ValidationError({
                 "players": "Courts names and numbers must be unique within a tournament."
@@ -80,26 +103,64 @@ class TournamentCreateSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        players_data = validated_data.pop('players')
-        courts_data = validated_data.pop('courts')
+        return create_tournaments([validated_data])[0]
 
-        # double check for duplicates - editing players will be possible
-        try:
-            with transaction.atomic():
-                tournament = Tournament.objects.create(**validated_data)
 
-                for player_data in players_data:
-                    Player.objects.create(tournament=tournament, **player_data)
+def create_tournaments(tournaments_data):
+    """
+    Creates tournaments with their players and courts - one INSERT per table for the whole batch.
+    The data was validated by TournamentCreateSerializer, so only the model's own clean() runs
+    instead of a full_clean (which also queries the database for unique checks) per tournament.
+    """
+    batch = []
+    for data in tournaments_data:
+        data = dict(data)
+        players_data = data.pop('players')
+        courts_data = data.pop('courts')
+        tournament = Tournament(**data)
+        tournament.clean()
+        batch.append((tournament, players_data, courts_data))
+
+    # double check for duplicates - editing players will be possible
+    try:
+        with transaction.atomic():
+            tournaments = Tournament.objects.bulk_create([tournament for tournament, _, _ in batch])
+            Player.objects.bulk_create([
+                Player(tournament=tournament, **player_data)
+                for tournament, players_data, _ in batch
+                for player_data in players_data
+            ])
+            Court.objects.bulk_create([
+                Court(tournament=tournament, **court_data)
+                for tournament, _, courts_data in batch
+                for court_data in courts_data
+            ])
+    except IntegrityError:
+        raise serializers.ValidationError(
+            {"error": "Duplicate player names, profiles or court names/number in tournament (DB-level)"}
+        )
+
+    return tournaments
+
+class SeasonSerializer(serializers.ModelSerializer):
+    """Serializer for creating and listing league seasons."""
+
+    class Meta:
+        model = Season
+        fields = ['id', 'name', 'start_date', 'end_date', 'created_at']
 
-                for court_data in courts_data:
-                    Court.objects.create(tournament=tournament, **court_data)
+    def validate(self, data):
+        if data.get('start_date') and data.get('end_date') and data['start_date'] > data['end_date']:
+            raise serializers.ValidationError({"end_date": "Season cannot end before it starts."})
+        return data
 
-        except IntegrityError:
-            raise serializers.ValidationError(
-                {"error": "Duplicate player names or court names/number in tournament (DB-level)"}
-            )
+class PlayerProfileSerializer(serializers.ModelSerializer):
+    """Serializer for player profiles shared by the player's entries across tournaments."""
 
-        return tournament
+    class Meta:
+        model = PlayerProfile
+        fields = ['id', 'display_name', 'user', 'rating', 'created_at']
+        read_only_fields = ['user', 'rating']
 
 class MatchPlayerSerializer(serializers.ModelSerializer):
     """Serializer for displaying a player's team in a specific match."""
@@ -127,8 +188,8 @@ class MatchSerializer(serializers.ModelSerializer):
         read_only_fields = ['updated_at']
 
     def get_players(self, obj):
-        match_players = MatchPlayer.objects.filter(match=obj).select_related('player')
-        return MatchPlayerSerializer(match_players, many=True).data
+        # reads prefetched matchplayer_set when the view provides it (see views.matches_with_players)
+        return MatchPlayerSerializer(obj.matchplayer_set.all(), many=True).data
 
 class MatchUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating a single match result (used in PATCH/PUT)."""
@@ -186,16 +247,18 @@ class RoundResultsSerializer(serializers.Serializer):
 
 class GenerateRoundSerializer(serializers.Serializer):
     is_final = serializers.BooleanField(default=False)
+    # token from preview-round/ - stores exactly the previewed pairings
+    preview_token = serializers.CharField(required=False, max_length=64)
 
-    def validate_tournament_id(self, data):
+    def validate(self, data):
         tournament = self.context.get('tournament')
         if not tournament:
             raise serializers.ValidationError("Tournament not found.")
         if tournament.status == Tournament.TournamentStatus.FINISHED:
             raise serializers.ValidationError("Tournament is marked as finished!")
-        # check if there are 4 players and minimum one court
-        if tournament.players.count() < 4 or tournament.players.count() % 4 != 0:
-            raise serializers.ValidationError("Liczba graczy musi być wielokrotnością 4.")
+        # any player count works - whoever does not fit on the courts sits the round out
+        if tournament.players.count() < 4:
+            raise serializers.ValidationError("Potrzeba co najmniej 4 graczy.")
         if tournament.courts.count() < 1:
             raise serializers.ValidationError("Brak dostępnych kortów.")
         return data
@@ -203,26 +266,43 @@ class GenerateRoundSerializer(serializers.Serializer):
     def create(self, validated_data):
         tournament = self.context['tournament']
         is_final = validated_data.get('is_final', False)
-        if is_final:
-            generate_final_round(tournament)
-        elif tournament.format == Tournament.TournamentFormat.AMERICANO:
-            generate_americano_round(tournament)
-        elif tournament.format == Tournament.TournamentFormat.MEXICANO:
-            generate_mexicano_round(tournament)
+        if validated_data.get('preview_token'):
+            commit_preview(tournament, validated_data['preview_token'], is_final=is_final)
+        else:
+            generate_round(tournament, is_final=is_final)
         return tournament  # return tournament with new round
 
+class PlannedPlayerSerializer(serializers.Serializer):
+    player_id = serializers.IntegerField()
+    team = serializers.ChoiceField(choices=MatchPlayer.TeamChoices.choices)
+
+class PlannedMatchSerializer(serializers.Serializer):
+    court_id = serializers.IntegerField()
+    players = PlannedPlayerSerializer(many=True)
+
+class RoundPlanSerializer(serializers.Serializer):
+    round_number = serializers.IntegerField()
+    is_final = serializers.BooleanField()
+    matches = PlannedMatchSerializer(many=True)
+    sit_outs = serializers.ListField(child=serializers.IntegerField())
+
+class RoundPreviewSerializer(RoundPlanSerializer):
+    token = serializers.CharField()
+
 class RankingSnapshotSerializer(serializers.ModelSerializer):
 
     name = serializers.CharField(source='player.name')
 
     class Meta:
         model = RankingSnapshot
-        fields = ['name', 'round_number', 'points', 'is_winner']
+        fields = ['name', 'round_number', 'points', 'points_against', 'result', 'is_winner', 'is_bye']
 
 class PlayerRoundResultSerializer(serializers.Serializer):
     round_number = serializers.IntegerField()
     points = serializers.IntegerField()
+    points_against = serializers.IntegerField(default=0)
     is_winner = serializers.BooleanField()
+    is_bye = serializers.BooleanField(default=False)
 
 class WinLossRecordSerializer(serializers.Serializer):
     win = serializers.IntegerField()
@@ -233,9 +313,21 @@ class PlayerRankingSerializer(serializers.Serializer):
 
     id = serializers.CharField()
     name = serializers.CharField()
-    rounds = PlayerRoundResultSerializer(many=True)
+    # shared by players tied on everything but head-to-head
+    position = serializers.IntegerField(required=False)
+    # only with ?include=rounds
+    rounds = PlayerRoundResultSerializer(many=True, required=False)
     total_points = serializers.IntegerField()
+    point_difference = serializers.IntegerField()
     total_matches = serializers.IntegerField()
     win_loss_record = WinLossRecordSerializer()
-    win_rate = serializers.IntegerField()
+    win_rate = serializers.FloatField()
 
+class SeasonLeaderboardSerializer(serializers.Serializer):
+    profile_id = serializers.IntegerField()
+    display_name = serializers.CharField()
+    total_points = serializers.IntegerField()
+    point_difference = serializers.IntegerField()
+    total_matches = serializers.IntegerField()
+    win_loss_record = WinLossRecordSerializer()
+    win_rate = serializers.FloatField()
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.tournaments.cache import bump_tournament_version
+from backend.tournaments.models import Tournament, Match, Player, Court
+
+# bulk writes don't send these signals - they call bump_tournament_version themselves.
+# Match players and ranking snapshots are only written in bulk (logic/rounds.py, logic/ranking.py),
+# so they have no receivers: one would disable the fast delete and bump once per row.
+
+
+@receiver([post_save, post_delete], sender=Tournament)
+def tournament_changed(sender, instance, **kwargs):
+    bump_tournament_version(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Match)
+@receiver([post_save, post_delete], sender=Player)
+@receiver([post_save, post_delete], sender=Court)
+def tournament_child_changed(sender, instance, **kwargs):
+    bump_tournament_version(instance.tournament_id)
@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.tournaments.cache import cache_metrics, reset_cache_metrics, get_cache, get_or_build, get_version
+from backend.tournaments.factories.tournament_factories import TournamentWithRelationsFactory, TournamentFactory
+from backend.tournaments.logic.americano_single import generate_americano_round
+from backend.tournaments.logic.ranking import create_ranking_snapshots
+from backend.tournaments.models import Tournament
+
+
+class TournamentCacheTests(APITestCase):
+    """
+    Tests for versioned caching of ranking, details and round match payloads.
+    """
+    def setUp(self):
+        reset_cache_metrics()
+        self.tournament = TournamentWithRelationsFactory(
+            players=4, courts=1, format=Tournament.TournamentFormat.AMERICANO
+        )
+        generate_americano_round(self.tournament)
+        self.match = self.tournament.matches.get()
+
+    def submit_round(self, team_1_score, team_2_score):
+        self.match.refresh_from_db()
+        url = reverse('round-results-update', args=[self.tournament.id, 1])
+        payload = {"results": [{
+            "match_id": self.match.id, "team_1_score": team_1_score, "team_2_score": team_2_score,
+            "played": True, "updated_at": self.match.updated_at.isoformat(),
+        }]}
+        response = self.client.patch(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_second_read_is_a_cache_hit(self):
+        """Should build the ranking once and serve the second request from cache."""
+        url = reverse('tournament-ranking', args=[self.tournament.id])
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cache_metrics()['ranking'], {"hits": 1, "misses": 1})
+
+    def test_round_results_invalidate_ranking_and_round(self):
+        """Should serve fresh ranking and round payloads after results are submitted."""
+        ranking_url = reverse('tournament-ranking', args=[self.tournament.id])
+        round_url = reverse('single-round-matches', args=[self.tournament.id, 1])
+        self.assertEqual(self.client.get(ranking_url).data, [])
+        self.assertIsNone(self.client.get(round_url).data[0]['team_1_score'])
+
+        self.submit_round(14, 7)
+
+        self.assertEqual(self.client.get(ranking_url).data[0]['total_points'], 14)
+        self.assertEqual(self.client.get(round_url).data[0]['team_1_score'], 14)
+
+    def test_snapshot_rewrite_bumps_once(self):
+        """Should bump the version once per snapshot rewrite, not once per replaced snapshot."""
+        self.submit_round(14, 7)
+
+        with mock.patch('backend.tournaments.cache._bump') as bump:
+            create_ranking_snapshots(self.tournament.id, 1)
+
+        bump.assert_called_once_with(self.tournament.id)
+
+    def test_new_round_invalidates_current_round(self):
+        """Should return the newly generated round from current-round after generation."""
+        url = reverse('current-round-matches', args=[self.tournament.id])
+        self.assertEqual(self.client.get(url).data[0]['round_number'], 1)
+
+        self.client.post(reverse('generate-round', args=[self.tournament.id]), {"is_final": False}, format='json')
+
+        self.assertEqual(self.client.get(url).data[0]['round_number'], 2)
+
+    def test_tournament_save_bumps_version(self):
+        """Should change the tournament version whenever the tournament is saved."""
+        version = get_version(self.tournament.id)
+        self.client.patch(reverse('finish-tournament', args=[self.tournament.id]))
+        self.assertNotEqual(get_version(self.tournament.id), version)
+
+        response = self.client.get(reverse('tournament-retrieve', args=[self.tournament.id]))
+        self.assertEqual(response.data['status'], Tournament.TournamentStatus.FINISHED)
+
+    def test_finished_tournament_is_cached_without_expiry(self):
+        """Should store payloads of finished tournaments with no timeout."""
+        tournament = TournamentFactory(status=Tournament.TournamentStatus.FINISHED)
+        cache = get_cache()
+
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.client.get(reverse('tournament-ranking', args=[tournament.id]))
+            get_or_build(self.tournament.id, 'test', lambda: {"status": "IN PROGRESS"})
+
+        self.assertIsNone(cache_set.call_args_list[0].kwargs['timeout'])
+        self.assertIsNotNone(cache_set.call_args_list[1].kwargs['timeout'])
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from backend.tournaments.factories.tournament_factories import TournamentWithRelationsFactory
+from backend.tournaments.live import InMemoryBroker, get_broker, format_sse
+from backend.tournaments.models import Tournament
+
+
+class InMemoryBrokerTests(TestCase):
+    """
+    Tests for the in-process broker fanning events out to tournament subscribers.
+    """
+    def test_publish_reaches_only_subscribers_of_the_tournament(self):
+        """Should deliver an event to subscribers of its tournament and nobody else."""
+        broker = InMemoryBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            other = broker.subscribe(2)
+            broker.publish(1, {"type": "round_generated", "data": "{}"})
+            event = await asyncio.wait_for(subscription.get(), timeout=1)
+            await asyncio.sleep(0)
+            return event, other.queue.empty()
+
+        event, other_empty = asyncio.run(scenario())
+        self.assertEqual(event["type"], "round_generated")
+        self.assertTrue(other_empty)
+
+    def test_publish_from_worker_thread(self):
+        """Should deliver events published from a sync worker thread to the subscriber's loop."""
+        broker = InMemoryBroker()
+
+        async def scenario():
+            async with broker.subscribe(1) as subscription:
+                threading.Thread(target=broker.publish, args=(1, {"type": "match_updated", "data": "{}"})).start()
+                return await asyncio.wait_for(subscription.get(), timeout=1)
+
+        self.assertEqual(asyncio.run(scenario())["type"], "match_updated")
+        self.assertFalse(broker.has_subscribers(1))
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        """Should keep only the newest events for a subscriber that does not read."""
+        broker = InMemoryBroker(max_pending=2)
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            for i in range(3):
+                broker.publish(1, {"type": "match_updated", "data": str(i)})
+            await asyncio.sleep(0)
+            return [(await subscription.get())["data"] for _ in range(2)]
+
+        self.assertEqual(asyncio.run(scenario()), ["1", "2"])
+
+
+class LiveEventsPublishingTests(APITestCase):
+    """
+    Tests that write endpoints publish live events once their transaction commits.
+    """
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(players=4, courts=1)
+        self.broker = get_broker()
+
+    def collect(self, request):
+        """Runs the request while subscribed and returns its response with the events it published."""
+        async def subscribe():
+            return self.broker.subscribe(self.tournament.id)
+
+        async def drain(subscription):
+            await asyncio.sleep(0)
+            events = []
+            while not subscription.queue.empty():
+                events.append(subscription.queue.get_nowait())
+            return events
+
+        loop = asyncio.new_event_loop()
+        subscription = loop.run_until_complete(subscribe())
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = request()
+            return response, loop.run_until_complete(drain(subscription))
+        finally:
+            self.broker.unsubscribe(subscription)
+            loop.close()
+
+    def test_generate_round_publishes_round_generated(self):
+        """Should push the new round number to subscribers."""
+        url = reverse('generate-round', args=[self.tournament.id])
+        response, events = self.collect(lambda: self.client.post(url, {"is_final": False}, format='json'))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([e["type"] for e in events], ["round_generated"])
+        self.assertEqual(json.loads(events[0]["data"]), {"round_number": 1})
+
+    def test_round_results_publish_round_and_ranking(self):
+        """Should push the updated round and the recomputed ranking to subscribers."""
+        self.client.post(reverse('generate-round', args=[self.tournament.id]), {"is_final": False}, format='json')
+        match = self.tournament.matches.get()
+        url = reverse('round-results-update', args=[self.tournament.id, 1])
+        payload = {"results": [{
+            "match_id": match.id, "team_1_score": 15, "team_2_score": 6,
+            "played": True, "updated_at": match.updated_at.isoformat(),
+        }]}
+
+        response, events = self.collect(lambda: self.client.patch(url, payload, format='json'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([e["type"] for e in events], ["round_updated", "ranking_updated"])
+        ranking = json.loads(events[1]["data"])["ranking"]
+        self.assertEqual(len(ranking), 4)
+        self.assertEqual(ranking[0]["total_points"], 15)
+        # same payload as the ranking endpoint
+        response = self.client.get(reverse('tournament-ranking', args=[self.tournament.id]))
+        self.assertEqual(ranking, json.loads(response.content))
+
+
+class TournamentEventsStreamTests(TestCase):
+    """
+    Tests for the Server-Sent Events endpoint.
+    """
+    async def test_stream_sends_published_events(self):
+        """Should open an event stream and forward published events in SSE format."""
+        tournament = await Tournament.objects.acreate(
+            title="Live", format="AMERICANO", result_sorting="POINTS", team_format="PLAYER",
+            final_match=1, points_per_match=21
+        )
+        response = await self.async_client.get(reverse('tournament-events', args=[tournament.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b": connected\n\n")
+
+        event = {"type": "round_generated", "data": '{"round_number": 1}'}
+        get_broker().publish(tournament.id, event)
+        self.assertEqual(await asyncio.wait_for(anext(stream), timeout=1), format_sse(event).encode())
+        await stream.aclose()
+
+    async def test_unknown_tournament_returns_404(self):
+        """Should not open a stream for a tournament that does not exist."""
+        response = await self.async_client.get(reverse('tournament-events', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,10 +1,31 @@
-from unittest import TestCase
+from dataclasses import replace
+from io import StringIO
+from random import Random
+from unittest import TestCase, mock, skipIf
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from backend.tournaments.factories.tournament_factories import TournamentWithRelationsFactory, PlayerFactory, MatchPlayerFactory
+from backend.tournaments.logic.americano_schedule import build_schedule, get_schedule, schedule_round, \
+    schedule_sit_outs, schedule_stats
 from backend.tournaments.logic.americano_single import generate_americano_round
+from backend.tournaments.logic.mexicano_single import generate_mexicano_round
+from backend.tournaments.logic.balanced_single import generate_balanced_round
+from backend.tournaments.logic.pairing import PAIRING_PATTERNS, balance_group, pair_group, recent_partners
 from backend.tournaments.logic.final_round import generate_final_round
-from backend.tournaments.logic.ranking import create_ranking_snapshots, get_simplified_ranking, get_tournament_ranking
-from backend.tournaments.models import Tournament, Player, Match, MatchPlayer, RankingSnapshot
+from backend.tournaments.logic.generation import plan_round, replay_round
+from backend.tournaments.logic.planning import RoundState, load_round_state
+from backend.tournaments.logic.rounds import materialize_round, RoundConflictError
+from backend.tournaments.logic.ranking import create_ranking_snapshots, get_simplified_ranking, get_tournament_ranking, \
+    compute_ranking, load_match_index, aggregate_tournament_ranking
+from backend.tournaments.logic import ratings
+from backend.tournaments.logic.ranking_modes import build_match_index, sort_ranking
+from backend.tournaments.logic.sit_outs import playing_count
+from backend.tournaments.logic.seasons import get_season_leaderboard, rebuild_season_standings
+from backend.tournaments.models import Tournament, Player, Match, MatchPlayer, RankingSnapshot, PlayerStanding, SitOut, \
+    Season, PlayerProfile, SeasonStanding, RatingEvent
 
 
 class AmericanoLogicTest(TestCase):
@@ -64,21 +85,33 @@ class AmericanoLogicTest(TestCase):
             self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 3 * i)
             self.assertEqual(self.tournament.number_of_rounds, i)
 
-    def test_when_players_number_is_lower_than_4_or_not_divisable_by_4(self):
+    def test_when_players_number_is_lower_than_4(self):
         """
-        Should not generate matches if there are less than 4 players or the count is not divisible by 4.
+        Should not generate matches if there are less than 4 players.
         """
         Player.objects.filter(tournament=self.tournament).delete()
 
-        for i in range(11):
+        for i in range(3):
             Player.objects.create(name=f"Gracz{i + 1}", tournament=self.tournament)
-            if Player.objects.filter(tournament=self.tournament).count() % 4 != 0:
-                generate_americano_round(self.tournament)
+            generate_americano_round(self.tournament)
 
-        self.assertEqual(Player.objects.filter(tournament=self.tournament).count(), 11)
+        self.assertEqual(Player.objects.filter(tournament=self.tournament).count(), 3)
         self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 0)
         self.assertEqual(MatchPlayer.objects.filter(match__tournament=self.tournament).count(), 0)
 
+    def test_players_not_divisible_by_4_sit_out(self):
+        """
+        Should fill the courts with full groups of four and let the remaining players sit out.
+        """
+        Player.objects.create(name="Gracz13", tournament=self.tournament)
+        Player.objects.create(name="Gracz14", tournament=self.tournament)
+
+        generate_americano_round(self.tournament)
+
+        self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 3)
+        self.assertEqual(MatchPlayer.objects.filter(match__tournament=self.tournament).count(), 12)
+        self.assertEqual(SitOut.objects.filter(tournament=self.tournament, round_number=1).count(), 2)
+
     def test_generate_round_updates_status(self):
         """
         Should update tournament status to IN_PROGRESS after generating the first round.
@@ -92,6 +125,298 @@ class AmericanoLogicTest(TestCase):
         self.assertEqual(tournament.status, Tournament.TournamentStatus.IN_PROGRESS)
         self.assertEqual(tournament.number_of_rounds, 1)
 
+class AmericanoScheduleTest(TestCase):
+    """
+    Tests for the precomputed Americano schedule.
+    """
+    def test_every_player_plays_once_per_round(self):
+        """Should place every player slot exactly once in each round."""
+        schedule = build_schedule(16, 10)
+        for round_index in range(10):
+            slots = [slot for match in schedule_round(schedule, 16, round_index) for slot in match]
+            self.assertEqual(sorted(slots), list(range(16)))
+
+    def test_no_partner_repeats_within_n_minus_1_rounds(self):
+        """Should never repeat a partner pair while the round-robin factorization lasts."""
+        for n_players in (4, 8, 12, 16, 32):
+            stats = schedule_stats(build_schedule(n_players, n_players - 1), n_players)
+            self.assertEqual(stats['partner_repeats'], 0)
+
+    def test_opponents_are_spread(self):
+        """Should keep opponent meetings close to the unavoidable minimum."""
+        # 16 players, 15 rounds: each player meets 30 opponent slots among 15 others - 2 each at best
+        stats = schedule_stats(build_schedule(16, 15), 16)
+        self.assertLessEqual(stats['max_opponent_meetings'], 4)
+
+    def test_same_inputs_give_the_same_schedule(self):
+        """Should build identical schedules however long the search takes, so replays and previews hold."""
+        for n_players in (16, 32, 64):
+            schedule = build_schedule(n_players, 25)
+            with mock.patch('time.perf_counter', side_effect=lambda: float('inf')):
+                self.assertEqual(build_schedule(n_players, 25), schedule)
+            self.assertEqual(build_schedule(n_players, 25), schedule)
+
+    def test_schedule_is_cached_per_event_shape(self):
+        """Should return the very same schedule object for the same (N, C, R)."""
+        self.assertIs(get_schedule(12, 3, 6), get_schedule(12, 3, 6))
+
+    def test_invalid_shape_is_rejected(self):
+        """Should refuse fewer than 4 players or no court to play on."""
+        with self.assertRaises(ValueError):
+            build_schedule(3, 3)
+        with self.assertRaises(ValueError):
+            build_schedule(10, 3, n_courts=0)
+
+    def test_sit_outs_keep_partners_fresh(self):
+        """Should never repeat a partner pair when players outnumber the court places."""
+        for n_players, n_courts, n_rounds in ((17, 4, 15), (18, 4, 10), (22, 4, 10), (13, 3, 12)):
+            schedule = build_schedule(n_players, n_rounds, n_courts)
+            n_playing = playing_count(n_players, n_courts)
+            for round_index in range(n_rounds):
+                slots = [slot for match in schedule_round(schedule, n_players, round_index, n_playing) for slot in match]
+                sit_outs = schedule_sit_outs(schedule, n_players, round_index, n_playing)
+                self.assertEqual(sorted(slots + sit_outs), list(range(n_players)))
+            self.assertEqual(schedule_stats(schedule, n_players, n_playing)['partner_repeats'], 0)
+
+    def test_generated_rounds_follow_schedule_without_partner_repeats(self):
+        """Should generate Americano rounds in which nobody partners the same player twice."""
+        tournament = TournamentWithRelationsFactory(players=8, courts=2)
+        partners = set()
+        for _ in range(7):
+            generate_americano_round(tournament)
+        for match in Match.objects.filter(tournament=tournament):
+            for team in MatchPlayer.TeamChoices.values:
+                pair = frozenset(match.matchplayer_set.filter(team=team).values_list('player_id', flat=True))
+                self.assertNotIn(pair, partners)
+                partners.add(pair)
+
+
+class SitOutTest(TestCase):
+    """
+    Tests for rotating sit-outs when players outnumber court places.
+    """
+    def test_byes_rotate_evenly(self):
+        """
+        18 players on 4 courts over 9 rounds: two sit out per round, everybody exactly once.
+        """
+        tournament = TournamentWithRelationsFactory(players=18, courts=4)
+        for round_number in range(1, 10):
+            generate_americano_round(tournament)
+            self.assertEqual(Match.objects.filter(tournament=tournament, round_number=round_number).count(), 4)
+
+        byes = {}
+        for player_id in SitOut.objects.filter(tournament=tournament).values_list('player_id', flat=True):
+            byes[player_id] = byes.get(player_id, 0) + 1
+        self.assertEqual(len(byes), 18)
+        self.assertEqual(set(byes.values()), {1})
+
+    def test_players_keep_their_partners_fresh_across_byes(self):
+        """
+        18 players on 4 courts over 10 rounds: sitting out never makes anybody partner a player twice.
+        """
+        tournament = TournamentWithRelationsFactory(players=18, courts=4, format=Tournament.TournamentFormat.AMERICANO)
+        for _ in range(10):
+            generate_americano_round(tournament)
+
+        partners = set()
+        for match in Match.objects.filter(tournament=tournament).prefetch_related('matchplayer_set'):
+            for team in MatchPlayer.TeamChoices.values:
+                pair = frozenset(mp.player_id for mp in match.matchplayer_set.all() if mp.team == team)
+                self.assertNotIn(pair, partners)
+                partners.add(pair)
+        self.assertEqual(len(partners), 80)
+
+    def test_more_groups_than_courts(self):
+        """
+        Should use every court and seat out the groups that do not fit instead of failing.
+        """
+        tournament = TournamentWithRelationsFactory(players=12, courts=1)
+        generate_americano_round(tournament)
+
+        self.assertEqual(Match.objects.filter(tournament=tournament).count(), 1)
+        self.assertEqual(SitOut.objects.filter(tournament=tournament).count(), 8)
+
+    def test_sit_out_gets_compensation_points(self):
+        """
+        Should give sitting out players half of the match points without counting a played match.
+        """
+        tournament = TournamentWithRelationsFactory(players=5, courts=1, points_per_match=20)
+        generate_americano_round(tournament)
+        Match.objects.filter(tournament=tournament).update(team_1_score=12, team_2_score=8, played=True)
+        create_ranking_snapshots(tournament.id, 1)
+
+        sit_out = SitOut.objects.get(tournament=tournament)
+        snapshot = RankingSnapshot.objects.get(tournament=tournament, player=sit_out.player)
+        self.assertTrue(snapshot.is_bye)
+        self.assertEqual(snapshot.points, 10)
+
+        standing = PlayerStanding.objects.get(tournament=tournament, player=sit_out.player)
+        self.assertEqual(standing.total_points, 10)
+        self.assertEqual(standing.total_matches, 0)
+        self.assertEqual(len(get_tournament_ranking(tournament.id)), 5)
+
+class MexicanoPairingTest(TestCase):
+    """
+    Tests for the Mexicano within-group pairing engine.
+    """
+    def test_preferred_pattern_is_used_without_history(self):
+        """Should pair 1 & 4 vs 2 & 3 by default when nobody partnered recently."""
+        pairing = pair_group([11, 12, 13, 14], Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE)
+        self.assertEqual(pairing, [(11, 'team1'), (14, 'team1'), (12, 'team2'), (13, 'team2')])
+
+    def test_recent_partners_are_avoided(self):
+        """Should switch to another pattern when the preferred one repeats a recent partnership."""
+        pairing = pair_group([11, 12, 13, 14], Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE, {frozenset((11, 14))})
+        team_1 = {pid for pid, team in pairing if team == 'team1'}
+        team_2 = {pid for pid, team in pairing if team == 'team2'}
+        self.assertNotIn({11, 14}, [team_1, team_2])
+
+    def test_mexicano_round_uses_ranking_groups_and_history(self):
+        """Should group by ranking and read partner history of previous rounds in a single query."""
+        tournament = TournamentWithRelationsFactory(
+            players=8, courts=2, format=Tournament.TournamentFormat.MEXICANO,
+            mexicano_pairing=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE
+        )
+        generate_mexicano_round(tournament)
+        for match in Match.objects.filter(tournament=tournament):
+            match.team_1_score, match.team_2_score, match.played = 15, 6, True
+            match.save()
+        create_ranking_snapshots(tournament.id, 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            recent = recent_partners(tournament.id, 2)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(recent), 4)
+
+        generate_mexicano_round(tournament)
+        ranking_ids = [p['id'] for p in get_simplified_ranking(tournament.id)]
+        top_match = Match.objects.get(tournament=tournament, round_number=2, players=ranking_ids[0])
+        self.assertEqual(set(top_match.players.values_list('id', flat=True)), set(ranking_ids[:4]))
+        for match in Match.objects.filter(tournament=tournament, round_number=2):
+            for team in MatchPlayer.TeamChoices.values:
+                pair = frozenset(match.matchplayer_set.filter(team=team).values_list('player_id', flat=True))
+                self.assertNotIn(pair, recent)
+
+class MaterializeRoundTest(TestCase):
+    """
+    Tests for the shared round writer used by all generators.
+    """
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(
+            players=16, courts=4, format=Tournament.TournamentFormat.AMERICANO
+        )
+
+    def test_round_is_written_in_constant_number_of_queries(self):
+        """
+        Should write matches and match players in bulk, independent of the number of courts.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            generate_americano_round(self.tournament)
+        # players, courts, UPDATE tournament, INSERT matches, INSERT match players + transaction bookkeeping
+        self.assertLessEqual(len(ctx.captured_queries), 8)
+        self.assertEqual(MatchPlayer.objects.filter(match__tournament=self.tournament).count(), 16)
+
+    def test_failure_mid_generation_leaves_no_partial_round(self):
+        """
+        Should roll back matches and the round counter when writing match players fails.
+        """
+        with mock.patch.object(MatchPlayer.objects, 'bulk_create', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                generate_americano_round(self.tournament)
+
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.number_of_rounds, 0)
+        self.assertEqual(self.tournament.status, Tournament.TournamentStatus.NEW)
+        self.assertFalse(Match.objects.filter(tournament=self.tournament).exists())
+
+    def test_stale_round_counter_raises_conflict(self):
+        """
+        Should refuse to write a round when the tournament round counter changed in the meantime.
+        """
+        stale = Tournament.objects.get(pk=self.tournament.pk)
+        generate_americano_round(self.tournament)
+
+        plan = plan_round(load_round_state(stale))
+        with self.assertRaises(RoundConflictError):
+            materialize_round(stale, plan)
+
+        self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 4)
+
+class RoundReplayTest(TestCase):
+    """
+    Tests for seeded round planning and replay of stored rounds.
+    """
+    def play_round(self, tournament, round_number):
+        for match in Match.objects.filter(tournament=tournament, round_number=round_number).order_by('id'):
+            match.team_1_score, match.team_2_score, match.played = 15 + match.id % 5, 6, True
+            match.save()
+        create_ranking_snapshots(tournament.id, round_number)
+
+    def stored_round(self, tournament, round_number):
+        return [
+            {
+                "court_id": match.court_id,
+                "players": [
+                    {"player_id": mp.player_id, "team": mp.team}
+                    for mp in match.matchplayer_set.order_by('id')
+                ],
+            }
+            for match in Match.objects.filter(tournament=tournament, round_number=round_number).order_by('id')
+        ]
+
+    def test_same_seed_and_state_give_the_same_plan(self):
+        """Should plan identical rounds for the same state and different ones for another seed."""
+        tournament = TournamentWithRelationsFactory(players=14, courts=3)
+        state = load_round_state(tournament)
+        self.assertEqual(plan_round(state), plan_round(state))
+
+        other_seeds = {plan_round(replace(state, seed=seed)).sit_outs for seed in range(10)}
+        self.assertGreater(len(other_seeds), 1)
+
+    def test_planning_needs_no_database(self):
+        """Should plan Americano, Mexicano and final rounds from an in-memory state without queries."""
+        player_ids = tuple(range(1, 11))
+        state = RoundState(
+            tournament_id=1, format=Tournament.TournamentFormat.MEXICANO, seed=42, round_number=3,
+            final_match=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE,
+            mexicano_pairing=Tournament.FinalMatch.ONE_FOUR_VS_TWO_THREE,
+            player_ids=player_ids, court_ids=(100, 101), ranking=player_ids[::-1],
+            bye_history={1: (1, 1), 2: (1, 2)}, recent_partners=frozenset({frozenset((10, 7))}),
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            plans = [
+                plan_round(state),
+                plan_round(replace(state, format=Tournament.TournamentFormat.AMERICANO)),
+                plan_round(state, is_final=True),
+            ]
+        self.assertEqual(len(ctx.captured_queries), 0)
+        for plan in plans:
+            self.assertEqual(len(plan.matches), 2)
+        self.assertEqual([len(plan.sit_outs) for plan in plans], [2, 2, 0])
+        self.assertNotIn(1, plans[0].sit_outs)
+        # players outside the final did not make it, they do not sit it out
+        self.assertNotIn(2, {pid for _, players in plans[2].matches for pid, _ in players})
+
+    def test_replay_matches_stored_rounds(self):
+        """Should rebuild every stored Mexicano round, sit-outs and final included, from seed and results."""
+        tournament = TournamentWithRelationsFactory(
+            players=10, courts=2, format=Tournament.TournamentFormat.MEXICANO
+        )
+        for round_number in range(1, 5):
+            generate_mexicano_round(tournament)
+            self.play_round(tournament, round_number)
+        generate_final_round(tournament)
+
+        for round_number in range(1, 6):
+            plan = replay_round(tournament, round_number).to_dict()
+            self.assertEqual(plan['matches'], self.stored_round(tournament, round_number))
+            self.assertEqual(
+                sorted(plan['sit_outs']),
+                sorted(SitOut.objects.filter(tournament=tournament, round_number=round_number)
+                       .values_list('player_id', flat=True))
+            )
+        self.assertTrue(replay_round(tournament, 5).is_final)
+
 class TestGenerateFinalRound(TestCase):
     """
     Tests for generating the final round with correct player pairings
@@ -167,6 +492,31 @@ class TestGenerateFinalRound(TestCase):
         self.assertEqual(teams.count(MatchPlayer.TeamChoices.TEAM1), 2)
         self.assertEqual(teams.count(MatchPlayer.TeamChoices.TEAM2), 2)
 
+    def test_losing_finalists_stay_above_non_finalists(self):
+        """Should not compensate players who missed the final as if they had a bye."""
+        tournament = TournamentWithRelationsFactory(
+            players=8, courts=1, points_per_match=24, format=Tournament.TournamentFormat.AMERICANO
+        )
+        for round_number in (1, 2):
+            generate_americano_round(tournament)
+            Match.objects.filter(tournament=tournament, round_number=round_number).update(
+                team_1_score=15, team_2_score=9, played=True
+            )
+            create_ranking_snapshots(tournament.id, round_number)
+
+        generate_final_round(tournament)
+        final = Match.objects.get(tournament=tournament, round_number=tournament.final_round)
+        final.team_1_score, final.team_2_score, final.played = 21, 3, True
+        final.save()
+        create_ranking_snapshots(tournament.id, tournament.final_round)
+
+        self.assertFalse(SitOut.objects.filter(tournament=tournament, round_number=tournament.final_round).exists())
+        totals = dict(PlayerStanding.objects.filter(tournament=tournament).values_list('player_id', 'total_points'))
+        finalists = set(final.matchplayer_set.values_list('player_id', flat=True))
+        losing_finalists = final.matchplayer_set.filter(team=MatchPlayer.TeamChoices.TEAM2).values_list('player_id', flat=True)
+        lowest_finalist = min(totals[player_id] for player_id in losing_finalists)
+        self.assertTrue(all(points <= lowest_finalist for player_id, points in totals.items() if player_id not in finalists))
+
 class TestRankingLogic(TestCase):
     """
     Tests for tournament ranking aggregation and snapshot logic.
@@ -224,4 +574,456 @@ class TestRankingLogic(TestCase):
         self.assertEqual(snapshots.count(), 4)
 
         winners = snapshots.filter(is_winner=True)
-        self.assertEqual(winners.count(), 2)
\ No newline at end of file
+        self.assertEqual(winners.count(), 2)
+
+    def test_create_ranking_snapshots_updates_standings(self):
+        """
+        Should keep player standings in sync with snapshots when a round is re-submitted.
+        """
+        standings = PlayerStanding.objects.filter(tournament=self.tournament)
+        self.assertEqual(standings.count(), 4)
+        self.assertEqual(sum(s.total_points for s in standings), 60)
+        self.assertEqual(sum(s.wins for s in standings), 2)
+
+        # correct the result of the same round - deltas must replace, not accumulate
+        self.match.team_1_score = 25
+        self.match.team_2_score = 5
+        self.match.save()
+        create_ranking_snapshots(self.tournament.id, self.match.round_number)
+
+        standings = PlayerStanding.objects.filter(tournament=self.tournament)
+        self.assertEqual(sum(s.total_points for s in standings), 60)
+        for standing in standings:
+            self.assertEqual(standing.total_matches, 1)
+            self.assertEqual(len(standing.rounds), 1)
+
+        ranking = get_tournament_ranking(self.tournament.id)
+        self.assertEqual(ranking[0]['total_points'], 25)
+        self.assertEqual(ranking[0]['win_loss_record'], {"win": 1, "draw": 0, "loss": 0})
+        self.assertEqual(ranking[0]['win_rate'], 100.0)
+
+    def test_unplaying_round_removes_standings(self):
+        """
+        Should drop standings of players whose only round is no longer played.
+        """
+        self.match.played = False
+        self.match.save()
+        create_ranking_snapshots(self.tournament.id, self.match.round_number)
+
+        self.assertFalse(PlayerStanding.objects.filter(tournament=self.tournament).exists())
+        self.assertEqual(get_tournament_ranking(self.tournament.id), [])
+
+    def test_create_ranking_snapshots_query_count_does_not_grow_with_round_size(self):
+        """
+        Should snapshot a round in a constant number of queries regardless of number of courts.
+        """
+        def snapshot_queries(courts):
+            tournament = TournamentWithRelationsFactory(players=courts * 4, courts=courts)
+            generate_americano_round(tournament)
+            Match.objects.filter(tournament=tournament).update(team_1_score=12, team_2_score=9, played=True)
+            with CaptureQueriesContext(connection) as ctx:
+                create_ranking_snapshots(tournament.id, 1)
+            self.assertEqual(RankingSnapshot.objects.filter(tournament=tournament).count(), courts * 4)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(snapshot_queries(1), snapshot_queries(8))
+
+    def test_get_tournament_ranking_query_count(self):
+        """
+        Should read the standings with one query, plus one for the match index when players tie.
+        """
+        # both winners and both losers tie on points and win rate
+        with CaptureQueriesContext(connection) as ctx:
+            get_tournament_ranking(self.tournament.id)
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+class ComputeRankingTest(TestCase):
+    """
+    Tests for the pure ranking core fed with per-snapshot columns.
+    """
+    def test_aggregates_and_sorts_columns(self):
+        """Should total points, count results and sort by points then win rate, ties by name."""
+        ranking = compute_ranking(
+            player_ids=[1, 2, 3, 1, 2, 3],
+            round_numbers=[2, 2, 2, 1, 1, 1],
+            points=[16, 5, 10, 10, 21, 10],
+            points_against=[4, 15, 0, 10, 0, 10],
+            results=['WIN', 'LOSS', 'BYE', 'DRAW', 'WIN', 'DRAW'],
+            names={1: "Bea", 2: "Ada", 3: "Cy"},
+        )
+
+        self.assertEqual([player['id'] for player in ranking], [1, 2, 3])
+        self.assertEqual(ranking[0]['total_points'], 26)
+        self.assertEqual(ranking[0]['point_difference'], 12)
+        self.assertEqual(ranking[0]['win_loss_record'], {"win": 1, "draw": 1, "loss": 0})
+        self.assertEqual([r['round_number'] for r in ranking[0]['rounds']], [1, 2])
+        self.assertEqual(ranking[1]['point_difference'], 11)
+        self.assertEqual(ranking[2]['total_matches'], 1)
+        self.assertEqual(ranking[2]['point_difference'], 0)
+        self.assertTrue(ranking[2]['rounds'][1]['is_bye'])
+
+    def test_matches_standings_ranking(self):
+        """Should rank stored snapshots exactly like the incremental standings do."""
+        tournament = TournamentWithRelationsFactory(players=10, courts=2)
+        for round_number in range(1, 4):
+            generate_americano_round(tournament)
+            for match in Match.objects.filter(tournament=tournament, round_number=round_number):
+                match.team_1_score, match.team_2_score, match.played = match.id % 7 + 5, 10, True
+                match.save()
+            create_ranking_snapshots(tournament.id, round_number)
+
+        snapshots = RankingSnapshot.objects.filter(tournament=tournament).order_by('round_number')
+        player_ids, names, round_numbers, points, points_against, results = zip(
+            *snapshots.values_list('player_id', 'player__name', 'round_number', 'points', 'points_against', 'result')
+        )
+        ranking = compute_ranking(player_ids, round_numbers, points, points_against, results,
+                                  dict(zip(player_ids, names)),
+                                  tournament.result_sorting, lambda: load_match_index(tournament.id))
+
+        self.assertEqual(ranking, get_tournament_ranking(tournament.id))
+
+        aggregated = aggregate_tournament_ranking(tournament, include_rounds=True)
+        positions = [player.pop('position') for player in aggregated]
+        self.assertEqual(aggregated, ranking)
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(positions[0], 1)
+
+    def test_win_rate_ties_round_alike(self):
+        """Should give the same win rate in the database and in Python when it ends on a .x5 tie."""
+        tournament = TournamentWithRelationsFactory(players=4, courts=1)
+        player = tournament.players.first()
+        RankingSnapshot.objects.bulk_create(
+            RankingSnapshot(
+                tournament=tournament, player=player, round_number=round_number, points=10, points_against=5,
+                result=RankingSnapshot.Result.WIN if round_number == 1 else RankingSnapshot.Result.LOSS
+            )
+            for round_number in range(1, 17)
+        )
+
+        results = ['WIN'] + ['LOSS'] * 15
+        ranking = compute_ranking([player.id] * 16, list(range(1, 17)), [10] * 16, [5] * 16, results)
+
+        # 1 win of 16 is 6.25%
+        self.assertEqual(ranking[0]['win_rate'], 6.3)
+        self.assertEqual(aggregate_tournament_ranking(tournament)[0]['win_rate'], 6.3)
+
+    def test_draw_is_equal_scores(self):
+        """Should record a draw for equal scores, whatever points_per_match is."""
+        tournament = TournamentWithRelationsFactory(players=4, courts=1, points_per_match=21)
+        generate_americano_round(tournament)
+        Match.objects.filter(tournament=tournament).update(team_1_score=10, team_2_score=10, played=True)
+        create_ranking_snapshots(tournament.id, 1)
+
+        self.assertEqual(
+            set(RankingSnapshot.objects.filter(tournament=tournament).values_list('result', 'points_against')),
+            {(RankingSnapshot.Result.DRAW, 10)}
+        )
+        standing = PlayerStanding.objects.filter(tournament=tournament).first()
+        self.assertEqual((standing.draws, standing.point_difference), (1, 0))
+
+class RankingModesTest(TestCase):
+    """
+    Tests for result_sorting modes and their tiebreaks.
+    """
+    def entry(self, player_id, points, wins, matches, point_difference=0):
+        return {"id": player_id, "total_points": points, "win_rate": round(wins / matches * 100, 1),
+                "point_difference": point_difference,
+                "win_loss_record": {"win": wins, "draw": 0, "loss": matches - wins}}
+
+    def test_points_and_wins_modes(self):
+        """Should put most points first in POINTS mode and most wins first in WINS mode."""
+        ranking = [self.entry(1, 40, 1, 3), self.entry(2, 35, 3, 3)]
+
+        self.assertEqual([p['id'] for p in sort_ranking(ranking, Tournament.ResultSorting.POINTS)], [1, 2])
+        self.assertEqual([p['id'] for p in sort_ranking(ranking, Tournament.ResultSorting.WINS)], [2, 1])
+
+    def test_point_difference_breaks_ties_without_match_index(self):
+        """Should order tied players by point difference and not load the match index for it."""
+        ranking = [self.entry(3, 30, 1, 2, -13), self.entry(2, 30, 1, 2, 0), self.entry(1, 30, 1, 2, 11)]
+        load = mock.Mock()
+        order = [p['id'] for p in sort_ranking(ranking, Tournament.ResultSorting.POINTS, load)]
+
+        self.assertEqual(order, [1, 2, 3])
+        load.assert_not_called()
+
+    def test_head_to_head_decides_equal_point_difference(self):
+        """Should rank the winner of the direct match first when everything else is equal."""
+        index = build_match_index([
+            # 2 beats 1 21:15, 1 beats 3 21:9
+            (1, 2, 'team1', 21, 15), (1, 1, 'team2', 21, 15),
+            (2, 1, 'team1', 21, 9), (2, 3, 'team2', 21, 9),
+        ])
+        self.assertEqual(index.head_to_head[2, 1], 1)
+        self.assertEqual(index.head_to_head[1, 2], -1)
+
+        ranking = [self.entry(1, 30, 1, 2, 6), self.entry(2, 30, 1, 2, 6)]
+        load = mock.Mock(return_value=index)
+        order = [p['id'] for p in sort_ranking(ranking, Tournament.ResultSorting.WINS, load)]
+
+        self.assertEqual(order, [2, 1])
+        load.assert_called_once()
+
+class SeasonStandingTest(TestCase):
+    """
+    Tests for season aggregates over player profiles kept up to date by the snapshot writer.
+    """
+    def setUp(self):
+        self.season = Season.objects.create(name="Spring league")
+        self.profiles = [PlayerProfile.objects.create(display_name=f"Regular {i}") for i in range(5)]
+        self.tournaments = [TournamentWithRelationsFactory(players=5, courts=1, season=self.season) for _ in range(2)]
+        for tournament in self.tournaments:
+            # four regulars and one guest without a profile
+            for player, profile in zip(tournament.players.order_by('id')[:4], self.profiles):
+                player.profile = profile
+                player.save()
+
+    def play_round(self, tournament, team_1_score, team_2_score):
+        generate_americano_round(tournament)
+        round_number = tournament.number_of_rounds
+        Match.objects.filter(tournament=tournament, round_number=round_number).update(
+            team_1_score=team_1_score, team_2_score=team_2_score, played=True
+        )
+        create_ranking_snapshots(tournament.id, round_number)
+
+    def expected_totals(self):
+        totals = {}
+        for standing in PlayerStanding.objects.filter(tournament__season=self.season, player__profile__isnull=False):
+            total = totals.setdefault(standing.player.profile_id, [0, 0, 0])
+            total[0] += standing.total_points
+            total[1] += standing.total_matches
+            total[2] += standing.wins
+        return totals
+
+    def season_totals(self):
+        return {
+            standing.profile_id: [standing.total_points, standing.total_matches, standing.wins]
+            for standing in SeasonStanding.objects.filter(season=self.season)
+        }
+
+    def test_season_standings_follow_snapshots(self):
+        """Should sum profile results across the season's tournaments, corrections included."""
+        for tournament in self.tournaments:
+            self.play_round(tournament, 21, 10)
+            self.play_round(tournament, 8, 21)
+        # correct the first round of one tournament
+        Match.objects.filter(tournament=self.tournaments[0], round_number=1).update(team_1_score=10, team_2_score=21)
+        create_ranking_snapshots(self.tournaments[0].id, 1)
+
+        self.assertEqual(self.season_totals(), self.expected_totals())
+        self.assertEqual(SeasonStanding.objects.filter(season=self.season).count(), 4)
+
+    def test_rebuild_matches_incremental_standings(self):
+        """Should rebuild the same season standings from tournament standings."""
+        for tournament in self.tournaments:
+            self.play_round(tournament, 21, 15)
+        incremental = self.season_totals()
+
+        rebuild_season_standings(self.season.id)
+        self.assertEqual(self.season_totals(), incremental)
+
+    def test_rebuild_command_picks_up_linked_profiles(self):
+        """Should count a guest linked to a profile after the round once the season is rebuilt."""
+        for tournament in self.tournaments:
+            self.play_round(tournament, 21, 15)
+        for tournament in self.tournaments:
+            guest = tournament.players.get(profile__isnull=True)
+            guest.profile = self.profiles[4]
+            guest.save()
+        self.assertNotEqual(self.season_totals(), self.expected_totals())
+
+        call_command('rebuild_season_standings', str(self.season.id), stdout=StringIO())
+        self.assertEqual(self.season_totals(), self.expected_totals())
+        self.assertEqual(SeasonStanding.objects.filter(season=self.season).count(), 5)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_season_standings', str(self.season.id + 1), stdout=StringIO())
+
+    def test_leaderboard_is_a_single_query(self):
+        """Should read the season leaderboard best first with one query."""
+        for tournament in self.tournaments:
+            self.play_round(tournament, 21, 3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            leaderboard = get_season_leaderboard(self.season.id)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        points = [entry['total_points'] for entry in leaderboard]
+        self.assertEqual(points, sorted(points, reverse=True))
+
+
+class RatingTest(TestCase):
+    """
+    Tests for Elo ratings of player profiles, applied per round and replayed in bulk.
+    """
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(players=9, courts=2)
+        self.profiles = [PlayerProfile.objects.create(display_name=f"Rated {i}") for i in range(8)]
+        # eight rated players and one guest
+        for player, profile in zip(self.tournament.players.order_by('id'), self.profiles):
+            player.profile = profile
+            player.save()
+
+    def play_round(self, scores):
+        generate_americano_round(self.tournament)
+        round_number = self.tournament.number_of_rounds
+        for match, (team_1_score, team_2_score) in zip(
+                Match.objects.filter(tournament=self.tournament, round_number=round_number).order_by('id'), scores):
+            match.team_1_score, match.team_2_score, match.played = team_1_score, team_2_score, True
+            match.save()
+        create_ranking_snapshots(self.tournament.id, round_number)
+        return round_number
+
+    def rated_players(self, round_number):
+        return MatchPlayer.objects.filter(
+            match__tournament=self.tournament, match__round_number=round_number, player__profile__isnull=False
+        ).count()
+
+    def current_ratings(self):
+        return dict(PlayerProfile.objects.filter(pk__in=[p.pk for p in self.profiles]).values_list('id', 'rating'))
+
+    def test_winners_gain_what_losers_lose(self):
+        """Should move both teams of a match by the same amount in opposite directions."""
+        round_number = self.play_round([(21, 10), (10, 21)])
+
+        events = RatingEvent.objects.filter(profile__in=self.profiles)
+        self.assertEqual(events.count(), self.rated_players(round_number))
+        for event in events:
+            self.assertEqual(event.delta > 0, event.result == RankingSnapshot.Result.WIN)
+            self.assertAlmostEqual(event.rating, ratings.DEFAULT_RATING + event.delta)
+        for match in Match.objects.filter(tournament=self.tournament):
+            gains = {round(abs(delta), 9) for delta in match.rating_events.values_list('delta', flat=True)}
+            self.assertEqual(len(gains), 1)
+
+    def test_resubmitting_a_round_only_appends(self):
+        """Should leave unchanged results alone and revert then re-rate a corrected one."""
+        round_number = self.play_round([(21, 10), (10, 21)])
+        create_ranking_snapshots(self.tournament.id, round_number)
+        self.assertEqual(RatingEvent.objects.filter(profile__in=self.profiles).count(), self.rated_players(round_number))
+        before = self.current_ratings()
+
+        match = Match.objects.filter(tournament=self.tournament, round_number=round_number).order_by('id').first()
+        match.team_1_score, match.team_2_score = 10, 21
+        match.save()
+        create_ranking_snapshots(self.tournament.id, round_number)
+
+        events = RatingEvent.objects.filter(match=match)
+        rated = events.filter(profile__isnull=False).values_list('profile_id', flat=True).distinct().count()
+        self.assertEqual(events.filter(kind=RatingEvent.Kind.REVERSAL).count(), rated)
+        self.assertEqual(events.filter(kind=RatingEvent.Kind.RESULT).count(), 2 * rated)
+        after = self.current_ratings()
+        for profile_id in events.values_list('profile_id', flat=True):
+            self.assertNotAlmostEqual(after[profile_id], before[profile_id])
+
+    def test_recompute_matches_incremental_ratings(self):
+        """Should replay the history to the ratings the rounds produced one by one."""
+        for scores in ([(21, 10), (10, 21)], [(15, 15), (21, 3)], [(8, 21), (21, 20)]):
+            self.play_round(scores)
+        incremental = self.current_ratings()
+
+        ratings.recompute_ratings()
+        recomputed = self.current_ratings()
+        for profile_id, rating in incremental.items():
+            self.assertAlmostEqual(recomputed[profile_id], rating)
+        self.assertFalse(RatingEvent.objects.filter(kind=RatingEvent.Kind.REVERSAL).exists())
+
+    @skipIf(ratings.np is None, "NumPy is not installed")
+    def test_vectorized_replay_matches_sequential(self):
+        """Should rate waves of independent matches like the sequential replay, guests and singles included."""
+        rng = Random(7)
+        match_index, profile_index, team_1_side, team_1_scores = [], [], [], []
+        for match in range(300):
+            size = rng.choice((2, 4))
+            for position, profile in enumerate(rng.sample(range(-1, 12), size)):
+                match_index.append(match)
+                profile_index.append(profile)
+                team_1_side.append(position < size // 2)
+            team_1_scores.append(rng.choice((1.0, 0.5, 0.0)))
+
+        expected, expected_deltas = ratings.replay_ratings(match_index, profile_index, team_1_side, team_1_scores, 12)
+        result, deltas = ratings.replay_ratings_vectorized(match_index, profile_index, team_1_side, team_1_scores, 12)
+        self.assertTrue(ratings.np.allclose(result, expected))
+        self.assertTrue(ratings.np.allclose(deltas, expected_deltas))
+
+
+class BalancedRoundTest(TestCase):
+    """
+    Tests for rounds whose teams are balanced by rating.
+    """
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(
+            players=10, courts=2, format=Tournament.TournamentFormat.BALANCED
+        )
+        # nine rated players and one guest playing at the default rating
+        for i, player in enumerate(self.tournament.players.order_by('id')[:9]):
+            player.profile = PlayerProfile.objects.create(display_name=f"Balanced {i}", rating=1200 + 70 * i)
+            player.save()
+
+    def team_gap(self, match, player_ratings):
+        return abs(sum(
+            player_ratings[mp.player_id] if mp.team == MatchPlayer.TeamChoices.TEAM1 else -player_ratings[mp.player_id]
+            for mp in match.matchplayer_set.all()
+        ))
+
+    def test_balance_group_picks_the_closest_split(self):
+        """Should put the strongest and the weakest player together."""
+        pairing = balance_group([1, 2, 3, 4], {1: 1900, 2: 1700, 3: 1500, 4: 1300})
+        self.assertEqual(pairing, [(1, 'team1'), (4, 'team1'), (2, 'team2'), (3, 'team2')])
+
+    def test_balance_group_avoids_recent_partners_on_equal_gaps(self):
+        """Should take the equally balanced split that does not repeat a partnership."""
+        pairing = balance_group([1, 2, 3, 4], dict.fromkeys([1, 2, 3, 4], 1500), {frozenset((1, 2))})
+        teams = {frozenset(pid for pid, team in pairing if team == side) for side in ('team1', 'team2')}
+        self.assertNotIn(frozenset((1, 2)), teams)
+
+    def test_every_court_gets_its_most_balanced_split(self):
+        """Should generate matches whose teams are as close in rating as the group allows."""
+        generate_balanced_round(self.tournament)
+        player_ratings = ratings.entry_ratings(self.tournament.id)
+        self.assertEqual(player_ratings[self.tournament.players.order_by('id').last().id], ratings.DEFAULT_RATING)
+
+        matches = Match.objects.filter(tournament=self.tournament, round_number=1).prefetch_related('matchplayer_set')
+        self.assertEqual(len(matches), 2)
+        for match in matches:
+            group = [mp.player_id for mp in match.matchplayer_set.all()]
+            best = min(
+                abs(sum(player_ratings[group[idx]] if team == 'team1' else -player_ratings[group[idx]]
+                        for idx, team in layout))
+                for layout in PAIRING_PATTERNS.values()
+            )
+            self.assertAlmostEqual(self.team_gap(match, player_ratings), best)
+
+    def test_entry_ratings_ignore_the_tournaments_own_results(self):
+        """Should balance later rounds and replays on the ratings players entered with."""
+        before = ratings.entry_ratings(self.tournament.id)
+        generate_balanced_round(self.tournament)
+        for match in Match.objects.filter(tournament=self.tournament, round_number=1):
+            match.team_1_score, match.team_2_score, match.played = 21, 5, True
+            match.save()
+        create_ranking_snapshots(self.tournament.id, 1)
+
+        self.assertTrue(RatingEvent.objects.filter(match__tournament=self.tournament).exists())
+        after = ratings.entry_ratings(self.tournament.id)
+        for player_id, rating in before.items():
+            self.assertAlmostEqual(after[player_id], rating)
+        stored = tuple(
+            (match.court_id, tuple((mp.player_id, mp.team) for mp in match.matchplayer_set.order_by('id')))
+            for match in Match.objects.filter(tournament=self.tournament, round_number=1).order_by('id')
+        )
+        self.assertEqual(replay_round(self.tournament, 1).matches, stored)
+
+    def test_entry_ratings_ignore_later_tournaments(self):
+        """Should keep a started tournament's entry ratings when its players play another tournament."""
+        generate_balanced_round(self.tournament)
+        before = ratings.entry_ratings(self.tournament.id)
+
+        later = TournamentWithRelationsFactory(players=10, courts=2, format=Tournament.TournamentFormat.BALANCED)
+        for player, source in zip(later.players.order_by('id'), self.tournament.players.order_by('id')[:9]):
+            player.profile_id = source.profile_id
+            player.save()
+        generate_balanced_round(later)
+        Match.objects.filter(tournament=later).update(team_1_score=21, team_2_score=5, played=True)
+        create_ranking_snapshots(later.id, 1)
+
+        current = dict(self.tournament.players.exclude(profile=None).values_list('id', 'profile__rating'))
+        self.assertTrue(any(rating != before[player_id] for player_id, rating in current.items()))
+        self.assertEqual(ratings.entry_ratings(self.tournament.id), before)
+
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class SnapshotResultMigrationTest(TransactionTestCase):
+    migrate_from = [('tournaments', '0009_tournament_seed')]
+    migrate_to = [('tournaments', '0010_snapshot_result_points_against')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        self.apps = executor.loader.project_state(self.migrate_from).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.migrate_to)
+        return executor.loader.project_state(self.migrate_to).apps
+
+    def test_legacy_draw_is_rebuilt_as_a_loss(self):
+        """A 12:14 round counted as a draw (half of 24 points) must become a loss in the standing."""
+        Tournament = self.apps.get_model('tournaments', 'Tournament')
+        Player = self.apps.get_model('tournaments', 'Player')
+        Court = self.apps.get_model('tournaments', 'Court')
+        Match = self.apps.get_model('tournaments', 'Match')
+        MatchPlayer = self.apps.get_model('tournaments', 'MatchPlayer')
+        RankingSnapshot = self.apps.get_model('tournaments', 'RankingSnapshot')
+        PlayerStanding = self.apps.get_model('tournaments', 'PlayerStanding')
+
+        tournament = Tournament.objects.create(
+            title="Legacy", format='AMERICANO', result_sorting='POINTS', team_format='PLAYER',
+            final_match=1, points_per_match=24
+        )
+        court = Court.objects.create(tournament=tournament, name="Court 1")
+        players = [Player.objects.create(tournament=tournament, name=f"P{i}") for i in range(4)]
+        match = Match.objects.create(
+            tournament=tournament, court=court, round_number=1,
+            team_1_score=12, team_2_score=14, played=True
+        )
+        for index, player in enumerate(players):
+            MatchPlayer.objects.create(match=match, player=player, team='team1' if index < 2 else 'team2')
+            points = 12 if index < 2 else 14
+            RankingSnapshot.objects.create(
+                tournament=tournament, player=player, round_number=1, points=points, is_winner=index >= 2
+            )
+            PlayerStanding.objects.create(
+                tournament=tournament, player=player, total_points=points, total_matches=1,
+                wins=int(index >= 2), draws=int(index < 2),
+                rounds=[{"round_number": 1, "points": points, "is_winner": index >= 2}],
+            )
+
+        apps = self.migrate()
+        PlayerStanding = apps.get_model('tournaments', 'PlayerStanding')
+        RankingSnapshot = apps.get_model('tournaments', 'RankingSnapshot')
+
+        loser = PlayerStanding.objects.get(player_id=players[0].id)
+        self.assertEqual((loser.wins, loser.draws, loser.losses), (0, 0, 1))
+        self.assertEqual(loser.point_difference, -2)
+        self.assertEqual(loser.rounds, [{
+            "round_number": 1, "points": 12, "points_against": 14, "is_winner": False, "is_bye": False,
+        }])
+        winner = PlayerStanding.objects.get(player_id=players[2].id)
+        self.assertEqual((winner.wins, winner.draws, winner.losses), (1, 0, 0))
+        self.assertEqual(RankingSnapshot.objects.get(player_id=players[0].id).result, 'LOSS')
+
+        # a later correction of the round subtracts a loss, which must not drive draws below zero
+        loser.losses -= 1
+        loser.save()
@@ -3,7 +3,7 @@ from django.test import TestCase
 
 from backend.tournaments.factories.tournament_factories import TournamentFactory, TournamentWithRelationsFactory, \
     MatchFactory, MatchPlayerFactory
-from backend.tournaments.models import Tournament, Player, Match, MatchPlayer, Court
+from backend.tournaments.models import Tournament, Player, Match, MatchPlayer, Court, PlayerProfile
 from django.db import IntegrityError
 
 class TournamentModelTest(TestCase):
@@ -55,6 +55,16 @@ class TournamentModelTest(TestCase):
         with self.assertRaises(ValidationError):
             tournament.full_clean()
 
+    def test_save_without_validation_skips_full_clean(self):
+        """Should save without the full_clean queries when the caller validated already."""
+        tournament = TournamentFactory(number_of_rounds=2)
+        tournament.number_of_rounds = 3
+        with self.assertNumQueries(1):
+            tournament.save(update_fields=['number_of_rounds'], validate=False)
+        with self.assertRaises(ValidationError):
+            tournament.final_round = 5
+            tournament.save()
+
 
 class PlayerModelTest(TestCase):
     def setUp(self):
@@ -75,6 +85,15 @@ class PlayerModelTest(TestCase):
         with self.assertRaises(IntegrityError):
             Player.objects.create(tournament=self.tournament, name="Testowy2")
 
+    def test_profile_entered_twice(self):
+        """Should raise IntegrityError when one profile is entered twice in the same tournament."""
+        profile = PlayerProfile.objects.create(display_name="Ania")
+        Player.objects.create(tournament=self.tournament, name="Ania", profile=profile)
+        Player.objects.create(tournament=self.tournament, name="Guest 1")
+        Player.objects.create(tournament=self.tournament, name="Guest 2")
+        with self.assertRaises(IntegrityError):
+            Player.objects.create(tournament=self.tournament, name="Ania 2", profile=profile)
+
     def test_same_players_in_different_tournaments(self):
         """Should allow players with the same name in different tournaments."""
         tournament = TournamentFactory()
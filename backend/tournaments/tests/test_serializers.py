@@ -3,7 +3,7 @@ from django.test import TestCase
 from backend.tournaments.factories.tournament_factories import TournamentFactory, PlayerFactory, \
     TournamentWithRelationsFactory, MatchPlayerFactory
 from backend.tournaments.logic.americano_single import generate_americano_round
-from backend.tournaments.models import Tournament, Player, Match, MatchPlayer
+from backend.tournaments.models import Tournament, Player, Match, MatchPlayer, PlayerProfile
 from backend.tournaments.serializers import TournamentCreateSerializer, TournamentSerializer, MatchSerializer, \
     MatchUpdateSerializer, RoundResultsSerializer, MatchPlayerSerializer
 
@@ -65,6 +65,20 @@ class TournamentCreateSerializerTest(TestCase):
             "Player names must be unique within a tournament."
         )
 
+    def test_duplicate_player_profiles(self):
+        """Should raise validation error when one profile is entered for two players."""
+        profile = PlayerProfile.objects.create(display_name="Ania")
+        self.data['players'][0]['profile'] = profile.id
+        self.data['players'][1]['profile'] = profile.id
+
+        serializer = TournamentCreateSerializer(data=self.data)
+        self.assertFalse(serializer.is_valid())
+
+        self.assertEqual(
+            serializer.errors["players"][0],
+            "A player profile can only be entered once in a tournament."
+        )
+
     def test_empty_player_list(self):
         """Should raise validation error when no players are provided."""
         self.data['players'] = []
@@ -134,13 +148,16 @@ class TournamentSerializerTest(TestCase):
             'result_sorting': self.tournament.result_sorting,
             'team_format': self.tournament.team_format,
             'final_match': self.tournament.final_match,
+            'mexicano_pairing': self.tournament.mexicano_pairing,
             'points_per_match': self.tournament.points_per_match,
+            'season': None,
             'created_at': serializer.data['created_at'],
             'players': [
                 {
                     'id': player.id,
                     'name': player.name,
-                    'tournament': self.tournament.id
+                    'tournament': self.tournament.id,
+                    'profile': None
                 }
                 for player in players
             ],
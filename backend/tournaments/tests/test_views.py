@@ -1,8 +1,17 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from backend.tournaments.models import Tournament, Player, Court, MatchPlayer
+from backend.tournaments.models import Tournament, Player, Court, MatchPlayer, SeasonStanding
+from backend.tournaments.logic.americano_single import generate_americano_round
+from backend.tournaments.logic.ranking import create_ranking_snapshots
 from backend.tournaments.factories.tournament_factories import (
     TournamentFactory, MatchPlayerFactory,
     MatchFactory, TournamentWithRelationsFactory
@@ -46,13 +55,139 @@ class TournamentViewTests(APITestCase):
         self.assertEqual(Player.objects.count(), 4)
         self.assertEqual(Court.objects.count(), 1)
 
+    def test_create_tournament_query_count(self):
+        """Should create a tournament with its players and courts in bulk, without per-row inserts."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.create_tournament()
+        inserts = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+
+    def test_batch_create_tournaments(self):
+        """Should create every tournament of a batch in a constant number of queries."""
+        url = reverse('tournament-batch-create')
+
+        def create_batch(size, prefix):
+            batch = [dict(self.tournament_data, title=f"{prefix} {i}") for i in range(size)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(url, batch, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(len(response.data), size)
+            self.assertEqual(len(response.data[-1]['players']), 4)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(create_batch(1, "Single"), create_batch(20, "League night"))
+        self.assertEqual(Tournament.objects.count(), 21)
+        self.assertEqual(Player.objects.count(), 84)
+
+    def test_batch_create_is_all_or_nothing(self):
+        """Should reject the whole batch when one tournament is invalid."""
+        invalid = dict(self.tournament_data, players=[{"name": "Ania"}, {"name": "Ania"}])
+        url = reverse('tournament-batch-create')
+
+        response = self.client.post(url, [self.tournament_data, invalid], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Tournament.objects.count(), 0)
+
+        response = self.client.post(url, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_tournament_list(self):
         """Should return a list of existing tournaments."""
         self.create_tournament()
         url = reverse('tournament-list-create')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_tournament_list_is_cursor_paginated(self):
+        """Should page through tournaments newest first without repeating any."""
+        for _ in range(5):
+            TournamentWithRelationsFactory(players=4, courts=1)
+        url = reverse('tournament-list-create')
+
+        first_page = self.client.get(url, {"page_size": 3})
+        second_page = self.client.get(first_page.data['next'])
+
+        self.assertEqual(len(first_page.data['results']), 3)
+        self.assertEqual(len(second_page.data['results']), 2)
+        self.assertIsNone(second_page.data['next'])
+        ids = [t['id'] for t in first_page.data['results'] + second_page.data['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_tournament_list_query_count_is_constant(self):
+        """Should list tournaments with nested players and courts in a constant number of queries."""
+        url = reverse('tournament-list-create')
+        TournamentWithRelationsFactory(players=4, courts=1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        single = len(ctx.captured_queries)
+
+        for _ in range(10):
+            TournamentWithRelationsFactory(players=4, courts=2)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 11)
+        self.assertEqual(len(ctx.captured_queries), single)
+
+    def test_tournament_list_sparse_fields(self):
+        """Should return only requested fields and skip loading players and courts."""
+        TournamentWithRelationsFactory(players=4, courts=1)
+        url = reverse('tournament-list-create')
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"fields": "id,title,status"})
+        self.assertEqual(set(response.data['results'][0]), {"id", "title", "status"})
+
+
+class SeasonViewTests(APITestCase):
+    """Tests for seasons, player profiles and the season leaderboard."""
+    def test_season_leaderboard(self):
+        """Should link a new tournament's players to profiles and rank them on the season leaderboard."""
+        season = self.client.post(reverse('season-list-create'), {"name": "Winter league"}, format='json').data
+        profile = self.client.post(reverse('profile-list-create'), {"display_name": "Ania"}, format='json').data
+
+        response = self.client.post(reverse('tournament-list-create'), {
+            "title": "Week 1", "format": "AMERICANO", "result_sorting": "POINTS", "team_format": "PLAYER",
+            "final_match": 1, "points_per_match": 21, "season": season['id'],
+            "players": [{"name": "Ania", "profile": profile['id']}, {"name": "Bartek"}, {"name": "Celina"},
+                        {"name": "Dawid"}],
+            "courts": [{"name": "Central Court", "number": 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tournament = Tournament.objects.get(pk=response.data['id'])
+        self.assertEqual(tournament.season_id, season['id'])
+
+        generate_americano_round(tournament)
+        match = tournament.matches.get()
+        self.client.patch(reverse('round-results-update', args=[tournament.id, 1]), {"results": [{
+            "match_id": match.id, "team_1_score": 21, "team_2_score": 17, "played": True,
+            "updated_at": match.updated_at.isoformat(),
+        }]}, format='json')
+
+        leaderboard = self.client.get(reverse('season-leaderboard', args=[season['id']])).data
+        self.assertEqual(len(leaderboard), 1)
+        self.assertEqual(leaderboard[0]['display_name'], "Ania")
+        self.assertIn(leaderboard[0]['total_points'], (21, 17))
+        self.assertEqual(leaderboard[0]['total_matches'], 1)
+
+    def test_season_win_rate_keeps_one_decimal(self):
+        """Should serve the season win rate as a one-decimal percentage, rounded like the tournament ranking."""
+        season = self.client.post(reverse('season-list-create'), {"name": "Summer league"}, format='json').data
+        profile = self.client.post(reverse('profile-list-create'), {"display_name": "Ania"}, format='json').data
+        SeasonStanding.objects.create(
+            season_id=season['id'], profile_id=profile['id'], total_points=100, total_matches=16,
+            wins=1, losses=15, rounds=16
+        )
+
+        leaderboard = self.client.get(reverse('season-leaderboard', args=[season['id']])).data
+        self.assertEqual(leaderboard[0]['win_rate'], 6.3)
+
+    def test_season_dates_are_validated(self):
+        """Should refuse a season ending before it starts."""
+        response = self.client.post(reverse('season-list-create'), {
+            "name": "Broken", "start_date": "2026-05-01", "end_date": "2026-04-01"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
 class TournamentRetrieveViewTests(APITestCase):
@@ -93,17 +228,45 @@ class CurrentRoundMatchesViewTests(APITestCase):
     def setUp(self):
         self.tournament = TournamentWithRelationsFactory(players=8, courts=2)
         self.match = MatchFactory(tournament=self.tournament, court=self.tournament.courts.first())
+        # current round is read from the tournament, as round generation keeps it in sync
+        Tournament.objects.filter(pk=self.tournament.pk).update(number_of_rounds=self.match.round_number)
+        self.url = reverse('current-round-matches', args=[self.tournament.id])
 
     def test_get_matches_from_current_round(self):
         """Should return all matches from the current round for a given tournament."""
-        url = reverse('current-round-matches', args=[self.tournament.id])
-        response = self.client.get(url)
+        response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
 
         self.tournament.refresh_from_db()
         self.assertEqual(response.data[0]['round_number'], self.match.round_number)
 
+    def test_matching_etag_returns_not_modified(self):
+        """Should answer 304 with a single query when the round did not change since the given ETag."""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_match_update(self):
+        """Should send full payload with a new ETag once a match of the round is updated."""
+        etag = self.client.get(self.url)['ETag']
+        self.match.team_1_score = 7
+        self.match.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_no_rounds_returns_empty_list(self):
+        """Should return an empty list for a tournament without generated rounds."""
+        tournament = TournamentWithRelationsFactory(players=4, courts=1)
+        response = self.client.get(reverse('current-round-matches', args=[tournament.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
 class SingleRoundMatchesViewTests(APITestCase):
     """
     Tests for retrieving matches for a specific round in a tournament.
@@ -121,6 +284,35 @@ class SingleRoundMatchesViewTests(APITestCase):
         self.assertEqual(response.data[0]['round_number'], 2)
 
 
+class MatchListQueryCountTests(APITestCase):
+    """
+    Match list endpoints should use a constant number of queries regardless of tournament size.
+    """
+    def query_count(self, url_name, courts, rounds=2):
+        tournament = TournamentWithRelationsFactory(players=courts * 4, courts=courts)
+        for _ in range(rounds):
+            generate_americano_round(tournament)
+        args = [tournament.id, 1] if url_name == 'single-round-matches' else [tournament.id]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(url_name, args=args))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(len(match['players']) == 4 for match in response.data))
+        return len(ctx.captured_queries)
+
+    def test_match_list_query_count(self):
+        """Should list all matches with players in the same number of queries for 1 and 6 courts."""
+        self.assertEqual(self.query_count('match-list', 1), self.query_count('match-list', 6))
+
+    def test_current_round_query_count(self):
+        """Should return current round matches in the same number of queries for 1 and 6 courts."""
+        self.assertEqual(self.query_count('current-round-matches', 1), self.query_count('current-round-matches', 6))
+
+    def test_single_round_query_count(self):
+        """Should return single round matches in the same number of queries for 1 and 6 courts."""
+        self.assertEqual(self.query_count('single-round-matches', 1), self.query_count('single-round-matches', 6))
+
+
 class MatchUpdateViewTests(APITestCase):
     """Tests for updating a single match via PATCH."""
     def setUp(self):
@@ -173,6 +365,66 @@ class RoundResultsUpdateViewTests(APITestCase):
         self.assertTrue(self.match.played)
         self.assertEqual(self.match.team_1_score, 21)
 
+    def test_patch_round_results_with_stale_updated_at_conflicts(self):
+        """Should reject the whole round with 409 when a match was changed in the meantime."""
+        url = reverse('round-results-update', args=[self.tournament.id, self.match.round_number])
+        stale_updated_at = self.match.updated_at.isoformat()
+        self.match.team_1_score = 3
+        self.match.save()
+
+        payload = {
+            "results": [{
+                "match_id": self.match.id,
+                "team_1_score": 21,
+                "team_2_score": 19,
+                "played": True,
+                "updated_at": stale_updated_at
+            }]
+        }
+        response = self.client.patch(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['conflict_match_ids'], [self.match.id])
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.team_1_score, 3)
+
+    def test_patch_round_results_rejects_match_from_other_round(self):
+        """Should return 400 when a match does not belong to the updated round."""
+        url = reverse('round-results-update', args=[self.tournament.id, self.match.round_number + 1])
+        payload = {
+            "results": [{
+                "match_id": self.match.id,
+                "team_1_score": 21,
+                "team_2_score": 19,
+                "played": True,
+                "updated_at": self.match.updated_at.isoformat()
+            }]
+        }
+        response = self.client.patch(url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['invalid_match_ids'], [self.match.id])
+
+    def test_patch_round_results_query_count_does_not_grow_with_round_size(self):
+        """Should update a round in the same number of queries for 1 and 6 matches."""
+        def patch_queries(courts):
+            tournament = TournamentWithRelationsFactory(players=courts * 4, courts=courts)
+            generate_americano_round(tournament)
+            payload = {
+                "results": [{
+                    "match_id": match.id,
+                    "team_1_score": 11,
+                    "team_2_score": 10,
+                    "played": True,
+                    "updated_at": match.updated_at.isoformat()
+                } for match in tournament.matches.all()]
+            }
+            url = reverse('round-results-update', args=[tournament.id, 1])
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.patch(url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(patch_queries(1), patch_queries(6))
+
 
 class GenerateRoundViewTests(APITestCase):
     """Tests for generating a new round in a tournament"""
@@ -188,6 +440,127 @@ class GenerateRoundViewTests(APITestCase):
         self.tournament.refresh_from_db()
         self.assertGreaterEqual(self.tournament.number_of_rounds, 1)
 
+    def test_retried_request_with_idempotency_key_returns_same_round(self):
+        """Should generate the round once and replay it for a retry with the same Idempotency-Key."""
+        url = reverse('generate-round', args=[self.tournament.id])
+        payload = {"is_final": False}
+
+        first = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='tablet-1-round-1')
+        retry = self.client.post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY='tablet-1-round-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data['round_number'], 1)
+        self.assertEqual(retry.data['round_number'], 1)
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.number_of_rounds, 1)
+        self.assertEqual(self.tournament.matches.count(), 1)
+
+    def test_retry_after_the_tournament_finished_returns_same_round(self):
+        """Should replay the stored round for a retried Idempotency-Key even once the tournament is finished."""
+        url = reverse('generate-round', args=[self.tournament.id])
+        self.client.post(url, {"is_final": False}, format='json', HTTP_IDEMPOTENCY_KEY='tablet-1-round-1')
+        Tournament.objects.filter(pk=self.tournament.pk).update(status=Tournament.TournamentStatus.FINISHED)
+
+        retry = self.client.post(url, {"is_final": False}, format='json', HTTP_IDEMPOTENCY_KEY='tablet-1-round-1')
+
+        self.assertEqual(retry.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.data['round_number'], 1)
+
+    def test_generate_round_for_finished_tournament_fails(self):
+        """Should refuse to generate a round for a finished tournament."""
+        Tournament.objects.filter(pk=self.tournament.pk).update(status=Tournament.TournamentStatus.FINISHED)
+        url = reverse('generate-round', args=[self.tournament.id])
+        response = self.client.post(url, {"is_final": False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_new_idempotency_key_generates_next_round(self):
+        """Should generate a new round for each distinct Idempotency-Key."""
+        url = reverse('generate-round', args=[self.tournament.id])
+        self.client.post(url, {"is_final": False}, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        response = self.client.post(url, {"is_final": False}, format='json', HTTP_IDEMPOTENCY_KEY='key-2')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['round_number'], 2)
+
+
+class PreviewRoundViewTests(APITestCase):
+    """Tests for previewing the next round and committing the preview by token."""
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(players=6, courts=1)
+        self.preview_url = reverse('preview-round', args=[self.tournament.id])
+        self.generate_url = reverse('generate-round', args=[self.tournament.id])
+
+    def test_preview_writes_nothing(self):
+        """Should return the proposed pairings without creating a round."""
+        response = self.client.get(self.preview_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['round_number'], 1)
+        self.assertEqual(len(response.data['matches']), 1)
+        self.assertEqual(len(response.data['sit_outs']), 2)
+        self.assertTrue(response.data['token'])
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.number_of_rounds, 0)
+        self.assertFalse(self.tournament.matches.exists())
+
+    def test_commit_stores_exactly_the_preview(self):
+        """Should store the previewed pairings when committing its token."""
+        preview = self.client.get(self.preview_url).data
+        response = self.client.post(self.generate_url, {"preview_token": preview['token']}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        match = self.tournament.matches.get(round_number=1)
+        self.assertEqual(match.court_id, preview['matches'][0]['court_id'])
+        self.assertEqual(
+            list(match.matchplayer_set.order_by('id').values_list('player_id', 'team')),
+            [(p['player_id'], p['team']) for p in preview['matches'][0]['players']]
+        )
+
+    def test_stale_preview_is_rejected(self):
+        """Should refuse a preview token once the round it previewed was generated."""
+        preview = self.client.get(self.preview_url).data
+        self.client.post(self.generate_url, {"is_final": False}, format='json')
+
+        response = self.client.post(self.generate_url, {"preview_token": preview['token']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.number_of_rounds, 1)
+
+    def test_preview_of_finished_tournament_fails(self):
+        """Should refuse to preview a round for a finished tournament."""
+        Tournament.objects.filter(pk=self.tournament.pk).update(status=Tournament.TournamentStatus.FINISHED)
+        response = self.client.get(self.preview_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReplayRoundViewTests(APITestCase):
+    """Tests for replaying a generated round from the tournament seed."""
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(
+            players=6, courts=1, format=Tournament.TournamentFormat.AMERICANO
+        )
+        generate_americano_round(self.tournament)
+
+    def test_replay_round(self):
+        """Should return the pairings and sit-outs the round was generated with."""
+        response = self.client.get(reverse('replay-round', args=[self.tournament.id, 1]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        match = self.tournament.matches.get(round_number=1)
+        self.assertEqual(response.data['matches'][0]['court_id'], match.court_id)
+        self.assertEqual(
+            [p['player_id'] for p in response.data['matches'][0]['players']],
+            list(match.matchplayer_set.order_by('id').values_list('player_id', flat=True))
+        )
+        self.assertEqual(len(response.data['sit_outs']), 2)
+        self.assertFalse(response.data['is_final'])
+
+    def test_replay_of_not_generated_round_fails(self):
+        """Should return 404 for a round that has not been generated yet."""
+        response = self.client.get(reverse('replay-round', args=[self.tournament.id, 2]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class TournamentRankingViewTests(APITestCase):
     """
@@ -226,6 +599,19 @@ class TournamentRankingViewTests(APITestCase):
         self.assertTrue(isinstance(response.data, list))
         self.assertTrue(len(response.data) > 0)
 
+    def test_ranking_rounds_only_on_request(self):
+        """Should omit per-round results unless ?include=rounds is given."""
+        url = reverse('tournament-ranking', args=[self.tournament.id])
+        summary = self.client.get(url).data
+        detailed = self.client.get(url, {'include': 'rounds'}).data
+
+        self.assertNotIn('rounds', summary[0])
+        self.assertEqual(summary[0]['position'], 1)
+        self.assertEqual(summary[0]['total_points'], 16)
+        self.assertEqual(summary[0]['point_difference'], 11)
+        self.assertEqual(len(detailed[0]['rounds']), 1)
+        self.assertEqual(detailed[0]['rounds'][0]['points_against'], 5)
+
 
 class FinishTournamentViewTests(APITestCase):
     """
@@ -240,4 +626,86 @@ class FinishTournamentViewTests(APITestCase):
         response = self.client.patch(url, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.tournament.refresh_from_db()
-        self.assertEqual(self.tournament.status, Tournament.TournamentStatus.FINISHED)
\ No newline at end of file
+        self.assertEqual(self.tournament.status, Tournament.TournamentStatus.FINISHED)
+
+
+class ExportViewTests(APITestCase):
+    """
+    Tests for streaming CSV / JSON lines exports.
+    """
+    def setUp(self):
+        self.tournament = TournamentWithRelationsFactory(players=8, courts=2)
+        generate_americano_round(self.tournament)
+        self.tournament.matches.update(team_1_score=21, team_2_score=12, played=True)
+        create_ranking_snapshots(self.tournament.id, 1)
+
+        self.old_tournament = TournamentWithRelationsFactory(players=4, courts=1)
+        generate_americano_round(self.old_tournament)
+        Tournament.objects.filter(pk=self.old_tournament.pk).update(
+            created_at=self.tournament.created_at - timedelta(days=40)
+        )
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_tournament_matches_csv(self):
+        """Should stream the tournament's matches as CSV with a header line, in one query."""
+        response = self.client.get(reverse('tournament-export', args=[self.tournament.id, 'matches', 'csv']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn(f'tournament-{self.tournament.id}-matches.csv', response['Content-Disposition'])
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(csv.DictReader(io.StringIO(self.content(response))))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual({row['tournament_id'] for row in rows}, {str(self.tournament.id)})
+        self.assertEqual(rows[0]['team_1_score'], '21')
+
+    def test_rankings_jsonl(self):
+        """Should stream one JSON object per ranking snapshot."""
+        response = self.client.get(reverse('tournament-export', args=[self.tournament.id, 'rankings', 'jsonl']))
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+
+        self.assertEqual(len(lines), 8)
+        self.assertEqual({line['result'] for line in lines}, {'WIN', 'LOSS'})
+        self.assertEqual(sorted(line['points'] for line in lines), [12] * 4 + [21] * 4)
+
+    def test_date_range_export(self):
+        """Should export match players of the tournaments created in the date range only."""
+        today = self.tournament.created_at.date()
+        response = self.client.get(
+            reverse('export', args=['match-players', 'jsonl']),
+            {"from": str(today - timedelta(days=7)), "to": str(today)}
+        )
+        lines = [json.loads(line) for line in self.content(response).splitlines()]
+
+        self.assertIn(self.tournament.id, {line['tournament_id'] for line in lines})
+        self.assertNotIn(self.old_tournament.id, {line['tournament_id'] for line in lines})
+        self.assertEqual(
+            len([line for line in lines if line['tournament_id'] == self.tournament.id]),
+            MatchPlayer.objects.filter(match__tournament=self.tournament).count()
+        )
+
+    def test_empty_export_has_header_only(self):
+        """Should return just the header when nothing matches."""
+        response = self.client.get(reverse('export', args=['rankings', 'csv']), {"from": "2100-01-01"})
+        self.assertEqual(self.content(response).splitlines(), [
+            'tournament_id,round_number,player_id,name,points,points_against,result,is_bye'
+        ])
+
+    def test_invalid_export_requests(self):
+        """Should reject unknown exports, missing tournaments and malformed dates."""
+        self.assertEqual(
+            self.client.get(reverse('export', args=['players', 'csv'])).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.get(reverse('export', args=['matches', 'xml'])).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.client.get(reverse('tournament-export', args=[999999, 'matches', 'csv'])).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+        response = self.client.get(reverse('export', args=['matches', 'csv']), {"to": "2026-02-30"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -16,12 +16,18 @@ Including another URLconf
 """
 from django.urls import path
 
-from backend.tournaments.views import TournamentListCreateView, TournamentRetriveView, MatchListView, \
-    CurrentRoundMatchesView, MatchUpdateView, RoundResultsUpdateView, GenerateRoundView, SingleRoundMatchesView, \
-    TournamentRankingView, FinishTournamentView
+from backend.tournaments.views import TournamentListCreateView, TournamentBatchCreateView, TournamentRetriveView, \
+    MatchListView, CurrentRoundMatchesView, MatchUpdateView, RoundResultsUpdateView, GenerateRoundView, SingleRoundMatchesView, \
+    TournamentRankingView, FinishTournamentView, PreviewRoundView, ReplayRoundView, SeasonListCreateView, \
+    SeasonLeaderboardView, PlayerProfileListCreateView, ExportView, tournament_events
 
 urlpatterns = [
     path('', TournamentListCreateView.as_view(), name="tournament-list-create"),
+    path('batch/', TournamentBatchCreateView.as_view(), name="tournament-batch-create"),
+    path('seasons/', SeasonListCreateView.as_view(), name="season-list-create"),
+    path('seasons/<int:season_id>/leaderboard/', SeasonLeaderboardView.as_view(), name="season-leaderboard"),
+    path('profiles/', PlayerProfileListCreateView.as_view(), name="profile-list-create"),
+    path('export/<str:kind>.<str:file_format>', ExportView.as_view(), name="export"),
     path('<int:pk>/', TournamentRetriveView.as_view(), name="tournament-retrieve"),
     path('<int:tournament_id>/matches/', MatchListView.as_view(), name="match-list"),
     path('<int:tournament_id>/current-round/', CurrentRoundMatchesView.as_view(), name="current-round-matches"),
@@ -29,6 +35,10 @@ urlpatterns = [
     path('<int:tournament_id>/update-single/<int:pk>/', MatchUpdateView.as_view(), name='single-match-update'),
     path('<int:tournament_id>/update-round/<int:round_id>/', RoundResultsUpdateView.as_view(), name='round-results-update'),
     path('<int:tournament_id>/generate-round/', GenerateRoundView.as_view(), name='generate-round'),
+    path('<int:tournament_id>/preview-round/', PreviewRoundView.as_view(), name='preview-round'),
+    path('<int:tournament_id>/replay-round/<int:round_id>/', ReplayRoundView.as_view(), name='replay-round'),
     path('<int:tournament_id>/ranking/', TournamentRankingView.as_view(), name='tournament-ranking'),
-    path('<int:tournament_id>/finish/', FinishTournamentView.as_view(), name='finish-tournament')
+    path('<int:tournament_id>/finish/', FinishTournamentView.as_view(), name='finish-tournament'),
+    path('<int:tournament_id>/events/', tournament_events, name='tournament-events'),
+    path('<int:tournament_id>/export/<str:kind>.<str:file_format>', ExportView.as_view(), name='tournament-export'),
 ]
\ No newline at end of file
@@ -1,26 +1,100 @@
+import asyncio
+
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import generics, status
 from rest_framework.response import Response
-from django.db.models import Max
-
-from .logic.ranking import get_tournament_ranking, create_ranking_snapshots
-from .models import Tournament, Match
+from django.db.models import Count, F, Max, Prefetch, prefetch_related_objects
+
+from .cache import get_or_build, bump_tournament_version
+from .export import EXPORTS, EXPORT_FORMATS, export_rows
+from .logic.ranking import aggregate_tournament_ranking, create_ranking_snapshots
+from .live import get_broker, publish_tournament_event, format_sse
+from .logic.generation import replay_round, preview_round, StalePreviewError
+from .logic.rounds import RoundConflictError
+from .logic.seasons import get_season_leaderboard
+from .models import Tournament, Match, MatchPlayer, RoundGenerationKey, Season, PlayerProfile
+from .pagination import TournamentCursorPagination
 from .serializers import TournamentSerializer, MatchUpdateSerializer, RoundResultsSerializer, \
-    TournamentCreateSerializer, MatchSerializer, GenerateRoundSerializer, PlayerRankingSerializer
+    TournamentCreateSerializer, MatchSerializer, GenerateRoundSerializer, PlayerRankingSerializer, RoundPlanSerializer, \
+    RoundPreviewSerializer, SeasonSerializer, PlayerProfileSerializer, SeasonLeaderboardSerializer
+
+
+def matches_with_players():
+    """
+    Match queryset with court and match players (with player) loaded up front,
+    so MatchSerializer does not hit the database per match.
+    """
+    return Match.objects.select_related('court').prefetch_related(
+        Prefetch('matchplayer_set', queryset=MatchPlayer.objects.select_related('player'))
+    )
+
+
+def is_finished(tournament_id):
+    return Tournament.objects.filter(
+        pk=tournament_id, status=Tournament.TournamentStatus.FINISHED
+    ).exists()
+
+
+class CachedTournamentListMixin:
+    """
+    Serves the list payload from the versioned tournament cache (see cache.py).
+    cache_kind names the payload, get_cache_suffix() separates e.g. rounds.
+    """
+    cache_kind = None
+
+    def get_cache_suffix(self):
+        return ''
+
+    def list(self, request, *args, **kwargs):
+        tournament_id = self.kwargs['tournament_id']
+        data = get_or_build(
+            tournament_id,
+            self.cache_kind,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            finished=is_finished(tournament_id),
+            suffix=self.get_cache_suffix(),
+        )
+        return Response(data)
 
 
 class TournamentListCreateView(generics.ListCreateAPIView):
     """
-     GET: Returns a list of all tournaments.
+     GET: Returns a cursor-paginated list of tournaments, newest first.
+          ?fields=id,title,... returns only the listed fields (players and courts are skipped unless asked for).
      POST: Creates a new tournament with a list of players.
      """
     queryset = Tournament.objects.all()
+    pagination_class = TournamentCursorPagination
+
+    def get_requested_fields(self):
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        return [field.strip() for field in fields.split(',') if field.strip()]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        fields = self.get_requested_fields()
+        prefetch = [relation for relation in ('players', 'courts') if fields is None or relation in fields]
+        return queryset.prefetch_related(*prefetch)
+
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return TournamentCreateSerializer
         return TournamentSerializer
 
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         # Validate and creates object
         serializer = self.get_serializer(data=request.data)
@@ -33,6 +107,25 @@ class TournamentListCreateView(generics.ListCreateAPIView):
         return Response(output_serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+class TournamentBatchCreateView(generics.CreateAPIView):
+    """
+    POST: Creates a list of tournaments (e.g. all brackets of a league night) in one transaction.
+    Either all of them are created or none.
+    """
+    serializer_class = TournamentCreateSerializer
+    max_batch_size = 50
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, many=True, min_length=1, max_length=self.max_batch_size)
+        serializer.is_valid(raise_exception=True)
+        tournaments = serializer.save()
+
+        # players and courts of the whole batch in two queries
+        prefetch_related_objects(tournaments, 'players', 'courts')
+        output_serializer = TournamentSerializer(tournaments, many=True, context=self.get_serializer_context())
+        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+
+
 class TournamentRetriveView(generics.RetrieveAPIView):
     """
     GET: Retrieves the details of a single tournament by its ID.
@@ -40,38 +133,79 @@ class TournamentRetriveView(generics.RetrieveAPIView):
     queryset = Tournament.objects.all()
     serializer_class = TournamentSerializer
 
-class MatchListView(generics.ListAPIView):
+    def retrieve(self, request, *args, **kwargs):
+        data = get_or_build(
+            self.kwargs['pk'],
+            'detail',
+            lambda: self.get_serializer(self.get_object()).data,
+            finished=lambda payload: payload['status'] == Tournament.TournamentStatus.FINISHED,
+        )
+        return Response(data)
+
+class MatchListView(CachedTournamentListMixin, generics.ListAPIView):
     """
     GET: Returns a list of all matches for a given tournament ID.
     """
     serializer_class = MatchSerializer
+    cache_kind = 'matches'
 
     def get_queryset(self):
         tournament_id = self.kwargs['tournament_id']
-        return Match.objects.filter(tournament_id=tournament_id)
+        return matches_with_players().filter(tournament_id=tournament_id)
 
-class CurrentRoundMatchesView(generics.ListAPIView):
+class CurrentRoundMatchesView(CachedTournamentListMixin, generics.ListAPIView):
     """
     GET: Returns all matches from the current round of a specific tournament.
+    Sends an ETag built from the round's latest match update - clients polling
+    with If-None-Match get an empty 304 while nothing changed.
     """
     serializer_class = MatchSerializer
+    cache_kind = 'current-round'
 
     def get_queryset(self):
         tournament_id = self.kwargs['tournament_id']
-        matches = Match.objects.filter(tournament_id=tournament_id)
-        latest_round = matches.aggregate(max_round=Max('round_number'))['max_round']
-        return matches.filter(round_number=latest_round) if latest_round else Match.objects.none()
+        # current round is tournament.number_of_rounds, resolved by a join in the same query
+        return matches_with_players().filter(
+            tournament_id=tournament_id,
+            round_number=F('tournament__number_of_rounds')
+        )
+
+    def get_etag(self):
+        state = Match.objects.filter(
+            tournament_id=self.kwargs['tournament_id'],
+            round_number=F('tournament__number_of_rounds')
+        ).aggregate(round_number=Max('round_number'), matches=Count('id'), updated_at=Max('updated_at'))
+        if not state['matches']:
+            return None
+        return quote_etag(
+            f"{self.kwargs['tournament_id']}-{state['round_number']}-{state['matches']}-{state['updated_at'].timestamp()}"
+        )
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        response = super().list(request, *args, **kwargs)
+        if etag:
+            response['ETag'] = etag
+            response['Cache-Control'] = 'no-cache'
+        return response
 
-class SingleRoundMatchesView(generics.ListAPIView):
+class SingleRoundMatchesView(CachedTournamentListMixin, generics.ListAPIView):
     """
     GET: Returns all matches from the current round of a specific tournament.
     """
     serializer_class = MatchSerializer
+    cache_kind = 'round'
+
+    def get_cache_suffix(self):
+        return self.kwargs['round_id']
 
     def get_queryset(self):
         tournament_id = self.kwargs['tournament_id']
         round_id = self.kwargs['round_id']
-        matches = Match.objects.filter(tournament_id=tournament_id)
+        matches = matches_with_players().filter(tournament_id=tournament_id)
         return matches.filter(round_number=round_id)
 
 
@@ -79,9 +213,11 @@ class MatchUpdateView(generics.UpdateAPIView):
     """
     PATCH: Updates a single match (e.g., scores or played status).
     """
-    queryset = Match.objects.all()
+    # row is locked so a round update cannot interleave between the conflict check and the save
+    queryset = Match.objects.select_for_update()
     serializer_class = MatchUpdateSerializer
 
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         user_updated_at = request.data.get('updated_at')
@@ -96,7 +232,9 @@ class MatchUpdateView(generics.UpdateAPIView):
                 status=status.HTTP_409_CONFLICT
             )
 
-        return super().update(request, *args,**kwargs)
+        response = super().update(request, *args,**kwargs)
+        publish_tournament_event(instance.tournament_id, 'match_updated', {"match": response.data})
+        return response
 
 
 class RoundResultsUpdateView(generics.GenericAPIView):
@@ -110,56 +248,71 @@ class RoundResultsUpdateView(generics.GenericAPIView):
         tournament = get_object_or_404(Tournament, pk=tournament_id)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-
-        # checks if all matches belongs to the updated round
-        match_ids = [result['match_id'] for result in serializer.validated_data['results']]
-        invalid_matches = Match.objects.filter(
-            id__in=match_ids
-        ).exclude(
-            tournament=tournament,
-            round_number=round_id
-        )
-
-        if invalid_matches.exists():
-            invalid_ids = list(invalid_matches.values_list('id', flat=True))
-            return Response(
-                {
-                    "error": "One or more matches do not belong to the specified round.",
-                    "invalid_match_ids": invalid_ids,
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        conflict_matches = []
-        for result in serializer.validated_data['results']:
-            match = get_object_or_404(Match, pk=result['match_id'], tournament=tournament)
-            user_update_at = result.get('updated_at')
-            if user_update_at and str(user_update_at) != str(match.updated_at):
-                conflict_matches.append(match.id)
-
-
-        if conflict_matches:
-            return Response(
-                {
-                    "error": "One or more matches have been updated by another user.",
-                    "conflict_match_ids": conflict_matches,
-                },
-                status=status.HTTP_409_CONFLICT
+        results = serializer.validated_data['results']
+        match_ids = [result['match_id'] for result in results]
+
+        # validation, conflict check and write happen under row locks in one transaction
+        with transaction.atomic():
+            matches = Match.objects.select_for_update().order_by('pk').in_bulk(match_ids)
+
+            if len(matches) != len(set(match_ids)):
+                raise Http404("No Match matches the given query.")
+
+            # checks if all matches belongs to the updated round
+            invalid_ids = [
+                match.id for match in matches.values()
+                if match.tournament_id != tournament.id or match.round_number != round_id
+            ]
+            if invalid_ids:
+                return Response(
+                    {
+                        "error": "One or more matches do not belong to the specified round.",
+                        "invalid_match_ids": invalid_ids,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            conflict_matches = [
+                result['match_id'] for result in results
+                if result.get('updated_at') and result['updated_at'] != matches[result['match_id']].updated_at
+            ]
+            if conflict_matches:
+                return Response(
+                    {
+                        "error": "One or more matches have been updated by another user.",
+                        "conflict_match_ids": conflict_matches,
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            # bulk_update skips auto_now, so updated_at is set by hand
+            now = timezone.now()
+            for result in results:
+                match = matches[result['match_id']]
+                match.team_1_score = result['team_1_score']
+                match.team_2_score = result['team_2_score']
+                match.played = result['played']
+                match.updated_at = now
+            Match.objects.bulk_update(matches.values(), ['team_1_score', 'team_2_score', 'played', 'updated_at'])
+            bump_tournament_version(tournament.id)
+
+            create_ranking_snapshots(tournament.id, round_id)
+
+            publish_tournament_event(tournament.id, 'round_updated', {"round_number": round_id, "match_ids": match_ids})
+            publish_tournament_event(
+                tournament.id, 'ranking_updated',
+                lambda: {"ranking": tournament_ranking_data(tournament)}
             )
 
-
-        for result in serializer.validated_data['results']:
-            match = get_object_or_404(Match, pk=result['match_id'], tournament=tournament)
-            match.team_1_score = result['team_1_score']
-            match.team_2_score = result['team_2_score']
-            match.played = result['played']
-            match.save()
-
-        create_ranking_snapshots(tournament.id, round_id)
-
         return Response({"status": "round results updated"}, status=status.HTTP_200_OK)
 
 class GenerateRoundView(generics.CreateAPIView):
+    """
+    POST: Generates the next round of a tournament.
+    Accepts an optional Idempotency-Key header - a retried request with the same key
+    returns the round generated by the first one instead of creating another.
+    With preview_token (from preview-round/) the previewed pairings are stored, or 409 when they are out of date.
+    """
     serializer_class = GenerateRoundSerializer
 
     def get_serializer_context(self):
@@ -169,24 +322,109 @@ class GenerateRoundView(generics.CreateAPIView):
         return context
 
     def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        tournament = serializer.save()
+        idempotency_key = request.headers.get('Idempotency-Key')
+
+        with transaction.atomic():
+            # lock the tournament row - concurrent generations for it run one after another
+            tournament = get_object_or_404(Tournament.objects.select_for_update(), pk=self.kwargs['tournament_id'])
+
+            # a retry gets the stored round before validation - the tournament may have finished since
+            if idempotency_key:
+                generated = RoundGenerationKey.objects.filter(tournament=tournament, key=idempotency_key).first()
+                if generated:
+                    return Response(
+                        {"detail": "Runda została już wygenerowana.", "tournament_id": tournament.id,
+                         "round_number": generated.round_number},
+                        status=status.HTTP_200_OK
+                    )
+
+            serializer = self.get_serializer(data=request.data)
+            serializer.context['tournament'] = tournament
+            serializer.is_valid(raise_exception=True)
+            previous_round = tournament.number_of_rounds
+            try:
+                tournament = serializer.save()
+            except StalePreviewError:
+                return Response(
+                    {"detail": "Conflict: Previewed round is out of date", "tournament_id": tournament.id},
+                    status=status.HTTP_409_CONFLICT
+                )
+            except RoundConflictError:
+                return Response(
+                    {"detail": "Conflict: Round has been generated in the meantime", "tournament_id": tournament.id},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            if idempotency_key and tournament.number_of_rounds > previous_round:
+                RoundGenerationKey.objects.create(
+                    tournament=tournament,
+                    key=idempotency_key,
+                    round_number=tournament.number_of_rounds
+                )
+
+            if tournament.number_of_rounds > previous_round:
+                publish_tournament_event(tournament.id, 'round_generated', {"round_number": tournament.number_of_rounds})
+
         return Response(
-            {"detail": "Runda została wygenerowana.", "tournament_id": tournament.id},
+            {"detail": "Runda została wygenerowana.", "tournament_id": tournament.id,
+             "round_number": tournament.number_of_rounds},
             status=status.HTTP_201_CREATED
         )
 
+class PreviewRoundView(generics.GenericAPIView):
+    """
+    GET: Plans the next round (?is_final=true for the final) without writing anything.
+    POST generate-round/ with the returned preview_token stores exactly these pairings.
+    """
+    serializer_class = RoundPreviewSerializer
+
+    def get(self, request, *args, **kwargs):
+        tournament = get_object_or_404(Tournament, pk=self.kwargs['tournament_id'])
+        params = GenerateRoundSerializer(data=request.query_params, context={'tournament': tournament})
+        params.is_valid(raise_exception=True)
+
+        preview = preview_round(tournament, is_final=params.validated_data['is_final'])
+        if preview is None:
+            return Response({"detail": "Round cannot be planned."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(preview).data)
+
+class ReplayRoundView(generics.GenericAPIView):
+    """
+    GET: Rebuilds the pairings of an already generated round from the tournament seed
+    and the results before it - a stored round that differs from its replay was edited by hand.
+    """
+    serializer_class = RoundPlanSerializer
+
+    def get(self, request, *args, **kwargs):
+        tournament = get_object_or_404(Tournament, pk=self.kwargs['tournament_id'])
+        round_number = self.kwargs['round_id']
+        if not 1 <= round_number <= tournament.number_of_rounds:
+            raise Http404("Round has not been generated.")
+        return Response(self.get_serializer(replay_round(tournament, round_number).to_dict()).data)
+
+def tournament_ranking_data(tournament, include_rounds=False):
+    """Serialized ranking as served by TournamentRankingView, also pushed with ranking_updated events."""
+    return get_or_build(
+        tournament.id,
+        'ranking',
+        lambda: PlayerRankingSerializer(
+            aggregate_tournament_ranking(tournament, include_rounds=include_rounds), many=True
+        ).data,
+        finished=tournament.status == Tournament.TournamentStatus.FINISHED,
+        suffix='rounds' if include_rounds else '',
+    )
+
 class TournamentRankingView(generics.ListAPIView):
     """
     GET: Returns aggregated ranking for all players in a tournament.
+    Per-round results are included with ?include=rounds.
     """
     serializer_class = PlayerRankingSerializer
 
-    def get_queryset(self):
-        tournament_id = self.kwargs["tournament_id"]
-        tournament = get_object_or_404(Tournament, pk=tournament_id)
-        return get_tournament_ranking(tournament.id)
+    def list(self, request, *args, **kwargs):
+        tournament = get_object_or_404(Tournament, pk=self.kwargs["tournament_id"])
+        include_rounds = 'rounds' in request.query_params.get('include', '').split(',')
+        return Response(tournament_ranking_data(tournament, include_rounds=include_rounds))
 
 class FinishTournamentView(generics.UpdateAPIView):
     """
@@ -199,5 +437,96 @@ class FinishTournamentView(generics.UpdateAPIView):
         tournament_id = self.kwargs.get('tournament_id')
         tournament = get_object_or_404(Tournament, pk=tournament_id)
         tournament.status = Tournament.TournamentStatus.FINISHED
-        tournament.save(update_fields=['status'])
-        return Response({"detail": "Tournament marked as finished."}, status=200)
\ No newline at end of file
+        tournament.save(update_fields=['status'], validate=False)
+        return Response({"detail": "Tournament marked as finished."}, status=200)
+
+class SeasonListCreateView(generics.ListCreateAPIView):
+    """
+    GET: Lists league seasons, newest first.
+    POST: Creates a season - tournaments join it with their season field.
+    """
+    queryset = Season.objects.order_by('-created_at', '-id')
+    serializer_class = SeasonSerializer
+
+class PlayerProfileListCreateView(generics.ListCreateAPIView):
+    """
+    GET: Lists player profiles by name.
+    POST: Creates a profile - tournament players point to it with their profile field.
+    """
+    queryset = PlayerProfile.objects.order_by('display_name', 'id')
+    serializer_class = PlayerProfileSerializer
+
+class SeasonLeaderboardView(generics.ListAPIView):
+    """
+    GET: Season leaderboard of player profiles, read from the incrementally kept season standings.
+    """
+    serializer_class = SeasonLeaderboardSerializer
+
+    def list(self, request, *args, **kwargs):
+        season = get_object_or_404(Season, pk=self.kwargs['season_id'])
+        return Response(self.get_serializer(get_season_leaderboard(season.id), many=True).data)
+
+class ExportView(generics.GenericAPIView):
+    """
+    GET: Streams matches, match players or ranking snapshots as CSV or JSON lines
+    (e.g. export/matches.csv, 12/export/rankings.jsonl).
+    Scoped to a tournament when the URL has one; ?from= and ?to= (YYYY-MM-DD) limit the
+    export to tournaments created in that date range.
+    """
+    def get(self, request, kind, file_format, tournament_id=None):
+        if kind not in EXPORTS or file_format not in EXPORT_FORMATS:
+            raise Http404("No such export.")
+        if tournament_id is not None:
+            get_object_or_404(Tournament, pk=tournament_id)
+
+        dates = {}
+        for param in ('from', 'to'):
+            value = request.query_params.get(param)
+            try:
+                dates[param] = parse_date(value) if value else None
+            except ValueError:
+                dates[param] = None
+            if value and dates[param] is None:
+                return Response(
+                    {"error": f"'{param}' must be a date in YYYY-MM-DD format."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        columns, rows = export_rows(kind, tournament_id, dates['from'], dates['to'])
+        stream, content_type = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(stream(columns, rows), content_type=content_type)
+
+        name = [f"tournament-{tournament_id}"] if tournament_id is not None else []
+        name += [kind] + [str(date) for date in dates.values() if date]
+        response['Content-Disposition'] = f'attachment; filename="{"-".join(name)}.{file_format}"'
+        return response
+
+# comment lines keep proxies and browsers from dropping an idle stream
+SSE_KEEPALIVE_SECONDS = 15
+
+async def tournament_events(request, tournament_id):
+    """
+    GET: Server-Sent Events stream of live tournament updates
+    (match_updated, round_updated, round_generated, ranking_updated).
+    Needs an ASGI server - under WSGI the stream would block a worker.
+    """
+    if not await Tournament.objects.filter(pk=tournament_id).aexists():
+        raise Http404("No Tournament matches the given query.")
+
+    subscription = get_broker().subscribe(tournament_id)
+
+    async def stream():
+        async with subscription:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -54,7 +54,7 @@ export const updateRound = (
 
 export const getPlayersRanking = (tournament_id: string) => {
   return axios.get(
-    `http://127.0.0.1:8000/api/tournaments/${tournament_id}/ranking/`
+    `http://127.0.0.1:8000/api/tournaments/${tournament_id}/ranking/?include=rounds`
   );
 };
 
@@ -1,6 +1,7 @@
 export const FORMAT_MAP = {
   Americano: 'AMERICANO',
   Mexicano: 'MEXICANO',
+  Balanced: 'BALANCED',
 };
 
 export const SCORING_MAP = {
@@ -33,6 +34,7 @@ export const TOURNAMENT_FORMAT_OPTIONS = [
     id: 'americano',
   },
   { value: 'MEXICANO', i18nKey: 'options.format.mexicano', id: 'mexicano' },
+  { value: 'BALANCED', i18nKey: 'options.format.balanced', id: 'balanced' },
 ];
 
 export const RESULT_SORTING_OPTIONS = [
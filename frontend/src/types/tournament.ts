@@ -6,7 +6,7 @@ export interface Court {
   number?: number;
 }
 
-export type TournamentFormat = 'AMERICANO' | 'MEXICANO';
+export type TournamentFormat = 'AMERICANO' | 'MEXICANO' | 'BALANCED';
 export type PointsPerMatch = '11' | '21' | '24' | '-1';
 export type ResultSorting = 'POINTS' | 'WINS';
 export type TeamFormat = 'PLAYER' | 'PAIR';